@@ -0,0 +1,28 @@
+"""
+JSON log lines.
+
+The request metrics ("api.requests") and export timings
+("transactions.exports") pass their numbers as `extra` fields. JsonFormatter
+writes each record as one JSON object holding the usual time, level, logger
+and message plus every such field, so log aggregation can filter and chart
+them without parsing the message.
+"""
+import json
+import logging
+
+# Attributes every LogRecord has; anything else came in through `extra`
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
@@ -0,0 +1,178 @@
+"""
+Per-request metrics.
+
+RequestMetricsMiddleware times every request and records, through a
+database execute wrapper, how many queries it ran and how long they took.
+DRF responses are rendered after the view returns, so the time spent
+rendering the response body is measured separately as "serialize".
+
+The metrics go out as a Server-Timing header (visible in the browser's
+network panel) and as one log line per request on the "api.requests"
+logger. Requests running more than REQUEST_METRICS_QUERY_THRESHOLD queries
+or spending more than REQUEST_METRICS_DB_THRESHOLD_MS in the database also
+log their most frequent SQL fingerprints, which is how N+1 patterns show up.
+
+Per query the wrapper only adds to a counter and a dict keyed by the SQL
+string; fingerprints are only computed for requests over the threshold.
+Queries run while a streamed body is being sent happen after the response
+leaves the middleware and are not counted; the exports log their own
+metrics.
+"""
+import logging
+import re
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('api.requests')
+
+FINGERPRINT_LIMIT = 10
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    SQL with literals replaced by %s and IN lists collapsed, so queries
+    differing only in their parameters group together.
+    """
+    sql = _LITERALS.sub('%s', sql)
+    sql = _PLACEHOLDER_LISTS.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Database execute wrapper counting and timing the queries it sees."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            stats = self.statements.get(sql)
+            if stats is None:
+                self.statements[sql] = [1, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+
+    def fingerprints(self):
+        """(fingerprint, count, seconds) of the most frequent statements."""
+        grouped = {}
+        for sql, (count, duration) in self.statements.items():
+            stats = grouped.setdefault(fingerprint(sql), [0, 0.0])
+            stats[0] += count
+            stats[1] += duration
+        ranked = sorted(grouped.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+        return [(sql, count, duration) for sql, (count, duration) in ranked[:FINGERPRINT_LIMIT]]
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, database time, serialization time and response size
+    of every request. Put it first in MIDDLEWARE so the totals cover the
+    other middleware too.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._metrics_render_time = 0.0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        self.report(request, response, recorder, elapsed)
+        return response
+
+    def process_template_response(self, request, response):
+        # Being first in MIDDLEWARE this runs last, right before the response
+        # is rendered; the post-render callback fires right after.
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render_time = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, recorder, elapsed):
+        render_time = request._metrics_render_time
+        size = None if response.streaming else len(response.content)
+
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+                f'serialize;dur={render_time * 1000:.1f}, '
+                f'total;dur={elapsed * 1000:.1f}'
+            )
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else None
+        logger.info(
+            '%s %s %s: %d queries, db %.1fms, serialize %.1fms, total %.1fms, %s',
+            request.method,
+            request.path,
+            response.status_code,
+            recorder.count,
+            recorder.duration * 1000,
+            render_time * 1000,
+            elapsed * 1000,
+            f'{size} bytes' if size is not None else 'streamed',
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'queries': recorder.count,
+                'db_ms': recorder.duration * 1000,
+                'serialize_ms': render_time * 1000,
+                'total_ms': elapsed * 1000,
+                'response_bytes': size,
+            }
+        )
+
+        if (
+            recorder.count > settings.REQUEST_METRICS_QUERY_THRESHOLD
+            or recorder.duration * 1000 > settings.REQUEST_METRICS_DB_THRESHOLD_MS
+        ):
+            fingerprints = recorder.fingerprints()
+            logger.warning(
+                '%s %s ran %d queries in %.1fms; most frequent:\n%s',
+                request.method,
+                request.path,
+                recorder.count,
+                recorder.duration * 1000,
+                '\n'.join(f'{count}x {duration * 1000:.1f}ms {sql}' for sql, count, duration in fingerprints),
+                extra={
+                    'method': request.method,
+                    'path': request.path,
+                    'view': view,
+                    'queries': recorder.count,
+                    'db_ms': recorder.duration * 1000,
+                    'fingerprints': [
+                        {'sql': sql, 'count': count, 'db_ms': duration * 1000}
+                        for sql, count, duration in fingerprints
+                    ],
+                }
+            )
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32)),
+                ('period', models.CharField(blank=True, default='', max_length=16)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'document_sequences',
+                'constraints': [models.UniqueConstraint(fields=('name', 'period'), name='unique_document_sequence')],
+            },
+        ),
+    ]
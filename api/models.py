@@ -1,2 +1,20 @@
+from django.db import models
 
-# Create your models here.
+
+class DocumentSequence(models.Model):
+    """
+    Counter behind generated document codes, one row per name and period
+    (e.g. ('TRANS', '20260101') or ('SUPPLIER', '')).
+    """
+    name = models.CharField(max_length=32)
+    period = models.CharField(max_length=16, blank=True, default='')
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'document_sequences'
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'period'], name='unique_document_sequence'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}/{self.period}: {self.value}"
@@ -0,0 +1,60 @@
+"""
+Sequence-backed document codes.
+
+Numbers come from a DocumentSequence row that is incremented on a
+connection of its own (the SEQUENCE_DATABASE alias, a second connection to
+the same database) in a short transaction that commits straight away. The
+row lock is therefore held only for the increment, not for the rest of the
+caller's transaction, and concurrent checkouts do not queue behind each
+other. Because the number is committed independently, a caller that later
+rolls back leaves a gap: sequences may have gaps but never repeat.
+
+Without a SEQUENCE_DATABASE entry in DATABASES, numbers are taken on the
+default connection, inside the caller's transaction.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.utils import timezone
+
+from api.models import DocumentSequence
+
+SEQUENCE_DATABASE = 'sequences'
+
+
+def sequence_database():
+    return SEQUENCE_DATABASE if SEQUENCE_DATABASE in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+def next_sequence_value(name, period='', count=1, initial=None):
+    """
+    Reserves `count` consecutive numbers and returns the first one.
+
+    `initial` is an optional callable returning the value a new sequence
+    starts from, used to continue numbering that existed before the sequence.
+    """
+    using = sequence_database()
+    sequences = DocumentSequence.objects.using(using)
+    with transaction.atomic(using=using):
+        sequence = sequences.select_for_update().filter(name=name, period=period).first()
+        if sequence is None:
+            try:
+                with transaction.atomic(using=using):
+                    sequence = sequences.create(name=name, period=period, value=initial() if initial else 0)
+            except IntegrityError:
+                # Created concurrently, lock the winner's row instead
+                sequence = sequences.select_for_update().get(name=name, period=period)
+
+        first = sequence.value + 1
+        sequences.filter(pk=sequence.pk).update(value=sequence.value + count)
+    return first
+
+
+def next_document_code(prefix, width=5):
+    """
+    Returns the next code for today, e.g. TRANS/20260101/00042. Codes of
+    the same prefix and day sort in creation order while the counter fits
+    in `width` digits; past that the number simply grows wider.
+    """
+    period = timezone.localdate().strftime('%Y%m%d')
+    number = next_sequence_value(prefix, period)
+    return f"{prefix}/{period}/{str(number).zfill(width)}"
@@ -1,2 +1,129 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
 
-# Create your tests here.
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.log_format import JsonFormatter
+from api.models import DocumentSequence
+from api.sequences import next_document_code, next_sequence_value, sequence_database
+from products.models.category import ProductCategory
+from purchase_orders.models.purchase_order import PurchaseOrder
+from suppliers.models.supplier import Supplier
+from transactions.models.transaction import Transaction
+from users.models import User
+
+
+class DocumentCodeTests(TestCase):
+    # Numbers are taken on the sequences connection when it is configured
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+
+    def setUp(self):
+        self.period = timezone.localdate().strftime('%Y%m%d')
+
+    def test_codes_are_sequential_per_day(self):
+        first = next_document_code('TRANS')
+        second = next_document_code('TRANS')
+
+        self.assertEqual(first, f'TRANS/{self.period}/00001')
+        self.assertEqual(second, f'TRANS/{self.period}/00002')
+
+    def test_reserving_a_block_advances_the_sequence(self):
+        first = next_sequence_value('TRANS', self.period, count=100_000)
+
+        self.assertEqual(first, 1)
+        self.assertEqual(next_document_code('TRANS'), f'TRANS/{self.period}/100001')
+
+    def test_codes_past_100k_in_a_day_fit_their_columns(self):
+        # 100,000 codes in one day need a sixth digit
+        sequences = DocumentSequence.objects.using(sequence_database())
+        sequences.create(name='TRANS', period=self.period, value=99_999)
+        sequences.create(name='PO', period=self.period, value=99_999)
+        user = User.objects.create_user(email='procurement@example.com', password='x', role='procurement')
+        supplier = Supplier.objects.create(name='Supplier', address='Address', phone='0800')
+
+        transactions = [Transaction.objects.create(sub_total=0, total=0) for _ in range(2)]
+        purchase_order = PurchaseOrder.objects.create(
+            name='PO', requester=user, supplier=supplier, payment_option='cash', status=PurchaseOrder.Status.DRAFT
+        )
+
+        self.assertEqual(
+            [transaction.code for transaction in transactions],
+            [f'TRANS/{self.period}/100000', f'TRANS/{self.period}/100001'],
+        )
+        self.assertEqual(purchase_order.code, f'PO/{self.period}/100000')
+        for model, code in [(Transaction, transactions[-1].code), (PurchaseOrder, purchase_order.code)]:
+            self.assertLessEqual(len(code), model._meta.get_field('code').max_length)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentDocumentCodeTests(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+    workers = 8
+    codes_per_worker = 25
+
+    def test_parallel_codes_are_unique_without_gaps(self):
+        period = timezone.localdate().strftime('%Y%m%d')
+        barrier = Barrier(self.workers)
+
+        def allocate(_):
+            barrier.wait()
+            try:
+                return [next_document_code('TRANS') for _ in range(self.codes_per_worker)]
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            codes = [code for worker_codes in executor.map(allocate, range(self.workers)) for code in worker_codes]
+
+        total = self.workers * self.codes_per_worker
+        self.assertEqual(len(set(codes)), total)
+        self.assertEqual(sorted(codes), [f'TRANS/{period}/{str(number).zfill(5)}' for number in range(1, total + 1)])
+
+
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='admin@example.com', password='x', role='admin')
+        for number in range(3):
+            ProductCategory.objects.create(name=f'Category {number}')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_with_metrics(self, url):
+        with CaptureQueriesContext(connection) as context, self.assertLogs('api.requests', 'INFO') as logs:
+            response = self.client.get(url)
+        return response, len(context.captured_queries), logs.records
+
+    def test_server_timing_header_counts_the_queries(self):
+        response, queries, records = self.get_with_metrics('/api/products/categories')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(
+            response['Server-Timing'],
+            rf'^db;dur=[\d.]+;desc="{queries} queries", serialize;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        self.assertEqual(records[0].queries, queries)
+        self.assertEqual(records[0].status, 200)
+        self.assertEqual(records[0].response_bytes, len(response.content))
+
+    @override_settings(REQUEST_METRICS_QUERY_THRESHOLD=0)
+    def test_requests_over_the_threshold_log_fingerprints(self):
+        _, queries, records = self.get_with_metrics('/api/products/categories')
+
+        warning = next(record for record in records if record.levelno == logging.WARNING)
+        self.assertEqual(warning.queries, queries)
+        self.assertEqual(sum(entry['count'] for entry in warning.fingerprints), queries)
+
+    def test_json_formatter_includes_extra_fields(self):
+        _, queries, records = self.get_with_metrics('/api/products/categories')
+
+        entry = json.loads(JsonFormatter().format(records[0]))
+        self.assertEqual(entry['logger'], 'api.requests')
+        self.assertEqual(entry['queries'], queries)
+        self.assertEqual(entry['path'], '/api/products/categories')
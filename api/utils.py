@@ -1,8 +1,27 @@
+from django.db import transaction
 from rest_framework.response import Response
 
 from .serializers import HttpErrorBodySerializer, HttpResponseBodySerializer
 
 
+def invalidate_now_and_on_commit(invalidate, *args):
+    """
+    Calls a cache invalidation function now and again once the current
+    transaction commits. The second call covers another worker re-caching
+    the old row while the transaction was still open; outside a transaction
+    both happen straight away.
+    """
+    invalidate(*args)
+    transaction.on_commit(lambda: invalidate(*args))
+
+
+class Echo:
+    """An object that implements just the write method of the file-like interface."""
+
+    def write(self, value):
+        return value
+
+
 def api_response(
     status: int,
     success: bool,
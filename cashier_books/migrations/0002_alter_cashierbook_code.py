@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cashier_books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cashierbook',
+            name='code',
+            field=models.CharField(max_length=24, unique=True),
+        ),
+    ]
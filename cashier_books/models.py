@@ -1,14 +1,14 @@
 import uuid
-from datetime import datetime
 
 from django.db import models
 
+from api.sequences import next_document_code
 from users.models import User
 
 
 class CashierBook(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    code = models.CharField(max_length=20, unique=True)
+    code = models.CharField(max_length=24, unique=True)
     cashier = models.ForeignKey(User, on_delete=models.PROTECT, related_name='cashier_books')
     cash_drawer = models.BigIntegerField()
     time_open = models.DateTimeField(auto_now_add=True)
@@ -24,5 +24,5 @@ class CashierBook(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.code:
-            self.code = f"C-BOOK/{datetime.now().strftime('%Y%m%d')}/{self.id.hex[:4]}"
+            self.code = next_document_code('C-BOOK')
         super().save(*args, **kwargs)
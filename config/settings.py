@@ -49,8 +49,10 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_extensions',
     'corsheaders',
+    'api',
     'users',
     'suppliers',
     'products',
@@ -79,6 +81,7 @@ STORAGES = {
           "credentials": service_account.Credentials.from_service_account_info(
             json.loads(os.environ.get('GCS_KEY_JSON'))
           ) if os.environ.get('GCS_KEY_JSON') else None,
+          "blob_chunk_size": 1024 * 1024 * 8,
         },
     },
     "staticfiles": {
@@ -86,7 +89,86 @@ STORAGES = {
     },
 }
 
+# Cache
+# Set REDIS_URL (requires the redis package) to share cached data and its
+# invalidation across workers; otherwise each process keeps its own cache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL'),
+    } if os.environ.get('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds the immutable part of coupons stays cached (also invalidated on save)
+COUPON_CACHE_TIMEOUT = int(os.environ.get('COUPON_CACHE_TIMEOUT', 300))
+
+# Seconds a process trusts its copy of the store profile before checking the
+# shared cache for changes made by other workers
+STORE_PROFILE_LOCAL_TTL = int(os.environ.get('STORE_PROFILE_LOCAL_TTL', 30))
+
+# Receipts: characters per line (48 fits 80 mm paper, 32 fits 58 mm) and
+# seconds a rendered receipt stays cached for reprints
+RECEIPT_LINE_WIDTH = int(os.environ.get('RECEIPT_LINE_WIDTH', 48))
+RECEIPT_CACHE_TIMEOUT = int(os.environ.get('RECEIPT_CACHE_TIMEOUT', 86400))
+
+# Hours a stored Idempotency-Key response is replayed before it can be purged
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+# Reorder point scanner: sales window used for velocity, supplier lead time,
+# safety stock and how many days of sales a suggested order should cover
+REORDER_VELOCITY_WINDOW_DAYS = int(os.environ.get('REORDER_VELOCITY_WINDOW_DAYS', 28))
+REORDER_LEAD_TIME_DAYS = int(os.environ.get('REORDER_LEAD_TIME_DAYS', 7))
+REORDER_SAFETY_DAYS = int(os.environ.get('REORDER_SAFETY_DAYS', 3))
+REORDER_COVER_DAYS = int(os.environ.get('REORDER_COVER_DAYS', 14))
+
+# Trace peak Python memory of each report export with tracemalloc (adds
+# overhead, so leave off unless investigating an export)
+EXPORT_TRACE_MEMORY = os.environ.get('EXPORT_TRACE_MEMORY', 'False') == 'True'
+
+# Per-request metrics (api.middleware): query count, DB time, serialization
+# time and response size are logged to "api.requests" and, optionally, sent
+# as a Server-Timing header. Requests over either threshold also log their
+# most frequent SQL fingerprints.
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'True') == 'True'
+REQUEST_METRICS_SERVER_TIMING = os.environ.get('REQUEST_METRICS_SERVER_TIMING', 'True') == 'True'
+REQUEST_METRICS_QUERY_THRESHOLD = int(os.environ.get('REQUEST_METRICS_QUERY_THRESHOLD', 30))
+REQUEST_METRICS_DB_THRESHOLD_MS = float(os.environ.get('REQUEST_METRICS_DB_THRESHOLD_MS', 500))
+
+# Request metrics and export timings are logged as one JSON object per line,
+# their numbers as separate fields (api.log_format); METRICS_LOG_LEVEL=WARNING
+# keeps only the slow-request fingerprints
+METRICS_LOG_LEVEL = os.environ.get('METRICS_LOG_LEVEL', 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'api.log_format.JsonFormatter'},
+    },
+    'handlers': {
+        'metrics': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'loggers': {
+        'api.requests': {'handlers': ['metrics'], 'level': METRICS_LOG_LEVEL, 'propagate': False},
+        'transactions.exports': {'handlers': ['metrics'], 'level': METRICS_LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# Threads per process building period-close exports in the background; 0
+# leaves them to `python manage.py run_period_close_exports`
+PERIOD_CLOSE_WORKERS = int(os.environ.get('PERIOD_CLOSE_WORKERS', 1))
+# Seconds after which a running period-close export is presumed abandoned (its
+# worker died) and the management command queues it again; keep it above the
+# time the largest export takes
+PERIOD_CLOSE_STALE_AFTER = int(os.environ.get('PERIOD_CLOSE_STALE_AFTER', 3600))
+
+# Number of threads used to push product images to storage concurrently
+PRODUCT_IMAGE_UPLOAD_WORKERS = int(os.environ.get('PRODUCT_IMAGE_UPLOAD_WORKERS', 4))
+
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -136,6 +218,11 @@ DATABASES = {
     }
 }
 
+# A second connection to the same database for document numbers
+# (api.sequences): the counter is committed on its own, so its row lock is
+# not held for the rest of a checkout
+DATABASES['sequences'] = {**DATABASES['default']}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -20,3 +20,10 @@ class CouponCode(models.Model):
 
     def __str__(self):
         return self.code
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored code so cache entries can be invalidated when it is edited
+        instance._loaded_code = instance.__dict__.get('code')
+        return instance
@@ -1,7 +1,9 @@
+from django.core.validators import RegexValidator
 from rest_framework import serializers
 
 from coupons.models.coupon import Coupon
 from coupons.models.coupon_code import CouponCode
+from coupons.services.code_generator import DEFAULT_CHARSET
 
 
 class CouponCodeSerializer(serializers.ModelSerializer):
@@ -17,3 +19,38 @@ class CouponCodeSerializer(serializers.ModelSerializer):
             if value < self.instance.used:
                 raise serializers.ValidationError("Stock cannot be less than the number of times used.")
         return value
+
+
+class CouponCodeGenerateSerializer(serializers.Serializer):
+    prefix = serializers.CharField(
+        max_length=32,
+        required=False,
+        allow_blank=True,
+        default='',
+        validators=[RegexValidator(r'^[a-zA-Z0-9_-]*$', 'Only alphanumeric characters, dashes and underscores are allowed for prefix.')]
+    )
+    count = serializers.IntegerField(min_value=1, max_value=100000)
+    stock = serializers.IntegerField(min_value=1, required=False, default=1)
+    charset = serializers.CharField(
+        min_length=2,
+        max_length=62,
+        required=False,
+        default=DEFAULT_CHARSET,
+        validators=[RegexValidator(r'^[a-zA-Z0-9]+$', 'Only alphanumeric characters are allowed for charset.')]
+    )
+    length = serializers.IntegerField(min_value=4, max_value=32, required=False, default=8)
+    output = serializers.ChoiceField(choices=['json', 'csv'], required=False, default='json')
+
+    def validate_charset(self, value):
+        return ''.join(dict.fromkeys(value))
+
+    def validate(self, attrs):
+        if len(attrs['prefix']) + attrs['length'] > CouponCode._meta.get_field('code').max_length:
+            raise serializers.ValidationError("Prefix and code length are too long.")
+
+        # Keep the code space well above the requested count so random
+        # collisions stay rare.
+        if len(attrs['charset']) ** attrs['length'] < attrs['count'] * 100:
+            raise serializers.ValidationError("Code space is too small for this count. Use a longer code or a larger charset.")
+
+        return attrs
@@ -0,0 +1,80 @@
+import secrets
+
+from django.db import IntegrityError, transaction
+
+from coupons.models.coupon_code import CouponCode
+
+DEFAULT_CHARSET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+GENERATE_CHUNK_SIZE = 1000
+MAX_CHUNK_ATTEMPTS = 5
+
+
+class CodeSpaceExhausted(Exception):
+    """Raised when not enough unused codes can be found for a chunk."""
+
+
+def random_codes(prefix, charset, length, count, exclude):
+    """
+    Returns a set of `count` random codes that are not in `exclude`.
+    """
+    codes = set()
+    attempts = 0
+    while len(codes) < count:
+        attempts += 1
+        if attempts > count * 10:
+            raise CodeSpaceExhausted("Could not generate enough unique codes. Use a longer code or a larger charset.")
+        code = prefix + ''.join(secrets.choice(charset) for _ in range(length))
+        if code not in exclude:
+            codes.add(code)
+    return codes
+
+
+def generate_chunk(coupon, prefix, charset, length, count, stock, seen):
+    """
+    Generates and inserts one chunk of unique codes.
+
+    Candidates are checked against the database with a single `__in` query;
+    collisions are replaced and re-checked until the chunk is complete. A
+    unique violation caused by a concurrent insert retries the whole chunk.
+    `seen` holds the codes generated earlier in the run or found taken, and
+    is updated in place.
+    """
+    for _ in range(MAX_CHUNK_ATTEMPTS):
+        codes = random_codes(prefix, charset, length, count, seen)
+        while True:
+            taken = set(CouponCode.objects.filter(code__in=codes).values_list('code', flat=True))
+            if not taken:
+                break
+            codes -= taken
+            seen |= taken
+            codes |= random_codes(prefix, charset, length, len(taken), seen | codes)
+
+        try:
+            with transaction.atomic():
+                CouponCode.objects.bulk_create(
+                    [CouponCode(coupon=coupon, code=code, stock=stock) for code in codes]
+                )
+        except IntegrityError:
+            continue
+
+        seen |= codes
+        return sorted(codes)
+
+    raise CodeSpaceExhausted("Could not insert unique codes after several attempts.")
+
+
+def generate_coupon_codes(coupon, count, stock, prefix='', charset=DEFAULT_CHARSET, length=8):
+    """
+    Generates `count` unique coupon codes for `coupon`, chunk by chunk.
+
+    Yields the list of codes inserted for every chunk as soon as it is
+    committed, so callers can stream the codes and report progress while
+    large batches are still being seen. Each chunk commits on its own,
+    so an interrupted run keeps the codes seen so far.
+    """
+    seen = set()
+    remaining = count
+    while remaining > 0:
+        chunk_size = min(GENERATE_CHUNK_SIZE, remaining)
+        yield generate_chunk(coupon, prefix, charset, length, chunk_size, stock, seen)
+        remaining -= chunk_size
@@ -0,0 +1,56 @@
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from coupons.models.coupon_code import CouponCode
+
+
+def redeem_coupon_code(coupon_code_id, amount):
+    """
+    Atomically marks `amount` uses of a coupon code as used.
+
+    Runs a single conditional UPDATE (used = used + amount WHERE used + amount
+    <= stock AND NOT disabled), so concurrent redemptions can never push a
+    code over its stock. Returns whether the code was redeemed.
+    """
+    return CouponCode.objects.filter(
+        id=coupon_code_id,
+        disabled=False,
+        used__lte=F('stock') - amount,
+    ).update(used=F('used') + amount, updated_at=timezone.now()) == 1
+
+
+def release_coupon_code(coupon_code_id, amount):
+    """
+    Atomically gives back `amount` uses of a coupon code.
+    """
+    CouponCode.objects.filter(id=coupon_code_id).update(
+        used=Greatest(F('used') - amount, Value(0)),
+        updated_at=timezone.now(),
+    )
+
+
+def apply_coupon_usage(deltas):
+    """
+    Redeems (positive) and releases (negative) uses of several coupon codes
+    in one UPDATE.
+
+    `deltas` maps coupon code ids to amounts. Every redemption carries the
+    same guard as redeem_coupon_code, releases never take `used` below zero.
+    Returns whether every code was updated; when not, some redemption failed
+    and the caller's transaction must be rolled back.
+    """
+    deltas = {coupon_code_id: amount for coupon_code_id, amount in deltas.items() if amount}
+    if not deltas:
+        return True
+
+    delta = Case(
+        *[When(id=coupon_code_id, then=Value(amount)) for coupon_code_id, amount in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    released = [coupon_code_id for coupon_code_id, amount in deltas.items() if amount < 0]
+    updated = CouponCode.objects.filter(id__in=deltas).filter(
+        Q(id__in=released) | Q(disabled=False, used__lte=F('stock') - delta)
+    ).update(used=Greatest(F('used') + delta, Value(0)), updated_at=timezone.now())
+    return updated == len(deltas)
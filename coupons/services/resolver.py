@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from coupons.models.coupon import Coupon
+from coupons.models.coupon_code import CouponCode
+
+COUPON_KEY = 'coupons:coupon:{}'
+COUPON_CODE_KEY = 'coupons:code:{}'
+
+# `used` changes on every redemption, so it is never cached
+CODE_FIELDS = [field.attname for field in CouponCode._meta.concrete_fields if field.attname != 'used']
+COUPON_FIELDS = [field.attname for field in Coupon._meta.concrete_fields]
+
+
+def dump(instance, field_names):
+    return tuple(getattr(instance, name) for name in field_names)
+
+
+def load(model, field_names, values):
+    return model.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+
+def resolve_coupon_codes(codes, fresh_usage=True):
+    """
+    Resolves many coupon codes at once and returns a {code: CouponCode} map.
+
+    The code rows (stock, disabled) and their campaigns (type, value, time
+    window, disabled) are served from the cache and loaded with one query for
+    the codes that miss. The mutable `used` counter is never cached: with
+    `fresh_usage` it is read for all codes in a single query, otherwise it is
+    left unset for callers that redeem with a conditional UPDATE. Unknown
+    codes are omitted from the result.
+    """
+    codes = list(dict.fromkeys(codes))
+    if not codes:
+        return {}
+
+    cached_codes = cache.get_many([COUPON_CODE_KEY.format(code) for code in codes])
+    resolved = {}
+    for code in codes:
+        values = cached_codes.get(COUPON_CODE_KEY.format(code))
+        if values is not None:
+            resolved[code] = load(CouponCode, CODE_FIELDS, values)
+
+    coupons = {}
+    missing_codes = [code for code in codes if code not in resolved]
+    if missing_codes:
+        to_cache = {}
+        for coupon_code in CouponCode.objects.select_related('coupon').filter(code__in=missing_codes):
+            resolved[coupon_code.code] = coupon_code
+            coupons[coupon_code.coupon_id] = coupon_code.coupon
+            to_cache[COUPON_CODE_KEY.format(coupon_code.code)] = dump(coupon_code, CODE_FIELDS)
+            to_cache[COUPON_KEY.format(coupon_code.coupon_id)] = dump(coupon_code.coupon, COUPON_FIELDS)
+        cache.set_many(to_cache, settings.COUPON_CACHE_TIMEOUT)
+
+    coupon_ids = {coupon_code.coupon_id for coupon_code in resolved.values()} - coupons.keys()
+    if coupon_ids:
+        cached_coupons = cache.get_many([COUPON_KEY.format(coupon_id) for coupon_id in coupon_ids])
+        for coupon_id in coupon_ids:
+            values = cached_coupons.get(COUPON_KEY.format(coupon_id))
+            if values is not None:
+                coupons[coupon_id] = load(Coupon, COUPON_FIELDS, values)
+
+        missing_ids = coupon_ids - coupons.keys()
+        if missing_ids:
+            to_cache = {}
+            for coupon in Coupon.objects.filter(id__in=missing_ids):
+                coupons[coupon.id] = coupon
+                to_cache[COUPON_KEY.format(coupon.id)] = dump(coupon, COUPON_FIELDS)
+            cache.set_many(to_cache, settings.COUPON_CACHE_TIMEOUT)
+
+    for code, coupon_code in list(resolved.items()):
+        if coupon_code.coupon_id not in coupons:
+            # The campaign was deleted after the code was cached
+            del resolved[code]
+            continue
+        coupon_code.coupon = coupons[coupon_code.coupon_id]
+
+    if fresh_usage:
+        usage = dict(CouponCode.objects.filter(id__in=[c.id for c in resolved.values()]).values_list('id', 'used'))
+        for code, coupon_code in list(resolved.items()):
+            if coupon_code.id not in usage:
+                # Deleted since it was cached
+                del resolved[code]
+                continue
+            coupon_code.used = usage[coupon_code.id]
+
+    return resolved
+
+
+def resolve_coupon_code(code, fresh_usage=True):
+    """
+    Resolves a single coupon code, or returns None if it does not exist.
+    """
+    return resolve_coupon_codes([code], fresh_usage=fresh_usage).get(code)
+
+
+def invalidate_coupon(coupon_id):
+    cache.delete(COUPON_KEY.format(coupon_id))
+
+
+def invalidate_coupon_codes(codes):
+    cache.delete_many([COUPON_CODE_KEY.format(code) for code in codes if code])
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.utils import invalidate_now_and_on_commit
+from coupons.models.coupon import Coupon
+from coupons.models.coupon_code import CouponCode
+from coupons.services.resolver import invalidate_coupon, invalidate_coupon_codes
+
+
+@receiver([post_save, post_delete], sender=Coupon)
+def invalidate_cached_coupon(sender, instance, **kwargs):
+    invalidate_now_and_on_commit(invalidate_coupon, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CouponCode)
+def invalidate_cached_coupon_code(sender, instance, **kwargs):
+    # The code itself can be edited, so drop the key it was loaded under too
+    invalidate_now_and_on_commit(invalidate_coupon_codes, {instance.code, getattr(instance, '_loaded_code', None)})
+    instance._loaded_code = instance.code
@@ -1,2 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from coupons.models.coupon import Coupon
+from coupons.models.coupon_code import CouponCode
+from coupons.services.redemption import apply_coupon_usage, redeem_coupon_code, release_coupon_code
+
+
+def create_coupon_code(stock):
+    now = timezone.now()
+    coupon = Coupon.objects.create(
+        name='Voucher',
+        type='voucher',
+        voucher_value=500,
+        start_time=now - timezone.timedelta(days=1),
+        end_time=now + timezone.timedelta(days=1),
+    )
+    return CouponCode.objects.create(coupon=coupon, code=f'VOUCHER{CouponCode.objects.count() + 1}', stock=stock)
+
+
+class RedeemCouponCodeTests(TestCase):
+    def test_redeems_up_to_stock(self):
+        coupon_code = create_coupon_code(stock=3)
+
+        self.assertTrue(redeem_coupon_code(coupon_code.id, 2))
+        self.assertFalse(redeem_coupon_code(coupon_code.id, 2))
+        self.assertTrue(redeem_coupon_code(coupon_code.id, 1))
+
+        coupon_code.refresh_from_db()
+        self.assertEqual(coupon_code.used, 3)
+
+    def test_disabled_code_is_not_redeemed(self):
+        coupon_code = create_coupon_code(stock=3)
+        CouponCode.objects.filter(id=coupon_code.id).update(disabled=True)
+
+        self.assertFalse(redeem_coupon_code(coupon_code.id, 1))
+
+    def test_release_never_goes_below_zero(self):
+        coupon_code = create_coupon_code(stock=3)
+        redeem_coupon_code(coupon_code.id, 1)
+
+        release_coupon_code(coupon_code.id, 5)
+
+        coupon_code.refresh_from_db()
+        self.assertEqual(coupon_code.used, 0)
+
+
+class ApplyCouponUsageTests(TestCase):
+    def test_redeems_and_releases_in_one_update(self):
+        redeemed, released = create_coupon_code(stock=5), create_coupon_code(stock=5)
+        redeem_coupon_code(released.id, 3)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(apply_coupon_usage({redeemed.id: 2, released.id: -5}))
+
+        redeemed.refresh_from_db()
+        released.refresh_from_db()
+        self.assertEqual((redeemed.used, released.used), (2, 0))
+
+    def test_reports_a_redemption_over_stock(self):
+        available, exhausted = create_coupon_code(stock=5), create_coupon_code(stock=1)
+
+        self.assertFalse(apply_coupon_usage({available.id: 1, exhausted.id: 2}))
+
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.used, 0)
+
+
+class ConcurrentRedemptionTests(TransactionTestCase):
+    workers = 8
+    attempts = 40
+
+    def test_parallel_redemptions_never_exceed_stock(self):
+        stock = 25
+        coupon_code = create_coupon_code(stock=stock)
+        barrier = Barrier(self.workers)
+
+        def redeem(_):
+            barrier.wait()
+            try:
+                return sum(redeem_coupon_code(coupon_code.id, 1) for _ in range(self.attempts // self.workers))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            redeemed = sum(executor.map(redeem, range(self.workers)))
+
+        coupon_code.refresh_from_db()
+        self.assertEqual(redeemed, stock)
+        self.assertEqual(coupon_code.used, stock)
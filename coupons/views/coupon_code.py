@@ -1,15 +1,21 @@
+import csv
+
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 
 from api.pagination import CustomPagination
-from api.utils import api_response
+from api.utils import Echo, api_response
 from authentication.permissions import IsAdmin, IsCashier
+from coupons.models.coupon import Coupon
 from coupons.models.coupon_code import CouponCode
 from coupons.serializers.coupon import CouponSerializer
-from coupons.serializers.coupon_code import CouponCodeSerializer
+from coupons.serializers.coupon_code import CouponCodeGenerateSerializer, CouponCodeSerializer
+from coupons.services.code_generator import CodeSpaceExhausted, generate_coupon_codes
+from coupons.services.resolver import resolve_coupon_code
 
 
 class CouponCodeViewSet(viewsets.ModelViewSet):
@@ -30,7 +36,9 @@ class CouponCodeViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'], url_path='usage')
     def check_usage(self, request, code=None):
-        instance = self.get_object()
+        instance = resolve_coupon_code(code)
+        if instance is None:
+            return api_response(404, False, "Coupon code not found")
         
         can_use = True
         now = timezone.now()
@@ -52,6 +60,66 @@ class CouponCodeViewSet(viewsets.ModelViewSet):
 
         return api_response(200, True, "Check usage success", data)
 
+    def get_permissions(self):
+        if self.action == 'generate':
+            return [IsAuthenticated(), IsAdmin()]
+        return super().get_permissions()
+
+    def generate(self, request, pk=None):
+        try:
+            coupon = Coupon.objects.get(pk=pk)
+        except Coupon.DoesNotExist:
+            return api_response(404, False, "Coupon not found")
+
+        serializer = CouponCodeGenerateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+        chunks = generate_coupon_codes(
+            coupon,
+            count=options['count'],
+            stock=options['stock'],
+            prefix=options['prefix'],
+            charset=options['charset'],
+            length=options['length'],
+        )
+
+        if options['output'] == 'csv':
+            # The first chunk is generated before the stream opens, so a code
+            # space that is already too small still gets a 409.
+            try:
+                first_codes = next(chunks, [])
+            except CodeSpaceExhausted as e:
+                return api_response(409, False, str(e), {'coupon_id': coupon.id, 'generated': 0})
+
+            # Codes are streamed as each chunk is committed; X-Total-Count lets
+            # clients show progress against the rows received so far.
+            writer = csv.writer(Echo())
+
+            def rows():
+                yield writer.writerow(['code', 'stock'])
+                yield ''.join(writer.writerow([code, options['stock']]) for code in first_codes)
+                try:
+                    for codes in chunks:
+                        yield ''.join(writer.writerow([code, options['stock']]) for code in codes)
+                except CodeSpaceExhausted as e:
+                    # Headers are already sent; end with an error row that
+                    # clients can tell apart from a code
+                    yield writer.writerow(['ERROR', str(e)])
+
+            response = StreamingHttpResponse(rows(), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="coupon_codes_{timezone.now().strftime("%Y%m%d%H%M%S")}.csv"'
+            response['X-Total-Count'] = str(options['count'])
+            return response
+
+        generated = 0
+        try:
+            for codes in chunks:
+                generated += len(codes)
+        except CodeSpaceExhausted as e:
+            return api_response(409, False, str(e), {'coupon_id': coupon.id, 'generated': generated})
+
+        return api_response(201, True, "Coupon codes generated successfully", {'coupon_id': coupon.id, 'generated': generated})
+
     def get_queryset(self):
         queryset = super().get_queryset()
         
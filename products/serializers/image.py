@@ -1,9 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from products.models.image import ProductImage
 from products.models.product import Product
 
 
+def upload_images_to_storage(product_images):
+    """
+    Uploads the files of unsaved ProductImage instances concurrently.
+
+    Each upload runs on a bounded thread pool so the total latency approaches
+    that of the slowest file. Uploaded files are passed to the storage as file
+    objects, so large (temporary file backed) uploads are streamed in chunks
+    rather than read into memory. If any upload fails, the files that already
+    made it to the storage are removed and the error is re-raised.
+    """
+    field = ProductImage._meta.get_field('filename')
+    storage = field.storage
+
+    def upload(product_image):
+        content = product_image.filename.file
+        name = field.generate_filename(product_image, content.name)
+        return storage.save(name, content, max_length=field.max_length)
+
+    workers = max(1, min(settings.PRODUCT_IMAGE_UPLOAD_WORKERS, len(product_images)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(upload, product_image) for product_image in product_images]
+
+    saved_names = [future.result() for future in futures if not future.exception()]
+    errors = [future.exception() for future in futures if future.exception()]
+    if errors:
+        delete_images_from_storage(saved_names)
+        raise errors[0]
+
+    for product_image, name in zip(product_images, saved_names, strict=True):
+        # Assigning the stored name marks the file as committed, so the model
+        # field does not upload it again during bulk_create.
+        product_image.filename = name
+
+    return saved_names
+
+
+def delete_images_from_storage(names):
+    """
+    Removes uploaded files that no longer have a database row pointing at them.
+    """
+    storage = ProductImage._meta.get_field('filename').storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            pass
+
+
+def reorder_product_images(product_id, image_ids=None):
+    """
+    Renumbers the images of a product following the given order of image IDs,
+    or closing gaps in the current order when `image_ids` is None.
+
+    Must run inside a transaction: the product's images are locked first and
+    `image_ids` is checked against them, so images added or deleted
+    concurrently raise a ValidationError instead of being skipped. Only
+    images whose position actually changed are written, in a single
+    bulk_update.
+    """
+    images = {
+        image.id: image
+        for image in ProductImage.objects.select_for_update().filter(product_id=product_id).order_by('id')
+    }
+    if image_ids is None:
+        image_ids = sorted(images, key=lambda image_id: images[image_id].order_number)
+    elif set(image_ids) != set(images):
+        raise serializers.ValidationError({'image_ids': 'Image IDs must list every image of the product exactly once'})
+
+    now = timezone.now()
+    changed_images = []
+    for order_number, image_id in enumerate(image_ids):
+        image = images[image_id]
+        if image.order_number != order_number:
+            image.order_number = order_number
+            image.updated_at = now
+            changed_images.append(image)
+
+    if changed_images:
+        ProductImage.objects.bulk_update(changed_images, ['order_number', 'updated_at'])
+
+    return sorted(images.values(), key=lambda image: image.order_number)
+
+
 class ProductImageSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(required=True, source='filename')
 
@@ -53,4 +141,33 @@ class ProductImageBulkSerializer(serializers.Serializer):
             ) for i, image in enumerate(images)
         ]
 
-        return ProductImage.objects.bulk_create(product_images)
+        saved_names = upload_images_to_storage(product_images)
+        try:
+            with transaction.atomic():
+                return ProductImage.objects.bulk_create(product_images)
+        except Exception:
+            delete_images_from_storage(saved_names)
+            raise
+
+
+class ProductImageReorderSerializer(serializers.Serializer):
+    product_id = serializers.UUIDField(required=True)
+    image_ids = serializers.ListField(child=serializers.UUIDField(), max_length=10, required=True)
+
+    def validate(self, attrs):
+        product_id = attrs.get('product_id')
+        image_ids = attrs.get('image_ids')
+
+        if not Product.objects.filter(id=product_id).exists():
+            raise serializers.ValidationError({'product_id': 'Product not found'})
+
+        if len(set(image_ids)) != len(image_ids):
+            raise serializers.ValidationError({'image_ids': 'Image IDs must be unique'})
+
+        # Whether the IDs match the product's images is checked in save(),
+        # once the images are locked.
+        return attrs
+
+    def save(self):
+        with transaction.atomic():
+            return reorder_product_images(self.validated_data['product_id'], self.validated_data['image_ids'])
@@ -102,6 +102,16 @@ class ProductSerializer(serializers.ModelSerializer):
         return representation
 
 
+class ProductImportSerializer(serializers.Serializer):
+    file = serializers.FileField(required=True)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith(('.csv', '.xlsx')):
+            raise serializers.ValidationError("Only .csv and .xlsx files are supported.")
+        return value
+
+
 class ProductSingleSKUSerializer(serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(
         queryset=ProductCategory.objects.all(),
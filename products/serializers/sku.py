@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from products.models.product import Product
@@ -68,3 +70,74 @@ class ProductSKUListSerializer(serializers.ModelSerializer):
 
     def get_sku(self, obj):
         return ProductSKUSerializer(obj).data
+
+
+class ProductSKUBulkUpdateItemSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=50)
+    price = serializers.IntegerField(required=False, min_value=0)
+    stock = serializers.IntegerField(required=False, min_value=0)
+    supplier_discount = serializers.FloatField(required=False, allow_null=True, min_value=0, max_value=100)
+
+
+class ProductSKUBulkUpdateSerializer(serializers.Serializer):
+    """
+    Applies price, stock and supplier discount changes to many SKUs at once.
+
+    Price lives on the product, so it is applied to the product of the given
+    SKU. SKUs are resolved and written in chunks with bulk_update, inside a
+    single transaction. Unknown SKUs are skipped and reported back.
+    """
+    CHUNK_SIZE = 1000
+
+    items = serializers.ListField(child=ProductSKUBulkUpdateItemSerializer(), allow_empty=False, max_length=10000)
+
+    def validate_items(self, value):
+        skus = [item['sku'] for item in value]
+        if len(set(skus)) != len(skus):
+            raise serializers.ValidationError("Each SKU can only appear once.")
+        return value
+
+    def save(self):
+        items = self.validated_data['items']
+        now = timezone.now()
+        not_found = []
+        updated_skus = 0
+        product_prices = {}
+
+        with transaction.atomic():
+            for start in range(0, len(items), self.CHUNK_SIZE):
+                chunk = items[start:start + self.CHUNK_SIZE]
+                product_skus = ProductSKU.objects.filter(sku__in=[item['sku'] for item in chunk]).only('id', 'sku', 'product_id').in_bulk(field_name='sku')
+
+                # Group SKUs by the set of fields they change so untouched
+                # columns (e.g. stock) are never overwritten with stale values.
+                updates = {}
+                for item in chunk:
+                    product_sku = product_skus.get(item['sku'])
+                    if product_sku is None:
+                        not_found.append(item['sku'])
+                        continue
+
+                    if 'price' in item:
+                        product_prices[product_sku.product_id] = item['price']
+
+                    fields = tuple(field for field in ('stock', 'supplier_discount') if field in item)
+                    if fields:
+                        for field in fields:
+                            setattr(product_sku, field, item[field])
+                        product_sku.updated_at = now
+                        updates.setdefault(fields, []).append(product_sku)
+
+                for fields, objs in updates.items():
+                    ProductSKU.objects.bulk_update(objs, [*fields, 'updated_at'])
+                    updated_skus += len(objs)
+
+            products = [Product(id=product_id, price=price, updated_at=now) for product_id, price in product_prices.items()]
+            Product.objects.bulk_update(products, ['price', 'updated_at'], batch_size=self.CHUNK_SIZE)
+
+        return {
+            'received': len(items),
+            'updated_skus': updated_skus,
+            'updated_products': len(products),
+            'not_found': not_found,
+        }
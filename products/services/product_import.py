@@ -0,0 +1,281 @@
+import csv
+import io
+import re
+import zipfile
+from itertools import islice
+
+import openpyxl
+from django.db import transaction
+from openpyxl.utils.exceptions import InvalidFileException
+
+from products.models.category import ProductCategory
+from products.models.product import Product
+from products.models.sku import ProductSKU
+from purchase_orders.models.purchase_order import PurchaseOrderPaymentOption
+from suppliers.models.supplier import Supplier
+
+IMPORT_CHUNK_SIZE = 1000
+
+SKU_PATTERN = re.compile(r'^[a-zA-Z0-9]+$')
+SKU_MAX_LENGTH = ProductSKU._meta.get_field('sku').max_length
+NAME_MAX_LENGTH = Product._meta.get_field('name').max_length
+
+PRODUCT_UPDATE_FIELDS = ['name', 'description', 'price', 'category', 'updated_at']
+SKU_UPDATE_FIELDS = ['product', 'supplier', 'stock', 'payment_option', 'supplier_discount', 'updated_at']
+
+
+class ImportFileError(Exception):
+    """Raised when the uploaded file cannot be read as a catalogue."""
+
+
+def read_csv_rows(file):
+    reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    try:
+        yield from reader
+    except UnicodeDecodeError:
+        raise ImportFileError("The CSV file must be UTF-8 encoded.") from None
+    except csv.Error as e:
+        raise ImportFileError(f"The CSV file could not be read: {e}") from None
+
+
+def read_xlsx_rows(file):
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError):
+        raise ImportFileError("The file is not a valid .xlsx workbook.") from None
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(file):
+    """
+    Streams (row_number, row_dict) pairs from a CSV or XLSX upload.
+
+    Header names are lower-cased and stripped; row numbers follow the
+    spreadsheet numbering, so the first data row is row 2.
+    """
+    filename = file.name.lower()
+    if filename.endswith('.csv'):
+        rows = read_csv_rows(file)
+    elif filename.endswith('.xlsx'):
+        rows = read_xlsx_rows(file)
+    else:
+        raise ImportFileError("Only .csv and .xlsx files are supported.")
+
+    header = next(rows, None)
+    if not header:
+        raise ImportFileError("The file is empty.")
+
+    columns = [str(column).strip().lower() if column is not None else '' for column in header]
+    if 'sku' not in columns:
+        raise ImportFileError("The file must have a 'sku' column.")
+
+    for row_number, values in enumerate(rows, 2):
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield row_number, dict(zip(columns, values, strict=False))
+
+
+def clean_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def clean_int(value, field, errors, min_value=None):
+    value = clean_text(value)
+    if value == '':
+        return None
+    try:
+        number = int(float(value))
+    except ValueError:
+        errors.append(f"{field}: A valid integer is required.")
+        return None
+    if min_value is not None and number < min_value:
+        errors.append(f"{field}: Ensure this value is greater than or equal to {min_value}.")
+        return None
+    return number
+
+
+def clean_discount(value, errors):
+    value = clean_text(value)
+    if value == '':
+        return None
+    try:
+        discount = float(value)
+    except ValueError:
+        errors.append("supplier_discount: A valid number is required.")
+        return None
+    if not 0 <= discount <= 100:
+        errors.append("supplier_discount: Ensure this value is between 0 and 100.")
+        return None
+    return discount
+
+
+class ProductImporter:
+    """
+    Imports a product catalogue, one SKU per row.
+
+    Rows are read lazily from the upload and processed in chunks of
+    IMPORT_CHUNK_SIZE. For each chunk the existing SKUs are fetched in one
+    query, categories and suppliers are resolved from maps built once per
+    import, and products and SKUs are written with a single upserting
+    bulk_create each.
+
+    Supported columns: sku (required), name, description, price, category
+    (name), supplier (code or name), payment_option, supplier_discount, stock
+    and product. For existing SKUs, blank cells keep the current value.
+
+    A new SKU creates a new product and requires a name, unless its product
+    cell names the product it is a variant of: either the SKU of a variant
+    already in the catalogue, or any label shared by rows of the same file,
+    in which case the first such row creates the product and the rest join
+    it.
+    """
+
+    def __init__(self, file, dry_run=False):
+        self.file = file
+        self.dry_run = dry_run
+        self.categories = {}
+        self.suppliers = {}
+        self.seen_skus = set()
+        # New products by the product label that created them
+        self.grouped_products = {}
+        self.report = {
+            'dry_run': dry_run,
+            'total_rows': 0,
+            'created': 0,
+            'updated': 0,
+            'failed': 0,
+            'errors': [],
+        }
+
+    def run(self):
+        self.categories = {name.lower(): pk for pk, name in ProductCategory.objects.values_list('id', 'name')}
+        for pk, code, name in Supplier.objects.filter(is_deleted=False).values_list('id', 'code', 'name'):
+            self.suppliers.setdefault(name.lower(), pk)
+            self.suppliers[code.lower()] = pk
+
+        rows = read_rows(self.file)
+        with transaction.atomic():
+            while chunk := list(islice(rows, IMPORT_CHUNK_SIZE)):
+                self.import_chunk(chunk)
+            if self.dry_run:
+                transaction.set_rollback(True)
+
+        return self.report
+
+    def import_chunk(self, chunk):
+        skus = [clean_text(row.get('sku')) for _, row in chunk]
+        groups = [clean_text(row.get('product')) for _, row in chunk]
+        existing_skus = {}
+        shared_products = {}
+        for product_sku in ProductSKU.objects.select_related('product').filter(sku__in={*skus, *groups} - {''}):
+            # Rows of SKUs sharing a product edit one Product instance, so
+            # every row's changes reach the upsert, not only the last one's.
+            product_sku.product = shared_products.setdefault(product_sku.product_id, product_sku.product)
+            existing_skus[product_sku.sku] = product_sku
+
+        products = {}
+        product_skus = []
+        for (row_number, row), sku, group in zip(chunk, skus, groups, strict=True):
+            self.report['total_rows'] += 1
+            errors = []
+            group_product = self.grouped_products.get(group)
+            if group_product is None and group in existing_skus:
+                group_product = existing_skus[group].product
+            product_sku = self.build_row(row, sku, existing_skus.get(sku), group_product, errors)
+            if errors:
+                self.report['failed'] += 1
+                self.report['errors'].append({'row': row_number, 'sku': sku, 'errors': errors})
+                continue
+
+            if group and group_product is None and sku not in existing_skus:
+                self.grouped_products[group] = product_sku.product
+            self.seen_skus.add(sku)
+            self.report['updated' if sku in existing_skus else 'created'] += 1
+            products[product_sku.product.pk] = product_sku.product
+            product_skus.append(product_sku)
+
+        if product_skus:
+            Product.objects.bulk_create(
+                products.values(),
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=PRODUCT_UPDATE_FIELDS,
+            )
+            ProductSKU.objects.bulk_create(
+                product_skus,
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=SKU_UPDATE_FIELDS,
+            )
+
+    def build_row(self, row, sku, product_sku, group_product, errors):
+        if not sku:
+            errors.append("sku: This field is required.")
+        elif len(sku) > SKU_MAX_LENGTH:
+            errors.append(f"sku: Ensure this field has no more than {SKU_MAX_LENGTH} characters.")
+        elif not SKU_PATTERN.match(sku):
+            errors.append("sku: Only alphanumeric characters are allowed for SKU.")
+        elif sku in self.seen_skus:
+            errors.append("sku: Duplicate SKU in file.")
+
+        name = clean_text(row.get('name'))
+        if len(name) > NAME_MAX_LENGTH:
+            errors.append(f"name: Ensure this field has no more than {NAME_MAX_LENGTH} characters.")
+        elif not name and product_sku is None and group_product is None:
+            errors.append("name: This field is required for new SKUs of new products.")
+
+        description = clean_text(row.get('description'))
+        price = clean_int(row.get('price'), 'price', errors, min_value=0)
+        stock = clean_int(row.get('stock'), 'stock', errors, min_value=0)
+        supplier_discount = clean_discount(row.get('supplier_discount'), errors)
+
+        category_id = None
+        category = clean_text(row.get('category'))
+        if category:
+            category_id = self.categories.get(category.lower())
+            if category_id is None:
+                errors.append(f"category: Category '{category}' not found.")
+
+        supplier_id = None
+        supplier = clean_text(row.get('supplier'))
+        if supplier:
+            supplier_id = self.suppliers.get(supplier.lower())
+            if supplier_id is None:
+                errors.append(f"supplier: Supplier '{supplier}' not found.")
+
+        payment_option = clean_text(row.get('payment_option')).lower()
+        if payment_option and payment_option not in PurchaseOrderPaymentOption.values:
+            errors.append(f"payment_option: '{payment_option}' is not a valid choice.")
+
+        if errors:
+            return None
+
+        if product_sku is None:
+            product_sku = ProductSKU(sku=sku, product=group_product or Product(description=''))
+        product = product_sku.product
+
+        if name:
+            product.name = name
+        if description:
+            product.description = description
+        if price is not None:
+            product.price = price
+        if category_id:
+            product.category_id = category_id
+        if supplier_id:
+            product_sku.supplier_id = supplier_id
+        if stock is not None:
+            product_sku.stock = stock
+        if payment_option:
+            product_sku.payment_option = payment_option
+        if supplier_discount is not None:
+            product_sku.supplier_discount = supplier_discount
+
+        return product_sku
@@ -0,0 +1,23 @@
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Now
+
+from products.models.sku import ProductSKU
+
+
+def adjust_stock(deltas):
+    """
+    Adds `deltas` ({sku_id: delta}) to ProductSKU.stock in a single UPDATE.
+    Zero deltas are skipped. updated_at is bumped too, as save() would, so
+    the reorder scan sees the change. Returns the number of rows updated.
+    """
+    deltas = {sku_id: delta for sku_id, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+
+    return ProductSKU.objects.filter(id__in=deltas).update(
+        stock=F('stock') + Case(
+            *[When(id=sku_id, then=Value(delta)) for sku_id, delta in deltas.items()],
+            output_field=IntegerField(),
+        ),
+        updated_at=Now(),
+    )
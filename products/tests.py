@@ -1,2 +1,51 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DEFAULT_DB_ALIAS
+from django.test import TestCase
 
-# Create your tests here.
+from api.sequences import sequence_database
+from products.models.category import ProductCategory
+from products.models.product import Product
+from products.models.sku import ProductSKU
+from products.services.product_import import ProductImporter
+from suppliers.models.supplier import Supplier
+
+
+def csv_upload(*lines):
+    return SimpleUploadedFile('products.csv', '\n'.join(lines).encode())
+
+
+class ProductImportGroupingTests(TestCase):
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+
+    @classmethod
+    def setUpTestData(cls):
+        supplier = Supplier.objects.create(name='Supplier', address='Address', phone='0800')
+        product = Product.objects.create(name='Shirt', description='', category=ProductCategory.objects.create(name='Apparel'))
+        ProductSKU.objects.create(product=product, sku='SHIRTS', supplier=supplier)
+        cls.shirt = product
+
+    def test_new_skus_sharing_a_product_label_create_one_product(self):
+        report = ProductImporter(csv_upload(
+            'sku,name,price,product',
+            'MUGRED,Mug,15000,mug',
+            'MUGBLUE,,,mug',
+            'PLATE,Plate,20000,',
+        )).run()
+
+        self.assertEqual(report['created'], 3)
+        self.assertEqual(
+            ProductSKU.objects.get(sku='MUGRED').product_id, ProductSKU.objects.get(sku='MUGBLUE').product_id
+        )
+        self.assertEqual(Product.objects.filter(name='Mug').count(), 1)
+
+    def test_product_cell_can_name_an_existing_variant(self):
+        report = ProductImporter(csv_upload('sku,product', 'SHIRTM,SHIRTS')).run()
+
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(ProductSKU.objects.get(sku='SHIRTM').product, self.shirt)
+
+    def test_new_product_still_needs_a_name(self):
+        report = ProductImporter(csv_upload('sku,product', 'CUPLARGE,cup')).run()
+
+        self.assertEqual(report['failed'], 1)
+        self.assertIn('name: This field is required for new SKUs of new products.', report['errors'][0]['errors'])
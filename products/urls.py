@@ -8,6 +8,7 @@ from products.views.sku import ProductSKUViewSet
 
 urlpatterns = [
     path('/sku', ProductSKUViewSet.as_view({'get': 'list', 'post': 'create'}), name='sku-list'),
+    path('/sku/bulk', ProductSKUViewSet.as_view({'patch': 'bulk_update'}), name='sku-bulk-update'),
     path('/sku/<str:sku>/check', ProductSKUViewSet.as_view({'get': 'check'}), name='sku-check'),
     path('/sku/<str:sku>/stock', ProductSKUViewSet.as_view({'get': 'stock'}), name='sku-stock'),
     path('/sku/<str:sku>', ProductSKUViewSet.as_view({'patch': 'partial_update'}), name='sku-update'),
@@ -15,7 +16,9 @@ urlpatterns = [
     path('/categories', CategoryViewSet.as_view({'get': 'list', 'post': 'create'}), name='category-list'),
     path('/categories/<pk>', CategoryViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update', 'delete': 'destroy'}), name='category-detail'),
     path('/images', ProductImageViewSet.as_view({'post': 'create'}), name='product-image-list'),
+    path('/images/reorder', ProductImageViewSet.as_view({'put': 'reorder'}), name='product-image-reorder'),
     path('/images/<pk>', ProductImageViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update', 'delete': 'destroy'}), name='product-image-detail'),
+    path('/import', ProductViewSet.as_view({'post': 'import_products'}), name='product-import'),
     path('', ProductViewSet.as_view({'get': 'list', 'post': 'create'}), name='product-list'),
     path('/<pk>', ProductViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update', 'delete': 'destroy'}), name='product-detail'),
 ]
@@ -1,10 +1,16 @@
-from rest_framework import permissions, status, viewsets
+from django.db import transaction
+from rest_framework import permissions, serializers, status, viewsets
 from rest_framework.response import Response
 
 from api.utils import api_response
 from authentication.permissions import IsAdmin, IsProcurement
 from products.models.image import ProductImage
-from products.serializers.image import ProductImageBulkSerializer, ProductImageSerializer
+from products.serializers.image import (
+    ProductImageBulkSerializer,
+    ProductImageReorderSerializer,
+    ProductImageSerializer,
+    reorder_product_images,
+)
 
 
 class ProductImageViewSet(viewsets.ModelViewSet):
@@ -16,7 +22,7 @@ class ProductImageViewSet(viewsets.ModelViewSet):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action in ['create', 'partial_update', 'destroy']:
+        if self.action in ['create', 'partial_update', 'destroy', 'reorder']:
             permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsProcurement)]
         else:
             permission_classes = [permissions.AllowAny]
@@ -82,17 +88,45 @@ class ProductImageViewSet(viewsets.ModelViewSet):
         )
         return Response(response_obj.data, status=response_obj.status_code)
 
+    def reorder(self, request, *args, **kwargs):
+        serializer = ProductImageReorderSerializer(data=request.data)
+        if serializer.is_valid():
+            try:
+                images = serializer.save()
+            except serializers.ValidationError as e:
+                response_obj = api_response(
+                    status=status.HTTP_400_BAD_REQUEST,
+                    success=False,
+                    message="Invalid data",
+                    error=e.detail
+                )
+                return Response(response_obj.data, status=response_obj.status_code)
+            response_serializer = ProductImageSerializer(images, many=True, context={'request': request})
+            response_obj = api_response(
+                status=status.HTTP_200_OK,
+                success=True,
+                message="Product images reordered successfully",
+                data=response_serializer.data
+            )
+            return Response(response_obj.data, status=response_obj.status_code)
+        response_obj = api_response(
+            status=status.HTTP_400_BAD_REQUEST,
+            success=False,
+            message="Invalid data",
+            error=serializer.errors
+        )
+        return Response(response_obj.data, status=response_obj.status_code)
+
     def destroy(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
             product_id = instance.product_id
-            self.perform_destroy(instance)
 
-            # Reorder the remaining images
-            remaining_images = ProductImage.objects.filter(product_id=product_id).order_by('order_number')
-            for i, image in enumerate(remaining_images):
-                image.order_number = i
-                image.save()
+            with transaction.atomic():
+                self.perform_destroy(instance)
+
+                # Close the gap left by the removed image
+                reorder_product_images(product_id)
 
             response_obj = api_response(
                 status=status.HTTP_200_OK,
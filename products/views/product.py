@@ -10,7 +10,8 @@ from api.pagination import CustomPagination
 from api.utils import api_response
 from authentication.permissions import IsAdmin, IsProcurement
 from products.models.product import Product
-from products.serializers.product import ProductSerializer
+from products.serializers.product import ProductImportSerializer, ProductSerializer
+from products.services.product_import import ImportFileError, ProductImporter
 
 
 class ProductViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
@@ -24,7 +25,7 @@ class ProductViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action in ['create', 'partial_update', 'destroy']:
+        if self.action in ['create', 'partial_update', 'destroy', 'import_products']:
             permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsProcurement)]
         else:
             permission_classes = [permissions.AllowAny]
@@ -161,3 +162,33 @@ class ProductViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
                 message="Product not found"
             )
             return Response(response_obj.data, status=response_obj.status_code)
+
+    def import_products(self, request, *args, **kwargs):
+        serializer = ProductImportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Invalid data",
+                error=serializer.errors
+            )
+
+        try:
+            report = ProductImporter(
+                serializer.validated_data['file'],
+                dry_run=serializer.validated_data['dry_run']
+            ).run()
+        except ImportFileError as e:
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Invalid file",
+                error=str(e)
+            )
+
+        return api_response(
+            status=status.HTTP_200_OK,
+            success=True,
+            message="Products import validated successfully" if report['dry_run'] else "Products imported successfully",
+            data=report
+        )
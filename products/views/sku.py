@@ -2,7 +2,7 @@ from uuid import UUID
 
 from django.db.models import Q
 from django.http import Http404
-from rest_framework import status, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
@@ -10,8 +10,9 @@ from rest_framework.response import Response
 from api.mixins import CustomPaginationMixin
 from api.pagination import CustomPagination
 from api.utils import api_response
+from authentication.permissions import IsAdmin, IsProcurement
 from products.models.sku import ProductSKU
-from products.serializers.sku import ProductSKUListSerializer, ProductSKUSerializer
+from products.serializers.sku import ProductSKUBulkUpdateSerializer, ProductSKUListSerializer, ProductSKUSerializer
 
 
 class ProductSKUViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
@@ -22,6 +23,16 @@ class ProductSKUViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
     search_fields = ['sku', 'product__name']
     lookup_field = 'sku'
 
+    def get_permissions(self):
+        """
+        Instantiates and returns the list of permissions that this view requires.
+        """
+        if self.action == 'bulk_update':
+            permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsProcurement)]
+        else:
+            permission_classes = self.permission_classes
+        return [permission() for permission in permission_classes]
+
     def get_serializer_class(self):
         if self.action == 'list':
             return ProductSKUListSerializer
@@ -181,3 +192,20 @@ class ProductSKUViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             error=serializer.errors
         )
         return response_obj
+
+    def bulk_update(self, request, *args, **kwargs):
+        serializer = ProductSKUBulkUpdateSerializer(data=request.data)
+        if serializer.is_valid():
+            summary = serializer.save()
+            return api_response(
+                status=status.HTTP_200_OK,
+                success=True,
+                message="SKUs updated successfully",
+                data=summary
+            )
+        return api_response(
+            status=status.HTTP_400_BAD_REQUEST,
+            success=False,
+            message="Invalid data provided for SKU bulk update.",
+            error=serializer.errors
+        )
@@ -1,7 +1,10 @@
 from django.contrib import admin
 
 from purchase_orders.models.po_item import PoItem
+from purchase_orders.models.po_receipt import PoReceipt, PoReceiptItem
+from purchase_orders.models.po_rollup import PoMonthlyRollup
 from purchase_orders.models.purchase_order import PurchaseOrder
+from purchase_orders.models.reorder import ReorderScan, SkuReorderPoint
 
 
 @admin.register(PurchaseOrder)
@@ -12,6 +15,32 @@ class PurchaseOrderAdmin(admin.ModelAdmin):
 
 @admin.register(PoItem)
 class PoItemAdmin(admin.ModelAdmin):
-    list_display = ("id", "purchase_order", "product_sku", "price", "amounts", "supplier_discount")
+    list_display = ("id", "purchase_order", "product_sku", "price", "amounts", "received_amounts", "supplier_discount")
     list_filter = ("purchase_order", "product_sku")
     search_fields = ("id", "purchase_order__code", "product_sku__sku")
+
+class PoReceiptItemInline(admin.TabularInline):
+    model = PoReceiptItem
+    extra = 0
+
+@admin.register(PoReceipt)
+class PoReceiptAdmin(admin.ModelAdmin):
+    list_display = ("purchase_order", "received_by", "created_at")
+    search_fields = ("purchase_order__code",)
+    inlines = [PoReceiptItemInline]
+
+@admin.register(PoMonthlyRollup)
+class PoMonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ("month", "supplier", "product_sku", "line_count", "total_amounts", "total_value")
+    list_filter = ("month",)
+    search_fields = ("supplier__name", "product_sku__sku")
+
+@admin.register(SkuReorderPoint)
+class SkuReorderPointAdmin(admin.ModelAdmin):
+    list_display = ("product_sku", "stock", "on_order", "daily_velocity", "reorder_point", "suggested_amounts", "at_risk", "scanned_at")
+    list_filter = ("at_risk",)
+    search_fields = ("product_sku__sku",)
+
+@admin.register(ReorderScan)
+class ReorderScanAdmin(admin.ModelAdmin):
+    list_display = ("started_at", "finished_at", "full", "sku_count")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PurchaseOrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'purchase_orders'
+
+    def ready(self):
+        from purchase_orders import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from purchase_orders.services.analytics import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the monthly purchase order rollup used by the analytics endpoint.'
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} purchase order rollup rows.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from purchase_orders.services.reorder import scan_reorder_points
+
+
+class Command(BaseCommand):
+    help = 'Recomputes reorder points for SKUs with stock movement since the last scan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rescan every SKU, not only those that moved.')
+
+    def handle(self, *args, **options):
+        scan = scan_reorder_points(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Scanned {scan.sku_count} SKUs.'))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:10
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_approved_items_received(apps, schema_editor):
+    # Approval used to book every item into stock, so those items count as received
+    PoItem = apps.get_model('purchase_orders', 'PoItem')
+    PoItem.objects.filter(
+        purchase_order__status__in=['approved', 'completed']
+    ).update(received_amounts=models.F('amounts'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0002_rename_payout_purchaseorder_payment_option'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poitem',
+            name='received_amounts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(mark_approved_items_received, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='PoReceipt',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('note', models.CharField(blank=True, max_length=255, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('purchase_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='purchase_orders.purchaseorder')),
+                ('received_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='po_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'po_receipts',
+            },
+        ),
+        migrations.CreateModel(
+            name='PoReceiptItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('amounts', models.IntegerField()),
+                ('po_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipt_items', to='purchase_orders.poitem')),
+                ('receipt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='purchase_orders.poreceipt')),
+            ],
+            options={
+                'db_table': 'po_receipt_items',
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:13
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# One set-based UPDATE; the expression matches PurchaseOrder.build_search_text.
+FILL_SEARCH_TEXT = """
+UPDATE purchase_orders AS po SET search_text = LOWER(CONCAT_WS(' ',
+    NULLIF(po.code, ''),
+    NULLIF(po.name, ''),
+    NULLIF((SELECT u.name FROM users u WHERE u.id = po.requester_id), ''),
+    NULLIF((SELECT u.name FROM users u WHERE u.id = po.approver_id), ''),
+    NULLIF((SELECT s.name FROM suppliers s WHERE s.id = po.supplier_id), '')
+))
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0003_po_receipts'),
+        ('suppliers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunSQL(FILL_SEARCH_TEXT, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['status', '-updated_at'], name='po_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['requester', '-updated_at'], name='po_requester_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='po_search_text_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
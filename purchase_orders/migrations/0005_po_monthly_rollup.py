@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_rename_partnership_discount_productsku_supplier_discount'),
+        ('purchase_orders', '0004_purchase_order_indexes'),
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PoMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('line_count', models.IntegerField(default=0)),
+                ('total_amounts', models.BigIntegerField(default=0)),
+                ('total_value', models.BigIntegerField(default=0)),
+                ('discount_value', models.FloatField(default=0)),
+                ('product_sku', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='po_rollups', to='products.productsku')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='po_rollups', to='suppliers.supplier')),
+            ],
+            options={
+                'db_table': 'po_monthly_rollups',
+                'indexes': [models.Index(fields=['month', 'supplier'], name='po_rollup_month_supplier_idx')],
+                'constraints': [models.UniqueConstraint(fields=('supplier', 'product_sku', 'month'), name='unique_po_rollup')],
+            },
+        ),
+    ]
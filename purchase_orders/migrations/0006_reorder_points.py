@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:15
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_rename_partnership_discount_productsku_supplier_discount'),
+        ('purchase_orders', '0005_po_monthly_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderScan',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('full', models.BooleanField(default=False)),
+                ('sku_count', models.IntegerField(default=0)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'reorder_scans',
+            },
+        ),
+        migrations.CreateModel(
+            name='SkuReorderPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('daily_velocity', models.FloatField(default=0)),
+                ('stock', models.IntegerField(default=0)),
+                ('on_order', models.IntegerField(default=0)),
+                ('reorder_point', models.IntegerField(default=0)),
+                ('suggested_amounts', models.IntegerField(default=0)),
+                ('days_of_cover', models.FloatField(blank=True, null=True)),
+                ('at_risk', models.BooleanField(default=False)),
+                ('scanned_at', models.DateTimeField()),
+                ('product_sku', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_point', to='products.productsku')),
+            ],
+            options={
+                'db_table': 'sku_reorder_points',
+                'indexes': [models.Index(fields=['at_risk', 'days_of_cover'], name='reorder_at_risk_cover_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0006_reorder_points'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='code',
+            field=models.CharField(editable=False, max_length=24, unique=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:40
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_approved_at(apps, schema_editor):
+    # The last update is the best record of approval time existing orders have,
+    # and what the rollup was dated by until now
+    PurchaseOrder = apps.get_model('purchase_orders', 'PurchaseOrder')
+    PurchaseOrder.objects.filter(status__in=['approved', 'completed']).update(approved_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0007_widen_purchase_order_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_approved_at, migrations.RunPython.noop),
+    ]
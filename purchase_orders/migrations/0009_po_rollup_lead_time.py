@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0008_purchase_order_approved_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pomonthlyrollup',
+            name='lead_time_days',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pomonthlyrollup',
+            name='received_line_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -15,6 +15,7 @@ class PoItem(models.Model):
     product_sku = models.ForeignKey(ProductSKU, on_delete=models.PROTECT)
     price = models.BigIntegerField()
     amounts = models.IntegerField()
+    received_amounts = models.IntegerField(default=0)
     supplier_discount = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0), MaxValueValidator(100)])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,37 @@
+import uuid
+
+from django.db import models
+
+from purchase_orders.models.po_item import PoItem
+from purchase_orders.models.purchase_order import PurchaseOrder
+from users.models import User
+
+
+class PoReceipt(models.Model):
+    """
+    Goods received against a purchase order, in full or in part.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='receipts')
+    received_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='po_receipts')
+    note = models.CharField(max_length=255, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'po_receipts'
+
+    def __str__(self):
+        return f"Receipt for {self.purchase_order} at {self.created_at}"
+
+
+class PoReceiptItem(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    receipt = models.ForeignKey(PoReceipt, on_delete=models.CASCADE, related_name='items')
+    po_item = models.ForeignKey(PoItem, on_delete=models.CASCADE, related_name='receipt_items')
+    amounts = models.IntegerField()
+
+    class Meta:
+        db_table = 'po_receipt_items'
+
+    def __str__(self):
+        return f"{self.amounts} of {self.po_item_id} in {self.receipt_id}"
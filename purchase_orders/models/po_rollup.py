@@ -0,0 +1,33 @@
+from django.db import models
+
+from products.models.sku import ProductSKU
+from suppliers.models.supplier import Supplier
+
+
+class PoMonthlyRollup(models.Model):
+    """
+    Purchased quantities and value per supplier, SKU and month, added to
+    whenever a purchase order is approved or received (see services.analytics).
+    """
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='po_rollups')
+    product_sku = models.ForeignKey(ProductSKU, on_delete=models.CASCADE, related_name='po_rollups')
+    month = models.DateField()
+    line_count = models.IntegerField(default=0)
+    total_amounts = models.BigIntegerField(default=0)
+    total_value = models.BigIntegerField(default=0)
+    discount_value = models.FloatField(default=0)
+    # Lines received at least once, and their summed days from approval to first receipt
+    received_line_count = models.IntegerField(default=0)
+    lead_time_days = models.FloatField(default=0)
+
+    class Meta:
+        db_table = 'po_monthly_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['supplier', 'product_sku', 'month'], name='unique_po_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'supplier'], name='po_rollup_month_supplier_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier_id} {self.product_sku_id} {self.month}"
@@ -1,8 +1,11 @@
 import uuid
-from datetime import datetime
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import BigIntegerField, Count, F, Func, OuterRef, Q, Subquery, Sum, TextField, Value
+from django.db.models.functions import Coalesce, Lower, NullIf
 
+from api.sequences import next_document_code
 from suppliers.models.supplier import Supplier
 from users.models import User
 
@@ -12,6 +15,81 @@ class PurchaseOrderPaymentOption(models.TextChoices):
     PARTNERSHIP = "partnership", "Partnership"
 
 
+class ConcatWS(Func):
+    """CONCAT_WS(separator, ...): joins the arguments, skipping NULLs."""
+    function = 'CONCAT_WS'
+    output_field = TextField()
+
+
+# Changes to the named parties' names are picked up by signals instead
+SEARCH_SOURCE_FIELDS = ('code', 'name', 'requester_id', 'approver_id', 'supplier_id')
+
+
+class PurchaseOrderQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Orders a user may see, as one predicate the (status, updated_at) and
+        (requester, updated_at) indexes can serve: admins and checkers see
+        everything that left draft plus their own drafts, procurement sees
+        its own orders.
+        """
+        if user.role in ('admin', 'checker'):
+            submitted = [value for value in PurchaseOrder.Status.values if value != PurchaseOrder.Status.DRAFT]
+            return self.filter(Q(status__in=submitted) | Q(requester=user))
+        if user.role == 'procurement':
+            return self.filter(requester=user)
+        return self.none()
+
+    def search(self, query):
+        """
+        Matches code, name, requester, approver and supplier names through
+        the trigram-indexed search_text column.
+        """
+        return self.filter(search_text__contains=query.strip().lower())
+
+    def refresh_search_text(self):
+        """
+        Recomputes search_text of the matched orders in one UPDATE, the SQL
+        counterpart of PurchaseOrder.build_search_text.
+        """
+        def name_of(model, field):
+            return NullIf(Subquery(model.objects.filter(pk=OuterRef(field)).values('name')[:1]), Value(''))
+
+        return self.update(search_text=Lower(ConcatWS(
+            Value(' '),
+            NullIf(F('code'), Value('')),
+            NullIf(F('name'), Value('')),
+            name_of(User, 'requester_id'),
+            name_of(User, 'approver_id'),
+            name_of(Supplier, 'supplier_id'),
+        )))
+
+    def with_summary(self):
+        """
+        List representation: the order's people and supplier joined in, plus
+        line_count and total_value computed in the same query.
+        """
+        return self.select_related('requester', 'approver', 'supplier').annotate(
+            line_count=Count('items'),
+            total_value=Coalesce(
+                Sum(F('items__price') * F('items__amounts'), output_field=BigIntegerField()),
+                Value(0),
+                output_field=BigIntegerField()
+            )
+        )
+
+    def with_detail(self):
+        """
+        Detail representation: every item with its SKU, product, category,
+        images and SKU supplier, in a fixed number of queries.
+        """
+        return self.select_related('requester', 'approver', 'supplier').prefetch_related(
+            'items__product_sku__product__category',
+            'items__product_sku__product__productimage_set',
+            'items__product_sku__supplier',
+        )
+
+
 class PurchaseOrder(models.Model):
     class Status(models.TextChoices):
         DRAFT = "draft", "Draft"
@@ -22,7 +100,7 @@ class PurchaseOrder(models.Model):
         COMPLETED = "completed", "Completed"
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    code = models.CharField(max_length=20, editable=False, unique=True)
+    code = models.CharField(max_length=24, editable=False, unique=True)
     name = models.CharField(max_length=128)
     approver = models.ForeignKey(User, related_name='approver_purchase_orders', blank=True, null=True, on_delete=models.CASCADE)
     requester = models.ForeignKey(User, related_name='requester_purchase_orders', on_delete=models.CASCADE)
@@ -37,16 +115,54 @@ class PurchaseOrder(models.Model):
         choices=Status.choices,
     )
     note = models.CharField(max_length=255, blank=True, null=True)
+    # When the order first became approved (or completed); dates its spend
+    approved_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Lowercased code, name and party names, kept in sync on save (see signals)
+    search_text = models.TextField(blank=True, default='', editable=False)
+
+    objects = PurchaseOrderQuerySet.as_manager()
 
     class Meta:
         db_table = 'purchase_orders'
+        indexes = [
+            models.Index(fields=['status', '-updated_at'], name='po_status_updated_idx'),
+            models.Index(fields=['requester', '-updated_at'], name='po_requester_updated_idx'),
+            GinIndex(fields=['search_text'], name='po_search_text_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.code
 
     def save(self, *args, **kwargs):
         if not self.code:
-            self.code = f"PO/{datetime.now().strftime('%Y%m%d')}/{self.id.hex[:4]}"
+            self.code = next_document_code('PO')
+        # Rebuilding may load the requester, approver and supplier, so only
+        # do it when a field search_text is built from has changed
+        if getattr(self, '_search_source', None) != self.search_source():
+            self.search_text = self.build_search_text()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'search_text'}
         super().save(*args, **kwargs)
+        self._search_source = self.search_source()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & set(SEARCH_SOURCE_FIELDS):
+            instance._search_source = instance.search_source()
+        return instance
+
+    def search_source(self):
+        return tuple(getattr(self, field) for field in SEARCH_SOURCE_FIELDS)
+
+    def build_search_text(self):
+        parts = [
+            self.code,
+            self.name,
+            self.requester.name if self.requester_id else None,
+            self.approver.name if self.approver_id else None,
+            self.supplier.name if self.supplier_id else None,
+        ]
+        return ' '.join(part for part in parts if part).lower()
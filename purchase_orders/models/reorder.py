@@ -0,0 +1,43 @@
+import uuid
+
+from django.db import models
+
+from products.models.sku import ProductSKU
+
+
+class SkuReorderPoint(models.Model):
+    """
+    Latest stock forecast for a SKU, refreshed by services.reorder.scan_reorder_points.
+    """
+    product_sku = models.OneToOneField(ProductSKU, on_delete=models.CASCADE, related_name='reorder_point')
+    daily_velocity = models.FloatField(default=0)
+    stock = models.IntegerField(default=0)
+    on_order = models.IntegerField(default=0)
+    reorder_point = models.IntegerField(default=0)
+    suggested_amounts = models.IntegerField(default=0)
+    days_of_cover = models.FloatField(null=True, blank=True)
+    at_risk = models.BooleanField(default=False)
+    scanned_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'sku_reorder_points'
+        indexes = [
+            models.Index(fields=['at_risk', 'days_of_cover'], name='reorder_at_risk_cover_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_sku_id}: {self.stock} (reorder at {self.reorder_point})"
+
+
+class ReorderScan(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    full = models.BooleanField(default=False)
+    sku_count = models.IntegerField(default=0)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'reorder_scans'
+
+    def __str__(self):
+        return f"Reorder scan {self.started_at}"
@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from purchase_orders.services.analytics import GROUP_FIELDS
+
+
+class PoAnalyticsQuerySerializer(serializers.Serializer):
+    group_by = serializers.CharField(required=False, default='supplier')
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    supplier_id = serializers.UUIDField(required=False)
+    sku = serializers.CharField(required=False)
+
+    def validate_group_by(self, value):
+        groups = [group.strip() for group in value.split(',') if group.strip()]
+        invalid = [group for group in groups if group not in GROUP_FIELDS]
+        if not groups or invalid:
+            raise serializers.ValidationError(f"Group by must be a comma separated list of {', '.join(GROUP_FIELDS)}.")
+        return list(dict.fromkeys(groups))
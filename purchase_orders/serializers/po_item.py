@@ -1,3 +1,5 @@
+from collections import Counter
+
 from rest_framework import serializers
 
 from products.models.sku import ProductSKU
@@ -49,15 +51,31 @@ class PoItemSerializer(serializers.ModelSerializer):
                 validated_data['purchase_order'] = purchase_order
         return super().create(validated_data)
 
+class NestedPoItemListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        """Resolves every SKU code in one query and rejects repeated SKUs"""
+        codes = [item['product_sku'] for item in attrs]
+        skus = ProductSKU.objects.in_bulk(codes, field_name='sku')
+
+        missing = sorted(set(codes) - set(skus))
+        if missing:
+            raise serializers.ValidationError(f"Product SKU does not exist: {', '.join(missing)}.")
+
+        duplicates = sorted(code for code, count in Counter(codes).items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(f"Each SKU can only appear once: {', '.join(duplicates)}.")
+
+        for item in attrs:
+            item['product_sku'] = skus[item['product_sku']]
+        return attrs
+
+
 class NestedPoItemSerializer(serializers.Serializer):
     """Serializer for creating items when creating a purchase order"""
-    product_sku = serializers.SlugRelatedField(
-        queryset=ProductSKU.objects.all(),
-        slug_field='sku'
-    )
+    product_sku = serializers.CharField()
     price = serializers.IntegerField()
     amounts = serializers.IntegerField()
     supplier_discount = serializers.FloatField(required=False, allow_null=True)
 
-    def create(self, validated_data):
-        return PoItem.objects.create(**validated_data)
+    class Meta:
+        list_serializer_class = NestedPoItemListSerializer
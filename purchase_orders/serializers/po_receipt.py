@@ -0,0 +1,36 @@
+from rest_framework import serializers
+
+from purchase_orders.models.po_receipt import PoReceipt, PoReceiptItem
+
+
+class PoReceiptLineSerializer(serializers.Serializer):
+    product_sku = serializers.CharField()
+    amounts = serializers.IntegerField(min_value=1)
+
+
+class PoReceiptCreateSerializer(serializers.Serializer):
+    """Input for receiving part (or all) of an approved purchase order"""
+    items = PoReceiptLineSerializer(many=True, required=False)
+    note = serializers.CharField(max_length=255, required=False, allow_null=True, allow_blank=True)
+
+    def validate_items(self, value):
+        quantities = {}
+        for line in value:
+            quantities[line['product_sku']] = quantities.get(line['product_sku'], 0) + line['amounts']
+        return quantities
+
+
+class PoReceiptItemSerializer(serializers.ModelSerializer):
+    product_sku = serializers.CharField(source='po_item.product_sku.sku', read_only=True)
+
+    class Meta:
+        model = PoReceiptItem
+        fields = ['id', 'product_sku', 'amounts']
+
+
+class PoReceiptSerializer(serializers.ModelSerializer):
+    items = PoReceiptItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = PoReceipt
+        fields = ['id', 'purchase_order', 'received_by', 'note', 'items', 'created_at']
@@ -1,8 +1,12 @@
-
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from purchase_orders.models.purchase_order import PurchaseOrder
 from purchase_orders.serializers.po_item import NestedPoItemSerializer, PoItemSerializer
+from purchase_orders.services.analytics import record_purchase_order
+from purchase_orders.services.items import sync_po_items
+from purchase_orders.services.receiving import receive_purchase_order
 from suppliers.models.supplier import Supplier
 from suppliers.serializers.supplier import SupplierSerializer
 from users.models import User
@@ -31,6 +35,12 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
         write_only=True
     )
     supplier = SupplierSerializer(read_only=True)
+    receive_all = serializers.BooleanField(
+        default=True,
+        write_only=True,
+        help_text='When approving, receive every item into stock at once. '
+                  'Set to false to book deliveries later through the receipts endpoint.'
+    )
 
     class Meta:
         model = PurchaseOrder
@@ -51,6 +61,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
             'items',
+            'receive_all',
         )
         read_only_fields = ('id', 'code', 'created_at', 'updated_at')
 
@@ -61,48 +72,75 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         items_data = validated_data.pop('items', None)
-        old_status = instance.status
-        purchase_order = super().update(instance, validated_data)
-
-        if items_data is not None:
-            if purchase_order.status not in [PurchaseOrder.Status.DRAFT, PurchaseOrder.Status.WAITING_APPROVAL]:
-                raise serializers.ValidationError(
-                    "Items can only be updated if status is draft or rejected"
-                )
-
-            purchase_order.items.all().delete()
-            for item_data in items_data:
-                item_data['purchase_order'] = purchase_order
-                NestedPoItemSerializer().create(item_data)
-
-        if old_status != PurchaseOrder.Status.APPROVED and purchase_order.status == PurchaseOrder.Status.APPROVED:
-            for item in purchase_order.items.all():
-                product_sku = item.product_sku
-                product = product_sku.product
-                
-                current_price = product.price
-                new_price = item.price
-                stock = product_sku.stock
-
-                if stock <= 0:
-                    product.price = new_price
-                    product.save()
-                elif current_price < new_price:
-                    product.price = new_price
-                    product.save()
-
-                product_sku.stock += item.amounts
-                product_sku.supplier_discount = item.supplier_discount
-                product_sku.save()
+        receive_all = validated_data.pop('receive_all', True)
+        counted = [PurchaseOrder.Status.APPROVED, PurchaseOrder.Status.COMPLETED]
+
+        with transaction.atomic():
+            # Locked so concurrent status changes cannot record or reverse the rollup twice
+            old_status, instance.approved_at = PurchaseOrder.objects.select_for_update().values_list(
+                'status', 'approved_at'
+            ).get(pk=instance.pk)
+            new_status = validated_data.get('status', old_status)
+            if old_status not in counted and new_status in counted:
+                validated_data['approved_at'] = timezone.now()
+            elif old_status in counted and new_status not in counted:
+                record_purchase_order(instance, sign=-1)
+                validated_data['approved_at'] = None
+
+            purchase_order = super().update(instance, validated_data)
+
+            if items_data is not None:
+                if purchase_order.status not in [PurchaseOrder.Status.DRAFT, PurchaseOrder.Status.WAITING_APPROVAL]:
+                    raise serializers.ValidationError(
+                        "Items can only be updated if status is draft or rejected"
+                    )
+
+                sync_po_items(purchase_order, items_data)
+
+            # Recorded before receiving, which adds the lead time of received lines
+            if old_status not in counted and purchase_order.status in counted:
+                record_purchase_order(purchase_order)
+
+            if old_status != PurchaseOrder.Status.APPROVED and purchase_order.status == PurchaseOrder.Status.APPROVED and receive_all:
+                request = self.context.get('request')
+                receive_purchase_order(purchase_order, received_by=request.user if request else None)
 
         return purchase_order
 
     def create(self, validated_data):
         items_data = validated_data.pop('items', [])
-        purchase_order = super().create(validated_data)
-        
-        for item_data in items_data:
-            item_data['purchase_order'] = purchase_order
-            NestedPoItemSerializer().create(item_data)
-        
+        validated_data.pop('receive_all', None)
+
+        with transaction.atomic():
+            purchase_order = super().create(validated_data)
+            sync_po_items(purchase_order, items_data, existing=[])
+
         return purchase_order
+
+
+class PurchaseOrderListSerializer(serializers.ModelSerializer):
+    """Compact representation for PO lists, expects PurchaseOrder.objects.with_summary()"""
+    requester = UserSerializer(read_only=True)
+    approver = UserSerializer(read_only=True)
+    supplier = SupplierSerializer(read_only=True)
+    line_count = serializers.IntegerField(read_only=True)
+    total_value = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = PurchaseOrder
+        fields = (
+            'id',
+            'code',
+            'name',
+            'requester',
+            'approver',
+            'supplier',
+            'payment_option',
+            'note',
+            'status',
+            'rejection_message',
+            'line_count',
+            'total_value',
+            'created_at',
+            'updated_at',
+        )
@@ -0,0 +1,33 @@
+from rest_framework import serializers
+
+from purchase_orders.models.reorder import ReorderScan, SkuReorderPoint
+
+
+class SkuReorderPointSerializer(serializers.ModelSerializer):
+    sku = serializers.CharField(source='product_sku.sku', read_only=True)
+    product_id = serializers.UUIDField(source='product_sku.product_id', read_only=True)
+    product_name = serializers.CharField(source='product_sku.product.name', read_only=True)
+    supplier_id = serializers.UUIDField(source='product_sku.supplier_id', read_only=True)
+    supplier_name = serializers.CharField(source='product_sku.supplier.name', read_only=True, default=None)
+
+    class Meta:
+        model = SkuReorderPoint
+        fields = [
+            'sku', 'product_id', 'product_name', 'supplier_id', 'supplier_name',
+            'stock', 'on_order', 'daily_velocity', 'reorder_point',
+            'suggested_amounts', 'days_of_cover', 'scanned_at',
+        ]
+
+
+class ReorderScanSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReorderScan
+        fields = ['id', 'full', 'sku_count', 'started_at', 'finished_at']
+
+
+class ReorderScanRequestSerializer(serializers.Serializer):
+    full = serializers.BooleanField(required=False, default=False)
+
+
+class ReorderDraftRequestSerializer(serializers.Serializer):
+    supplier_ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
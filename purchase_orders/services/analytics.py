@@ -0,0 +1,196 @@
+"""
+Purchase order spend analytics.
+
+Approved orders are folded into PoMonthlyRollup (one row per supplier, SKU
+and month) as they are approved, so reports read a small table instead of
+aggregating the whole PO history. Spend is dated by the order's approved_at,
+both when it is recorded and when the rollup is rebuilt, and taken back out
+when an order leaves approved or completed. Supplier lead time is kept per
+line as the days from approval to the line's first receipt.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, FloatField, Min, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from purchase_orders.models.po_item import PoItem
+from purchase_orders.models.po_receipt import PoReceiptItem
+from purchase_orders.models.po_rollup import PoMonthlyRollup
+from purchase_orders.models.purchase_order import PurchaseOrder
+
+GROUP_FIELDS = {
+    'supplier': ['supplier_id', 'supplier__code', 'supplier__name'],
+    'sku': ['product_sku_id', 'product_sku__sku', 'product_sku__product__name'],
+    'month': ['month'],
+}
+# Output names for the related lookups above
+FIELD_NAMES = {
+    'supplier__code': 'supplier_code',
+    'supplier__name': 'supplier_name',
+    'product_sku__sku': 'sku',
+    'product_sku__product__name': 'product_name',
+}
+ROLLUP_FIELDS = [
+    'line_count', 'total_amounts', 'total_value', 'discount_value', 'received_line_count', 'lead_time_days'
+]
+
+
+def lead_time_days(approved_at, received_at):
+    return (received_at - approved_at).total_seconds() / 86400
+
+
+def empty_totals():
+    return defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+
+
+def add_to_rollup(supplier_id, month, totals):
+    """
+    Adds per-SKU totals to one supplier's rollup month: one insert for
+    missing rows, one locking select and one bulk_update.
+    """
+    if not totals:
+        return
+
+    with transaction.atomic():
+        PoMonthlyRollup.objects.bulk_create(
+            [PoMonthlyRollup(supplier_id=supplier_id, product_sku_id=sku_id, month=month) for sku_id in totals],
+            ignore_conflicts=True
+        )
+        rollups = list(PoMonthlyRollup.objects.select_for_update().filter(
+            supplier_id=supplier_id, month=month, product_sku_id__in=totals
+        ))
+        for rollup in rollups:
+            for field, value in totals[rollup.product_sku_id].items():
+                setattr(rollup, field, getattr(rollup, field) + value)
+        PoMonthlyRollup.objects.bulk_update(rollups, ROLLUP_FIELDS)
+
+
+def record_purchase_order(purchase_order, sign=1):
+    """
+    Adds an approved order's lines, and the lead times of the lines already
+    received, to the rollup month of its approved_at. With sign=-1 takes
+    them back out, for an order that stops being approved or completed.
+    """
+    approved_at = purchase_order.approved_at or timezone.now()
+    month = timezone.localdate(approved_at).replace(day=1)
+    first_received = dict(
+        PoReceiptItem.objects.filter(po_item__purchase_order=purchase_order).values('po_item_id').annotate(
+            received_at=Min('receipt__created_at')
+        ).values_list('po_item_id', 'received_at')
+    )
+    totals = empty_totals()
+
+    for item in PoItem.objects.filter(purchase_order=purchase_order):
+        value = item.price * item.amounts
+        row = totals[item.product_sku_id]
+        row['line_count'] += sign
+        row['total_amounts'] += sign * item.amounts
+        row['total_value'] += sign * value
+        row['discount_value'] += sign * value * (item.supplier_discount or 0) / 100
+        if item.id in first_received:
+            row['received_line_count'] += sign
+            row['lead_time_days'] += sign * lead_time_days(approved_at, first_received[item.id])
+
+    add_to_rollup(purchase_order.supplier_id, month, totals)
+
+
+def record_receipt(purchase_order, po_items, received_at):
+    """
+    Adds the supplier lead time (approval to first receipt) of lines received
+    for the first time to the order's rollup month.
+    """
+    approved_at = purchase_order.approved_at or received_at
+    totals = empty_totals()
+    for item in po_items:
+        row = totals[item.product_sku_id]
+        row['received_line_count'] += 1
+        row['lead_time_days'] += lead_time_days(approved_at, received_at)
+
+    add_to_rollup(purchase_order.supplier_id, timezone.localdate(approved_at).replace(day=1), totals)
+
+
+def rebuild_rollups():
+    """
+    Recomputes the whole rollup from approved and completed orders, dated by
+    their approved_at like record_purchase_order. Returns the number of rows
+    written.
+    """
+    counted = [PurchaseOrder.Status.APPROVED, PurchaseOrder.Status.COMPLETED]
+    rows = PoItem.objects.filter(purchase_order__status__in=counted).annotate(
+        month=TruncMonth('purchase_order__approved_at', output_field=DateField())
+    ).values(
+        'purchase_order__supplier_id', 'product_sku_id', 'month'
+    ).annotate(
+        line_count=Count('id'),
+        total_amounts=Sum('amounts'),
+        total_value=Sum(F('price') * F('amounts')),
+        discount_value=Sum(F('price') * F('amounts') * F('supplier_discount') / 100.0, output_field=FloatField()),
+    ).order_by()
+
+    lead_times = defaultdict(lambda: {'received_line_count': 0, 'lead_time_days': 0.0})
+    received_items = PoItem.objects.filter(
+        purchase_order__status__in=counted, receipt_items__isnull=False
+    ).values('id', 'purchase_order__supplier_id', 'product_sku_id', 'purchase_order__approved_at').annotate(
+        received_at=Min('receipt_items__receipt__created_at')
+    ).order_by()
+    for item in received_items.iterator():
+        approved_at = item['purchase_order__approved_at'] or item['received_at']
+        key = (item['purchase_order__supplier_id'], item['product_sku_id'], timezone.localdate(approved_at).replace(day=1))
+        lead_times[key]['received_line_count'] += 1
+        lead_times[key]['lead_time_days'] += lead_time_days(approved_at, item['received_at'])
+
+    with transaction.atomic():
+        PoMonthlyRollup.objects.all().delete()
+        created = PoMonthlyRollup.objects.bulk_create([
+            PoMonthlyRollup(
+                supplier_id=row['purchase_order__supplier_id'],
+                product_sku_id=row['product_sku_id'],
+                month=row['month'],
+                line_count=row['line_count'],
+                total_amounts=row['total_amounts'] or 0,
+                total_value=row['total_value'] or 0,
+                discount_value=row['discount_value'] or 0,
+                **lead_times[(row['purchase_order__supplier_id'], row['product_sku_id'], row['month'])],
+            )
+            for row in rows.iterator()
+        ], batch_size=1000)
+    return len(created)
+
+
+def spend_summary(group_by, start_month=None, end_month=None, supplier_id=None, sku=None):
+    """
+    Aggregates the rollup by any of 'supplier', 'sku' and 'month', with
+    weighted average unit cost, average discount percentage and average
+    supplier lead time in days.
+    """
+    queryset = PoMonthlyRollup.objects.all()
+    if start_month:
+        queryset = queryset.filter(month__gte=start_month.replace(day=1))
+    if end_month:
+        queryset = queryset.filter(month__lte=end_month)
+    if supplier_id:
+        queryset = queryset.filter(supplier_id=supplier_id)
+    if sku:
+        queryset = queryset.filter(product_sku__sku=sku)
+
+    fields = [field for group in group_by for field in GROUP_FIELDS[group]]
+    rows = queryset.values(*fields).annotate(
+        line_count=Sum('line_count'),
+        total_amounts=Sum('total_amounts'),
+        total_value=Sum('total_value'),
+        discount_value=Sum('discount_value'),
+        received_line_count=Sum('received_line_count'),
+        lead_time_days=Sum('lead_time_days'),
+    ).order_by(*fields)
+
+    results = []
+    for row in rows:
+        row = {FIELD_NAMES.get(key, key): value for key, value in row.items()}
+        row['average_unit_cost'] = row['total_value'] / row['total_amounts'] if row['total_amounts'] else None
+        row['average_discount'] = row['discount_value'] * 100 / row['total_value'] if row['total_value'] else None
+        lead_time = row.pop('lead_time_days')
+        row['average_lead_time_days'] = lead_time / row['received_line_count'] if row['received_line_count'] else None
+        results.append(row)
+    return results
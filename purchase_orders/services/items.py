@@ -0,0 +1,57 @@
+from django.utils import timezone
+
+from purchase_orders.models.po_item import PoItem
+
+PO_ITEM_FIELDS = ('price', 'amounts', 'supplier_discount')
+
+
+def sync_po_items(purchase_order, items_data, existing=None):
+    """
+    Makes the order's items match `items_data`, keyed on product_sku: lines
+    for new SKUs are inserted, changed lines updated in place and missing
+    ones deleted, each with a single statement.
+
+    `existing` can be passed (e.g. [] for a new order) to skip loading the
+    current items.
+    """
+    if existing is None:
+        existing = purchase_order.items.all()
+    existing = {item.product_sku_id: item for item in existing}
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    incoming = set()
+
+    for item_data in items_data:
+        product_sku = item_data['product_sku']
+        incoming.add(product_sku.id)
+        item = existing.get(product_sku.id)
+
+        if item is None:
+            to_create.append(PoItem(
+                purchase_order=purchase_order,
+                product_sku=product_sku,
+                price=item_data['price'],
+                amounts=item_data['amounts'],
+                supplier_discount=item_data.get('supplier_discount')
+            ))
+            continue
+
+        changed = False
+        for field in PO_ITEM_FIELDS:
+            value = item_data.get(field)
+            if getattr(item, field) != value:
+                setattr(item, field, value)
+                changed = True
+        if changed:
+            item.updated_at = now
+            to_update.append(item)
+
+    removed = [item.id for sku_id, item in existing.items() if sku_id not in incoming]
+    if removed:
+        PoItem.objects.filter(id__in=removed).delete()
+    if to_update:
+        PoItem.objects.bulk_update(to_update, [*PO_ITEM_FIELDS, 'updated_at'])
+    if to_create:
+        PoItem.objects.bulk_create(to_create)
@@ -0,0 +1,114 @@
+"""
+Receiving goods against a purchase order.
+
+The purchase order row is locked first, so concurrent receipts of the same
+order (or a receipt racing an approve-and-receive-all) run one after the
+other and each sees the amounts the previous one received. All SKUs on
+the order (and their products) are locked with one query, new
+prices and supplier discounts are worked out in memory and written back
+with bulk_update, and stock is incremented with a single F() update, so a
+receipt costs the same number of queries whatever the size of the order.
+Lines received for the first time add their lead time to the PO rollup.
+"""
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from products.models.product import Product
+from products.models.sku import ProductSKU
+from products.services.stock import adjust_stock
+from purchase_orders.models.po_item import PoItem
+from purchase_orders.models.po_receipt import PoReceipt, PoReceiptItem
+from purchase_orders.models.purchase_order import PurchaseOrder
+from purchase_orders.services.analytics import record_receipt
+
+
+def receive_purchase_order(purchase_order, received_by=None, quantities=None, note=None):
+    """
+    Books received goods into stock and records a PoReceipt.
+
+    `quantities` maps SKU codes to the amount received now; when omitted,
+    everything still outstanding on the order is received. A product's price
+    is raised to the PO price when it is lower, or replaced outright when the
+    SKU is out of stock, in the order the items appear on the PO.
+
+    Returns None, without recording anything, when there is nothing to receive.
+    """
+    with transaction.atomic():
+        locked_status = PurchaseOrder.objects.select_for_update().values_list('status', flat=True).get(
+            pk=purchase_order.pk
+        )
+        if locked_status != PurchaseOrder.Status.APPROVED:
+            raise serializers.ValidationError("Only approved purchase orders can be received")
+
+        po_items = list(purchase_order.items.select_related('product_sku').order_by('created_at', 'id'))
+        skus = ProductSKU.objects.select_for_update().select_related('product').in_bulk(
+            {item.product_sku_id for item in po_items}
+        )
+
+        if quantities is not None:
+            unknown = set(quantities) - {item.product_sku.sku for item in po_items}
+            if unknown:
+                raise serializers.ValidationError(
+                    f"SKU not on this purchase order: {', '.join(sorted(unknown))}."
+                )
+
+        now = timezone.now()
+        products = {}
+        repriced_products = set()
+        received_lines = []
+        first_received = []
+        stock_deltas = {}
+
+        for item in po_items:
+            outstanding = item.amounts - item.received_amounts
+            if quantities is None:
+                amount = outstanding
+            else:
+                amount = quantities.get(item.product_sku.sku, 0)
+                if amount > outstanding:
+                    raise serializers.ValidationError(
+                        f"Only {outstanding} of {item.product_sku.sku} are outstanding on this purchase order."
+                    )
+            if amount <= 0:
+                continue
+
+            product_sku = skus[item.product_sku_id]
+            product = products.setdefault(product_sku.product_id, product_sku.product)
+
+            if product_sku.stock <= 0 or product.price < item.price:
+                product.price = item.price
+                product.updated_at = now
+                repriced_products.add(product.id)
+
+            product_sku.supplier_discount = item.supplier_discount
+            product_sku.updated_at = now
+            product_sku.stock += amount
+            stock_deltas[product_sku.id] = stock_deltas.get(product_sku.id, 0) + amount
+
+            if not item.received_amounts:
+                first_received.append(item)
+            item.received_amounts += amount
+            item.updated_at = now
+            received_lines.append((item, amount))
+
+        if not received_lines:
+            return None
+
+        adjust_stock(stock_deltas)
+        ProductSKU.objects.bulk_update(
+            [skus[sku_id] for sku_id in stock_deltas], ['supplier_discount', 'updated_at']
+        )
+        Product.objects.bulk_update(
+            [products[product_id] for product_id in repriced_products], ['price', 'updated_at']
+        )
+        PoItem.objects.bulk_update([item for item, _ in received_lines], ['received_amounts', 'updated_at'])
+
+        receipt = PoReceipt.objects.create(purchase_order=purchase_order, received_by=received_by, note=note)
+        PoReceiptItem.objects.bulk_create([
+            PoReceiptItem(receipt=receipt, po_item=item, amounts=amount)
+            for item, amount in received_lines
+        ])
+        record_receipt(purchase_order, first_received, receipt.created_at)
+
+    return receipt
@@ -0,0 +1,187 @@
+"""
+Low-stock detection and reorder suggestions.
+
+A scan works out, per SKU, the average daily units sold over the last
+REORDER_VELOCITY_WINDOW_DAYS, the reorder point (velocity over lead time
+plus safety days) and how much to order to cover REORDER_COVER_DAYS more.
+Units still outstanding on open purchase orders count towards stock.
+
+Scans are incremental: only SKUs sold, received, edited, put on a PO or on
+a PO that changed status since the previous scan started are recomputed,
+plus SKUs whose older sales have since dropped out of the velocity window.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from products.models.sku import ProductSKU
+from purchase_orders.models.po_item import PoItem
+from purchase_orders.models.po_receipt import PoReceiptItem
+from purchase_orders.models.purchase_order import PurchaseOrder
+from purchase_orders.models.reorder import ReorderScan, SkuReorderPoint
+from purchase_orders.services.items import sync_po_items
+from transactions.models.transaction_item import TransactionItem
+
+CHUNK_SIZE = 1000
+FORECAST_FIELDS = [
+    'daily_velocity', 'stock', 'on_order', 'reorder_point',
+    'suggested_amounts', 'days_of_cover', 'at_risk', 'scanned_at',
+]
+# Drafts count as on order: create_reorder_drafts opens them for exactly the
+# suggested amounts, and the next scan must not suggest those units again.
+OPEN_PO_STATUSES = [
+    PurchaseOrder.Status.DRAFT,
+    PurchaseOrder.Status.WAITING_APPROVAL,
+    PurchaseOrder.Status.APPROVED,
+]
+
+
+def moved_sku_ids(since, now):
+    """
+    SKUs with sales, receipts, edits, PO line or PO status changes since
+    `since`, and SKUs with sales that left the velocity window between
+    `since` and `now`.
+    """
+    window = timedelta(days=settings.REORDER_VELOCITY_WINDOW_DAYS)
+    moved = set(TransactionItem.objects.filter(transaction__paid_time__gte=since).values_list('product_sku_id', flat=True))
+    moved.update(TransactionItem.objects.filter(
+        transaction__paid_time__gte=since - window, transaction__paid_time__lt=now - window
+    ).values_list('product_sku_id', flat=True))
+    moved.update(PoReceiptItem.objects.filter(receipt__created_at__gte=since).values_list('po_item__product_sku_id', flat=True))
+    moved.update(PoItem.objects.filter(updated_at__gte=since).values_list('product_sku_id', flat=True))
+    moved.update(PoItem.objects.filter(purchase_order__updated_at__gte=since).values_list('product_sku_id', flat=True))
+    moved.update(ProductSKU.objects.filter(updated_at__gte=since).values_list('id', flat=True))
+    return moved
+
+
+def forecast(stock, on_order, units_sold, now):
+    velocity = units_sold / settings.REORDER_VELOCITY_WINDOW_DAYS
+    reorder_point = math.ceil(velocity * (settings.REORDER_LEAD_TIME_DAYS + settings.REORDER_SAFETY_DAYS))
+    target = math.ceil(velocity * (
+        settings.REORDER_LEAD_TIME_DAYS + settings.REORDER_SAFETY_DAYS + settings.REORDER_COVER_DAYS
+    ))
+    available = stock + on_order
+    return {
+        'daily_velocity': velocity,
+        'stock': stock,
+        'on_order': on_order,
+        'reorder_point': reorder_point,
+        'suggested_amounts': max(0, target - available),
+        'days_of_cover': available / velocity if velocity else None,
+        'at_risk': velocity > 0 and available <= reorder_point,
+        'scanned_at': now,
+    }
+
+
+def scan_chunk(sku_ids, now):
+    window_start = now - timedelta(days=settings.REORDER_VELOCITY_WINDOW_DAYS)
+
+    stock = dict(ProductSKU.objects.filter(id__in=sku_ids).values_list('id', 'stock'))
+    sold = dict(
+        TransactionItem.objects.filter(
+            product_sku_id__in=stock, transaction__paid_time__gte=window_start
+        ).values('product_sku_id').annotate(units=Sum('amount')).values_list('product_sku_id', 'units')
+    )
+    on_order = dict(
+        PoItem.objects.filter(
+            product_sku_id__in=stock, purchase_order__status__in=OPEN_PO_STATUSES
+        ).values('product_sku_id').annotate(
+            outstanding=Sum(F('amounts') - F('received_amounts'))
+        ).values_list('product_sku_id', 'outstanding')
+    )
+
+    rows = [
+        SkuReorderPoint(product_sku_id=sku_id, **forecast(sku_stock, on_order.get(sku_id) or 0, sold.get(sku_id) or 0, now))
+        for sku_id, sku_stock in stock.items()
+    ]
+    SkuReorderPoint.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['product_sku'],
+        update_fields=FORECAST_FIELDS,
+    )
+    return len(rows)
+
+
+def scan_reorder_points(full=False):
+    """
+    Refreshes SkuReorderPoint rows and returns the ReorderScan record.
+    The first scan, or a scan with full=True, covers every SKU.
+    """
+    now = timezone.now()
+    last_scan = ReorderScan.objects.filter(finished_at__isnull=False).order_by('-started_at').first()
+    full = full or last_scan is None
+
+    if full:
+        sku_ids = list(ProductSKU.objects.values_list('id', flat=True))
+    else:
+        sku_ids = list(moved_sku_ids(last_scan.started_at, now))
+
+    scan = ReorderScan.objects.create(full=full, started_at=now)
+    for start in range(0, len(sku_ids), CHUNK_SIZE):
+        scan.sku_count += scan_chunk(sku_ids[start:start + CHUNK_SIZE], now)
+
+    scan.finished_at = timezone.now()
+    scan.save(update_fields=['sku_count', 'finished_at'])
+    return scan
+
+
+def at_risk_points(supplier_id=None):
+    queryset = SkuReorderPoint.objects.filter(
+        at_risk=True, product_sku__product__is_deleted=False
+    ).select_related('product_sku__product', 'product_sku__supplier')
+    if supplier_id:
+        queryset = queryset.filter(product_sku__supplier_id=supplier_id)
+    return queryset.order_by(F('days_of_cover').asc(nulls_first=True), '-daily_velocity')
+
+
+def create_reorder_drafts(requester, supplier_ids=None):
+    """
+    Opens one draft purchase order per supplier for its at-risk SKUs, priced
+    at the SKU's last purchase price. The SKUs' forecasts are updated to
+    count the drafted units as on order. Returns the created orders.
+    """
+    last_price = PoItem.objects.filter(product_sku=OuterRef('product_sku')).order_by('-created_at').values('price')[:1]
+    points = at_risk_points().filter(
+        suggested_amounts__gt=0, product_sku__supplier__isnull=False
+    ).annotate(last_price=Subquery(last_price))
+    if supplier_ids:
+        points = points.filter(product_sku__supplier_id__in=supplier_ids)
+
+    by_supplier = defaultdict(list)
+    for point in points:
+        by_supplier[point.product_sku.supplier].append(point)
+
+    purchase_orders = []
+    with transaction.atomic():
+        for supplier, supplier_points in by_supplier.items():
+            purchase_order = PurchaseOrder.objects.create(
+                name=f"Reorder {supplier.name} {timezone.localdate():%Y-%m-%d}"[:128],
+                requester=requester,
+                supplier=supplier,
+                payment_option=supplier_points[0].product_sku.payment_option or 'cash',
+                status=PurchaseOrder.Status.DRAFT,
+            )
+            sync_po_items(purchase_order, [
+                {
+                    'product_sku': point.product_sku,
+                    'price': point.last_price or 0,
+                    'amounts': point.suggested_amounts,
+                    'supplier_discount': point.product_sku.supplier_discount,
+                }
+                for point in supplier_points
+            ], existing=[])
+            purchase_orders.append(purchase_order)
+
+            for point in supplier_points:
+                point.on_order += point.suggested_amounts
+                point.suggested_amounts = 0
+                point.at_risk = False
+            SkuReorderPoint.objects.bulk_update(supplier_points, ['on_order', 'suggested_amounts', 'at_risk'])
+
+    return purchase_orders
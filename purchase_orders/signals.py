@@ -0,0 +1,33 @@
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from purchase_orders.models.purchase_order import PurchaseOrder
+from suppliers.models.supplier import Supplier
+from users.models import User
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Supplier)
+def remember_name_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Flags whether a save changes the stored name, so purchase orders are
+    only re-indexed when it did.
+    """
+    instance._name_changed = False
+    if instance._state.adding or (update_fields is not None and 'name' not in update_fields):
+        return
+    stored_name = sender.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+    instance._name_changed = stored_name != instance.name
+
+
+@receiver(post_save, sender=User)
+def refresh_user_purchase_orders(sender, instance, created, **kwargs):
+    if getattr(instance, '_name_changed', False):
+        PurchaseOrder.objects.filter(Q(requester=instance) | Q(approver=instance)).refresh_search_text()
+
+
+@receiver(post_save, sender=Supplier)
+def refresh_supplier_purchase_orders(sender, instance, created, **kwargs):
+    if getattr(instance, '_name_changed', False):
+        PurchaseOrder.objects.filter(supplier=instance).refresh_search_text()
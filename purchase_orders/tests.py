@@ -1,2 +1,239 @@
+import os
+import time
+import unittest
+from itertools import count
 
-# Create your tests here.
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.sequences import sequence_database
+from products.models.category import ProductCategory
+from products.models.image import ProductImage
+from products.models.product import Product
+from products.models.sku import ProductSKU
+from purchase_orders.models.po_item import PoItem
+from purchase_orders.models.po_rollup import PoMonthlyRollup
+from purchase_orders.models.purchase_order import PurchaseOrder
+from purchase_orders.serializers.purchase_order import PurchaseOrderSerializer
+from purchase_orders.services.analytics import rebuild_rollups, spend_summary
+from purchase_orders.services.receiving import receive_purchase_order
+from suppliers.models.supplier import Supplier
+from users.models import User
+
+sku_numbers = count(1)
+
+RUN_BENCHMARKS = os.environ.get('RUN_BENCHMARKS') == 'True'
+
+
+class PurchaseOrderQueryCountTests(TestCase):
+    """
+    The list and detail endpoints run a fixed number of queries however many
+    orders, items and images there are.
+    """
+
+    # Order codes are taken on the sequences connection when it is configured
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email='admin@example.com', password='x', role='admin')
+        cls.procurement = User.objects.create_user(email='procurement@example.com', password='x', role='procurement')
+        cls.supplier = Supplier.objects.create(name='Supplier', address='Address', phone='0800')
+        cls.category = ProductCategory.objects.create(name='Category')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_purchase_order(self, item_count):
+        purchase_order = PurchaseOrder.objects.create(
+            name='PO',
+            requester=self.procurement,
+            approver=self.admin,
+            supplier=self.supplier,
+            payment_option='cash',
+            status=PurchaseOrder.Status.WAITING_APPROVAL,
+        )
+        for _ in range(item_count):
+            number = next(sku_numbers)
+            product = Product.objects.create(name=f'Product {number}', description='', category=self.category)
+            ProductImage.objects.create(product=product, filename='products/image.png', order_number=0)
+            product_sku = ProductSKU.objects.create(product=product, sku=f'SKU{number}', supplier=self.supplier)
+            PoItem.objects.create(purchase_order=purchase_order, product_sku=product_sku, price=1000, amounts=2)
+        return purchase_order
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        self.create_purchase_order(item_count=1)
+        expected = self.count_queries('/api/purchase-orders')
+
+        for _ in range(5):
+            self.create_purchase_order(item_count=3)
+        with self.assertNumQueries(expected):
+            response = self.client.get('/api/purchase-orders')
+        self.assertEqual(len(response.data['data']), 6)
+
+    def test_detail_query_count_is_constant(self):
+        small = self.create_purchase_order(item_count=1)
+        expected = self.count_queries(f'/api/purchase-orders/{small.pk}')
+
+        large = self.create_purchase_order(item_count=10)
+        with self.assertNumQueries(expected):
+            response = self.client.get(f'/api/purchase-orders/{large.pk}')
+        self.assertEqual(len(response.data['data']['items']), 10)
+
+
+class PurchaseOrderSearchTextTests(TestCase):
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.procurement = User.objects.create_user(
+            email='procurement@example.com', password='x', role='procurement', name='Rina'
+        )
+        cls.supplier = Supplier.objects.create(name='Sumber Makmur', address='Address', phone='0800')
+        cls.purchase_order = PurchaseOrder.objects.create(
+            name='Restock', requester=cls.procurement, supplier=cls.supplier,
+            payment_option='cash', status=PurchaseOrder.Status.DRAFT,
+        )
+
+    def test_saving_other_fields_does_not_load_related_names(self):
+        purchase_order = PurchaseOrder.objects.get(pk=self.purchase_order.pk)
+        purchase_order.status = PurchaseOrder.Status.WAITING_APPROVAL
+
+        with self.assertNumQueries(1):
+            purchase_order.save()
+
+    def test_changing_a_source_field_rebuilds_search_text(self):
+        purchase_order = PurchaseOrder.objects.get(pk=self.purchase_order.pk)
+        purchase_order.name = 'Monthly Restock'
+        purchase_order.save(update_fields=['name'])
+
+        purchase_order.refresh_from_db()
+        self.assertIn('monthly restock rina sumber makmur', purchase_order.search_text)
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, 'set RUN_BENCHMARKS=True to run benchmarks')
+class PurchaseOrderSearchBenchmark(TestCase):
+    """
+    Seeds BENCHMARK_PURCHASE_ORDERS orders (1M by default) and times the list
+    filter: visible_to plus a search_text match. On Postgres the search
+    should use the trigram index; the query plans are printed.
+    """
+
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+    batch_size = 10_000
+
+    @classmethod
+    def setUpTestData(cls):
+        rows = int(os.environ.get('BENCHMARK_PURCHASE_ORDERS', 1_000_000))
+        cls.admin = User.objects.create_user(email='admin@example.com', password='x', role='admin', name='Admin')
+        cls.requesters = User.objects.bulk_create([
+            User(email=f'procurement{number}@example.com', role='procurement', name=f'Procurement {number}')
+            for number in range(50)
+        ])
+        suppliers = Supplier.objects.bulk_create([
+            Supplier(code=f'{number}-SUP', name=f'Supplier {number}', address='Address', phone='0800')
+            for number in range(200)
+        ])
+        statuses = PurchaseOrder.Status.values
+        for start in range(0, rows, cls.batch_size):
+            purchase_orders = []
+            for number in range(start, min(start + cls.batch_size, rows)):
+                purchase_order = PurchaseOrder(
+                    code=f'PO/BENCH/{number:07}',
+                    name=f'Restock {number % 997}',
+                    requester=cls.requesters[number % len(cls.requesters)],
+                    supplier=suppliers[number % len(suppliers)],
+                    payment_option='cash',
+                    status=statuses[number % len(statuses)],
+                )
+                purchase_order.search_text = purchase_order.build_search_text()
+                purchase_orders.append(purchase_order)
+            PurchaseOrder.objects.bulk_create(purchase_orders)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE purchase_orders')
+
+    def test_benchmark_visible_search(self):
+        repeats = 20
+        for user in [self.admin, self.requesters[0]]:
+            for query in ['po/bench/00421', 'restock 42', 'supplier 17', 'no such order']:
+                queryset = PurchaseOrder.objects.visible_to(user).search(query).order_by('-updated_at')[:25]
+
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    list(queryset.values_list('pk', flat=True))
+                elapsed = time.perf_counter() - start
+
+                print(f'\n{user.role} {query!r}: {elapsed / repeats * 1000:.1f} ms')
+                if connection.vendor == 'postgresql':
+                    print(queryset.explain())
+
+
+class PurchaseOrderRollupTests(TestCase):
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.procurement = User.objects.create_user(email='procurement@example.com', password='x', role='procurement')
+        cls.supplier = Supplier.objects.create(name='Supplier', address='Address', phone='0800')
+        category = ProductCategory.objects.create(name='Category')
+        product = Product.objects.create(name='Product', description='', category=category)
+        cls.product_sku = ProductSKU.objects.create(product=product, sku='SKU-ROLLUP', supplier=cls.supplier)
+
+    def setUp(self):
+        self.purchase_order = PurchaseOrder.objects.create(
+            name='PO', requester=self.procurement, supplier=self.supplier,
+            payment_option='cash', status=PurchaseOrder.Status.WAITING_APPROVAL,
+        )
+        PoItem.objects.create(purchase_order=self.purchase_order, product_sku=self.product_sku, price=1000, amounts=3)
+
+    def set_status(self, status, receive_all=False):
+        serializer = PurchaseOrderSerializer(
+            self.purchase_order, data={'status': status, 'receive_all': receive_all}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+    def rollup(self):
+        return list(PoMonthlyRollup.objects.values_list('line_count', 'total_amounts', 'total_value', 'received_line_count'))
+
+    def test_leaving_approved_reverses_the_rollup(self):
+        self.set_status(PurchaseOrder.Status.APPROVED)
+        self.set_status(PurchaseOrder.Status.CANCELLED)
+
+        self.assertEqual(self.rollup(), [(0, 0, 0, 0)])
+        self.purchase_order.refresh_from_db()
+        self.assertIsNone(self.purchase_order.approved_at)
+
+    def test_reapproval_counts_the_order_once(self):
+        self.set_status(PurchaseOrder.Status.APPROVED, receive_all=True)
+        self.set_status(PurchaseOrder.Status.REJECTED)
+        self.set_status(PurchaseOrder.Status.APPROVED)
+
+        self.assertEqual(self.rollup(), [(1, 3, 3000, 1)])
+        recorded = self.rollup()
+        rebuild_rollups()
+        self.assertEqual(self.rollup(), recorded)
+
+    def test_receiving_records_lead_time(self):
+        self.set_status(PurchaseOrder.Status.APPROVED)
+        PurchaseOrder.objects.filter(pk=self.purchase_order.pk).update(
+            approved_at=timezone.now() - timezone.timedelta(days=2)
+        )
+        self.purchase_order.refresh_from_db()
+        receive_purchase_order(self.purchase_order, quantities={'SKU-ROLLUP': 1})
+        receive_purchase_order(self.purchase_order, quantities={'SKU-ROLLUP': 2})
+
+        [row] = spend_summary(['supplier'])
+        self.assertEqual(row['received_line_count'], 1)
+        self.assertAlmostEqual(row['average_lead_time_days'], 2, places=2)
@@ -1,8 +1,14 @@
 from django.urls import path
 
 from purchase_orders.views.purchase_order import PurchaseOrderViewSet
+from purchase_orders.views.reorder import ReorderViewSet
 
 urlpatterns = [
     path('', PurchaseOrderViewSet.as_view({'get': 'list', 'post': 'create'}), name='purchase-order-list'),
+    path('/analytics', PurchaseOrderViewSet.as_view({'get': 'analytics'}), name='purchase-order-analytics'),
+    path('/reorder', ReorderViewSet.as_view({'get': 'list'}), name='reorder-list'),
+    path('/reorder/scan', ReorderViewSet.as_view({'post': 'scan'}), name='reorder-scan'),
+    path('/reorder/drafts', ReorderViewSet.as_view({'post': 'drafts'}), name='reorder-drafts'),
+    path('/<pk>/receipts', PurchaseOrderViewSet.as_view({'post': 'receive'}), name='purchase-order-receive'),
     path('/<pk>', PurchaseOrderViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update' }), name='purchase-order-detail')
 ]
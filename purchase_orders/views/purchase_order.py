@@ -1,4 +1,3 @@
-from django.db import models
 from django.db.models import Q
 from rest_framework import permissions, status, viewsets
 
@@ -6,8 +5,13 @@ from api.mixins import CustomPaginationMixin
 from api.pagination import CustomPagination
 from api.utils import api_response
 from authentication.permissions import IsAdmin, IsChecker, IsProcurement
+from purchase_orders.models.po_receipt import PoReceipt
 from purchase_orders.models.purchase_order import PurchaseOrder
-from purchase_orders.serializers.purchase_order import PurchaseOrderSerializer
+from purchase_orders.serializers.po_analytics import PoAnalyticsQuerySerializer
+from purchase_orders.serializers.po_receipt import PoReceiptCreateSerializer, PoReceiptSerializer
+from purchase_orders.serializers.purchase_order import PurchaseOrderListSerializer, PurchaseOrderSerializer
+from purchase_orders.services.analytics import spend_summary
+from purchase_orders.services.receiving import receive_purchase_order
 
 
 class PurchaseOrderViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
@@ -16,28 +20,25 @@ class PurchaseOrderViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin' or user.role == 'checker':
-            qs = PurchaseOrder.objects.exclude(
-                status=PurchaseOrder.Status.DRAFT,
-            ) | PurchaseOrder.objects.filter(
-                status=PurchaseOrder.Status.DRAFT,
-                requester=user
-            )
+        qs = PurchaseOrder.objects.visible_to(self.request.user)
 
-            return qs.order_by('-updated_at')
-        elif user.role == 'procurement':
-            qs = PurchaseOrder.objects.filter(requester=user)
-            return qs.order_by('-updated_at')
+        if self.action == 'list':
+            qs = qs.with_summary()
+        elif self.action != 'receive':
+            # receive only needs the status; the receipt is re-read afterwards
+            qs = qs.with_detail()
+        return qs.order_by('-updated_at')
 
-        return PurchaseOrder.objects.none()
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return PurchaseOrderListSerializer
+        return PurchaseOrderSerializer
 
     def get_permissions(self):
         user = self.request.user
 
-        if user.role == 'checker':
-            if self.action in ['list', 'update', 'partial_update', 'retrieve']:
-                permission_classes = [permissions.IsAuthenticated, IsChecker]
+        if user.role == 'checker' and self.action in ['list', 'update', 'partial_update', 'retrieve', 'receive']:
+            permission_classes = [permissions.IsAuthenticated, IsChecker]
         else:
             permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsProcurement)]
         return [permission() for permission in permission_classes]
@@ -48,13 +49,7 @@ class PurchaseOrderViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
         # Handle search query parameter
         search_query = request.query_params.get('search', '').strip()
         if search_query:
-            queryset = queryset.filter(
-                models.Q(code__icontains=search_query) |
-                models.Q(name__icontains=search_query) |
-                models.Q(requester__name__icontains=search_query) |
-                models.Q(approver__name__icontains=search_query) |
-                models.Q(supplier__name__icontains=search_query)
-            )
+            queryset = queryset.search(search_query)
             
         # Handle status filter parameter (comma-separated values: draft,waiting_approval,approved,rejected,completed)
         status_filter_param = request.query_params.get('po_status', '').lower()
@@ -105,11 +100,12 @@ class PurchaseOrderViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
+        instance = PurchaseOrder.objects.with_detail().get(pk=serializer.instance.pk)
         return api_response(
             status=status.HTTP_201_CREATED,
             success=True,
             message="Purchase order created successfully",
-            data=serializer.data
+            data=self.get_serializer(instance).data
         )
 
     def retrieve(self, request, *args, **kwargs):
@@ -150,12 +146,13 @@ class PurchaseOrderViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             serializer = self.get_serializer(instance, data=request.data, partial=partial)
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
+            instance = PurchaseOrder.objects.with_detail().get(pk=instance.pk)
 
             return api_response(
                 status=status.HTTP_200_OK,
                 success=True,
                 message="Purchase order updated successfully",
-                data=serializer.data
+                data=self.get_serializer(instance).data
             )
         except PurchaseOrder.DoesNotExist:
             return api_response(
@@ -164,3 +161,69 @@ class PurchaseOrderViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
                 message="Purchase order not found",
                 data=None
             )
+
+    def receive(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if instance.status != PurchaseOrder.Status.APPROVED:
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Only approved purchase orders can be received",
+                data=None
+            )
+
+        serializer = PoReceiptCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Invalid data",
+                error=serializer.errors
+            )
+
+        receipt = receive_purchase_order(
+            instance,
+            received_by=request.user,
+            quantities=serializer.validated_data.get('items'),
+            note=serializer.validated_data.get('note')
+        )
+        if receipt is None:
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Nothing left to receive on this purchase order",
+                data=None
+            )
+
+        receipt = PoReceipt.objects.prefetch_related('items__po_item__product_sku').get(pk=receipt.pk)
+        return api_response(
+            status=status.HTTP_201_CREATED,
+            success=True,
+            message="Purchase order items received successfully",
+            data=PoReceiptSerializer(receipt).data
+        )
+
+    def analytics(self, request, *args, **kwargs):
+        serializer = PoAnalyticsQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Invalid query parameters",
+                error=serializer.errors
+            )
+
+        params = serializer.validated_data
+        rows = spend_summary(
+            params['group_by'],
+            start_month=params.get('start_date'),
+            end_month=params.get('end_date'),
+            supplier_id=params.get('supplier_id'),
+            sku=params.get('sku')
+        )
+        return api_response(
+            status=status.HTTP_200_OK,
+            success=True,
+            message="Purchase order analytics retrieved successfully",
+            data=rows
+        )
@@ -0,0 +1,78 @@
+from rest_framework import permissions, status, viewsets
+
+from api.mixins import CustomPaginationMixin
+from api.pagination import CustomPagination
+from api.utils import api_response
+from authentication.permissions import IsAdmin, IsProcurement
+from purchase_orders.models.purchase_order import PurchaseOrder
+from purchase_orders.serializers.purchase_order import PurchaseOrderListSerializer
+from purchase_orders.serializers.reorder import (
+    ReorderDraftRequestSerializer,
+    ReorderScanRequestSerializer,
+    ReorderScanSerializer,
+    SkuReorderPointSerializer,
+)
+from purchase_orders.services.reorder import at_risk_points, create_reorder_drafts, scan_reorder_points
+
+
+class ReorderViewSet(CustomPaginationMixin, viewsets.GenericViewSet):
+    serializer_class = SkuReorderPointSerializer
+    pagination_class = CustomPagination
+    permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsProcurement)]
+
+    def get_queryset(self):
+        return at_risk_points(supplier_id=self.request.query_params.get('supplier_id'))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data, message="At-risk SKUs retrieved successfully")
+
+        serializer = self.get_serializer(queryset, many=True)
+        return api_response(
+            status=status.HTTP_200_OK,
+            success=True,
+            message="At-risk SKUs retrieved successfully",
+            data=serializer.data
+        )
+
+    def scan(self, request, *args, **kwargs):
+        serializer = ReorderScanRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Invalid data",
+                error=serializer.errors
+            )
+
+        scan = scan_reorder_points(full=serializer.validated_data['full'])
+        return api_response(
+            status=status.HTTP_200_OK,
+            success=True,
+            message=f"{scan.sku_count} SKUs scanned",
+            data=ReorderScanSerializer(scan).data
+        )
+
+    def drafts(self, request, *args, **kwargs):
+        serializer = ReorderDraftRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Invalid data",
+                error=serializer.errors
+            )
+
+        purchase_orders = create_reorder_drafts(request.user, serializer.validated_data.get('supplier_ids'))
+        queryset = PurchaseOrder.objects.filter(
+            id__in=[purchase_order.id for purchase_order in purchase_orders]
+        ).with_summary().order_by('code')
+        return api_response(
+            status=status.HTTP_201_CREATED,
+            success=True,
+            message=f"{len(purchase_orders)} draft purchase orders created",
+            data=PurchaseOrderListSerializer(queryset, many=True).data
+        )
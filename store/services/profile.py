@@ -0,0 +1,54 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from store.models import Store
+
+STORE_PK = 1
+STORE_PROFILE_KEY = 'store:profile'
+
+STORE_FIELDS = [field.attname for field in Store._meta.concrete_fields]
+
+# (token, store or None, monotonic time the copy must be revalidated at)
+_local_profile = None
+
+
+def get_store_profile():
+    """
+    Returns the store singleton, or None if it has not been set up yet.
+
+    The row is cached in the shared cache under a random token and each
+    process keeps its own copy, revalidated against that token at most every
+    STORE_PROFILE_LOCAL_TTL seconds. Saving or deleting the store drops both
+    (see signals), so other workers pick the change up at their next
+    revalidation. The returned instance is shared: treat it as read-only.
+    """
+    global _local_profile
+
+    now = time.monotonic()
+    local = _local_profile
+    if local is not None and now < local[2]:
+        return local[1]
+
+    shared = cache.get(STORE_PROFILE_KEY)
+    if shared is None:
+        store = Store.objects.filter(pk=STORE_PK).first()
+        shared = (uuid.uuid4().hex, tuple(getattr(store, name) for name in STORE_FIELDS) if store else None)
+        cache.set(STORE_PROFILE_KEY, shared, None)
+    elif local is not None and local[0] == shared[0]:
+        store = local[1]
+    else:
+        store = Store.from_db(DEFAULT_DB_ALIAS, STORE_FIELDS, shared[1]) if shared[1] is not None else None
+
+    _local_profile = (shared[0], store, now + settings.STORE_PROFILE_LOCAL_TTL)
+    return store
+
+
+def invalidate_store_profile():
+    global _local_profile
+
+    _local_profile = None
+    cache.delete(STORE_PROFILE_KEY)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.utils import invalidate_now_and_on_commit
+from store.models import Store
+from store.services.profile import invalidate_store_profile
+
+
+@receiver([post_save, post_delete], sender=Store)
+def invalidate_cached_store_profile(sender, instance, **kwargs):
+    invalidate_now_and_on_commit(invalidate_store_profile)
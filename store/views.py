@@ -5,6 +5,7 @@ from authentication.permissions import IsAdmin, IsCashier
 
 from .models import Store
 from .serializers import StoreUpdateSerializer
+from .services.profile import STORE_PK, get_store_profile
 
 
 class StoreViewSet(viewsets.ModelViewSet):
@@ -13,7 +14,7 @@ class StoreViewSet(viewsets.ModelViewSet):
     queryset = Store.objects.all()
 
     def list(self, request, *args, **kwargs):
-        instance = Store.objects.filter(pk=1).first()
+        instance = get_store_profile()
         if not instance:
             return api_response(status=status.HTTP_404_NOT_FOUND, success=False, message="Store not found.")
         serializer = self.get_serializer(instance)
@@ -21,7 +22,7 @@ class StoreViewSet(viewsets.ModelViewSet):
 
     def partial_update(self, request, *args, **kwargs):
         try:
-            instance = Store.objects.get(pk=1)
+            instance = Store.objects.get(pk=STORE_PK)
             serializer = self.get_serializer(instance, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
@@ -29,5 +30,5 @@ class StoreViewSet(viewsets.ModelViewSet):
         except Store.DoesNotExist:
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            serializer.save(id=1)
+            serializer.save(id=STORE_PK)
             return api_response(status=status.HTTP_201_CREATED, success=True, message="Store created successfully.", data=serializer.data)
@@ -5,6 +5,10 @@ from django.db import models
 from django.db.models import IntegerField, Max, Value
 from django.db.models.functions import Cast, StrIndex, Substr
 
+from api.sequences import next_sequence_value
+
+SUPPLIER_CODE_SEQUENCE = 'SUPPLIER'
+
 
 class Supplier(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
@@ -32,33 +36,52 @@ class Supplier(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.code:
-            name = self.name.upper()
-            words = [w for w in name.split() if w]
-
-            alpha_part = "XXX"
-            if len(words) == 1:
-                alpha_part = words[0][:3].ljust(3, 'X')
-            elif len(words) == 2:
-                alpha_part = (words[0][0] + words[1][0] + 'X')
-            elif len(words) >= 3:
-                alpha_part = "".join(word[0] for word in words[:3])
-
-            alpha_part = alpha_part.upper()
-
-            max_num = Supplier.objects.filter(
-                code__regex=r'^\d+\-'
-            ).annotate(
-                num_part=Cast(
-                    Substr('code', 1, StrIndex('code', Value('-')) - 1),
-                    output_field=IntegerField()
-                )
-            ).aggregate(
-                max_num=Max('num_part')
-            )['max_num'] or 0
-            numeric_part = max_num + 1
-
-            formatted_numeric_part = str(numeric_part).zfill(4)
-
-            self.code = f"{formatted_numeric_part}-{alpha_part}"
+            self.code = self.build_code(self.allocate_code_numbers(), self.name)
 
         super().save(*args, **kwargs)
+
+    @staticmethod
+    def alpha_code(name):
+        words = [w for w in name.upper().split() if w]
+
+        alpha_part = "XXX"
+        if len(words) == 1:
+            alpha_part = words[0][:3].ljust(3, 'X')
+        elif len(words) == 2:
+            alpha_part = (words[0][0] + words[1][0] + 'X')
+        elif len(words) >= 3:
+            alpha_part = "".join(word[0] for word in words[:3])
+
+        return alpha_part.upper()
+
+    @classmethod
+    def build_code(cls, number, name):
+        return f"{str(number).zfill(4)}-{cls.alpha_code(name)}"
+
+    @staticmethod
+    def highest_code_number():
+        """
+        Scans existing codes for the highest number. Only used to seed the
+        supplier code sequence the first time it is needed.
+        """
+        return Supplier.objects.filter(
+            code__regex=r'^\d+\-'
+        ).annotate(
+            num_part=Cast(
+                Substr('code', 1, StrIndex('code', Value('-')) - 1),
+                output_field=IntegerField()
+            )
+        ).aggregate(
+            max_num=Max('num_part')
+        )['max_num'] or 0
+
+    @classmethod
+    def allocate_code_numbers(cls, count=1):
+        """
+        Reserves `count` consecutive supplier numbers and returns the first.
+
+        The numbers are committed on the sequences connection straight away
+        (see api.sequences), so the sequence row is not locked for the rest
+        of the caller's transaction, and a rolled-back create leaves a gap.
+        """
+        return next_sequence_value(SUPPLIER_CODE_SEQUENCE, count=count, initial=cls.highest_code_number)
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from suppliers.models.supplier import Supplier
@@ -34,3 +35,21 @@ class SupplierSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError('Both "name" and "phone" must be strings')
 
         return value
+
+
+class SupplierBulkCreateSerializer(serializers.Serializer):
+    suppliers = SupplierSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def create(self, validated_data):
+        """
+        Creates all suppliers with one block of codes and a single insert.
+        """
+        suppliers_data = validated_data['suppliers']
+
+        with transaction.atomic():
+            first_number = Supplier.allocate_code_numbers(len(suppliers_data))
+            suppliers = [
+                Supplier(code=Supplier.build_code(first_number + i, data['name']), **data)
+                for i, data in enumerate(suppliers_data)
+            ]
+            return Supplier.objects.bulk_create(suppliers)
@@ -5,6 +5,7 @@ from suppliers.views.supplier import SupplierViewSet
 
 urlpatterns = [
     path('', SupplierViewSet.as_view({'get': 'list', 'post': 'create'}), name='supplier-list'),
+    path('/bulk', SupplierViewSet.as_view({'post': 'bulk_create'}), name='supplier-bulk-create'),
     path('/payments', SupplierPaymentViewSet.as_view({'get': 'list', 'post': 'create'}), name='supplier-payment-list'),
     path('/payments/<pk>', SupplierPaymentViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update', 'delete': 'destroy'}), name='supplier-payment-detail'),
     path('/<pk>', SupplierViewSet.as_view({'get': 'retrieve', 'patch': 'partial_update', 'delete': 'destroy'}), name='supplier-detail'),
@@ -8,7 +8,7 @@ from api.pagination import CustomPagination
 from api.utils import api_response
 from authentication.permissions import IsAdmin, IsProcurement
 from suppliers.models.supplier import Supplier
-from suppliers.serializers.supplier import SupplierSerializer
+from suppliers.serializers.supplier import SupplierBulkCreateSerializer, SupplierSerializer
 
 
 class SupplierViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
@@ -24,7 +24,7 @@ class SupplierViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
         - Create, update, delete → Admin or Procurement only
         - Read → Any authenticated user
         """
-        if self.action in ['create', 'partial_update', 'destroy']:
+        if self.action in ['create', 'bulk_create', 'partial_update', 'destroy']:
             permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsProcurement)]
         else:
             permission_classes = [permissions.IsAuthenticated]
@@ -105,6 +105,24 @@ class SupplierViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
         )
         return Response(response_obj.data, status=response_obj.status_code)
 
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = SupplierBulkCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Invalid data",
+                error=serializer.errors
+            )
+
+        suppliers = serializer.save()
+        return api_response(
+            status=status.HTTP_201_CREATED,
+            success=True,
+            message=f"{len(suppliers)} suppliers created successfully",
+            data=SupplierSerializer(suppliers, many=True).data
+        )
+
     def partial_update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', True)
         instance = self.get_object()
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from transactions.models.idempotency_key import IdempotencyKey
+from transactions.models.period_close_export import PeriodCloseExport
 from transactions.models.transaction import Transaction
 from transactions.models.transaction_coupon import TransactionCoupon
 from transactions.models.transaction_item import TransactionItem
@@ -30,3 +32,13 @@ class TransactionItemAdmin(admin.ModelAdmin):
 class TransactionCouponAdmin(admin.ModelAdmin):
     list_display = ('transaction', 'coupon_code')
     search_fields = ('transaction__code', 'coupon_code__code')
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'user', 'method', 'path', 'response_status', 'created_at')
+    search_fields = ('key', 'path')
+
+@admin.register(PeriodCloseExport)
+class PeriodCloseExportAdmin(admin.ModelAdmin):
+    list_display = ('start_date', 'end_date', 'output', 'status', 'requested_by', 'created_at', 'completed_at')
+    list_filter = ('status', 'output')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from transactions.models.period_close_export import PeriodCloseExport
+from transactions.services.period_close import requeue_stale_exports, run_period_close
+
+
+class Command(BaseCommand):
+    help = 'Builds period-close exports that are still pending, or were left running by a worker that died.'
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_exports()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale period-close exports.')
+        pending = PeriodCloseExport.objects.filter(status=PeriodCloseExport.Status.PENDING).order_by('created_at')
+        built = 0
+        for export_id in pending.values_list('id', flat=True):
+            export = run_period_close(export_id)
+            if export is not None:
+                built += 1
+                self.stdout.write(f'{export.pk}: {export.status}')
+        self.stdout.write(self.style.SUCCESS(f'Built {built} period-close exports.'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_rename_partnership_discount_transactionitem_supplier_discount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transactionitem',
+            name='coupon_discount',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_period_close_export'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='code',
+            field=models.CharField(editable=False, max_length=24, unique=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_widen_transaction_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='periodcloseexport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
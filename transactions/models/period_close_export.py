@@ -0,0 +1,42 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class PeriodCloseExport(models.Model):
+    """
+    Consolidated month-end export of a date range, built in the background:
+    one sheet per supplier plus the supplier, category and coupon summaries.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
+    class Output(models.TextChoices):
+        XLSX = "xlsx", "XLSX"
+        ZIP = "zip", "ZIP"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='period_close_exports')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    output = models.CharField(max_length=4, choices=Output.choices, default=Output.XLSX)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to='period_close_exports/', null=True, blank=True)
+    supplier_count = models.PositiveIntegerField(default=0)
+    row_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last status change; a running export that stops changing was abandoned
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'transaction_period_close_exports'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.start_date} - {self.end_date} ({self.status})"
@@ -1,8 +1,9 @@
 import uuid
-from datetime import datetime
 
 from django.db import models
 
+from api.sequences import next_document_code
+
 
 class Transaction(models.Model):
     PAYMENT_CHOICES = [
@@ -11,7 +12,7 @@ class Transaction(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    code = models.CharField(max_length=20, editable=False, unique=True)
+    code = models.CharField(max_length=24, editable=False, unique=True)
     pay = models.BigIntegerField(null=True, blank=True)
     sub_total = models.BigIntegerField()
     discount_total = models.BigIntegerField(null=True, blank=True)
@@ -31,5 +32,5 @@ class Transaction(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.code:
-            self.code = f"TRANS/{datetime.now().strftime('%Y%m%d')}/{self.id.hex[:4]}"
+            self.code = next_document_code('TRANS')
         super().save(*args, **kwargs)
@@ -14,6 +14,7 @@ class TransactionItem(models.Model):
     unit_price = models.BigIntegerField()
     supplier_discount = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0), MaxValueValidator(100)])
     amount = models.IntegerField()
+    coupon_discount = models.BigIntegerField(null=True, blank=True)
 
     class Meta:
         db_table = 'transaction_item'
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from transactions.models.period_close_export import PeriodCloseExport
+
+
+class PeriodCloseExportSerializer(serializers.ModelSerializer):
+    requested_by = serializers.CharField(source='requested_by.name', read_only=True)
+
+    class Meta:
+        model = PeriodCloseExport
+        fields = [
+            'id', 'requested_by', 'start_date', 'end_date', 'output', 'status',
+            'supplier_count', 'row_count', 'error', 'created_at', 'completed_at',
+        ]
+
+
+class PeriodCloseRequestSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    output = serializers.ChoiceField(choices=PeriodCloseExport.Output.choices, required=False, default=PeriodCloseExport.Output.XLSX)
+
+    def validate(self, attrs):
+        if attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError({'end_date': 'End date must not be before start date.'})
+        return attrs
@@ -1,14 +1,19 @@
+from collections import defaultdict
+
 from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
 from cashier_books.models import CashierBook
-from coupons.models.coupon_code import CouponCode
+from coupons.services.redemption import apply_coupon_usage
+from coupons.services.resolver import resolve_coupon_codes
 from products.models.sku import ProductSKU
+from products.services.stock import adjust_stock
 from transactions.models.transaction import Transaction
 from transactions.models.transaction_cashier_book import TransactionCashierBooks
 from transactions.models.transaction_coupon import TransactionCoupon
 from transactions.models.transaction_item import TransactionItem
+from transactions.services.pricing import price_basket
 from users.serializers import UserSerializer
 
 from .transaction_coupon import TransactionCouponOutputSerializer
@@ -16,50 +21,32 @@ from .transaction_item import TransactionItemSerializer
 
 
 def validate_coupon_availability(coupon_code_instance, amount_needed):
+    """
+    Checks the static rules of a coupon code. Remaining stock is enforced
+    when the code is redeemed, see redeem_coupons().
+    """
+    if amount_needed is None or amount_needed < 1:
+        raise serializers.ValidationError(f"Coupon {coupon_code_instance.code} amount must be at least 1.")
     if coupon_code_instance.disabled:
         raise serializers.ValidationError(f"Coupon {coupon_code_instance.code} is disabled.")
-    if coupon_code_instance.stock < (coupon_code_instance.used + amount_needed):
+    if coupon_code_instance.stock < amount_needed:
         raise serializers.ValidationError(f"Coupon {coupon_code_instance.code} out of stock.")
     
     now = timezone.now()
     if coupon_code_instance.coupon.start_time > now or coupon_code_instance.coupon.end_time < now:
         raise serializers.ValidationError(f"Coupon {coupon_code_instance.code} is not valid at this time.")
 
-def calculate_discounts(sub_total, coupon_items):
-    voucher_discount = 0
-    percentage_discount = 0
-    percentage_coupon_count = 0
-    
-    calculated_items_values = []
-    
-    for item in coupon_items:
-        coupon = item['coupon']
-        amount = item['amount']
-        
-        item_voucher_value = None
-        item_discount_value = None
-
-        if coupon.type == 'discount':
-            percentage_coupon_count += 1
-            if percentage_coupon_count > 1:
-                raise serializers.ValidationError("Only one percentage discount coupon is allowed.")
-            if amount > 1:
-                raise serializers.ValidationError("Percentage discount coupon amount cannot be more than 1.")
-            
-            discount_amount = int(sub_total * coupon.discount_percentage / 100)
-            percentage_discount += discount_amount
-            item_discount_value = discount_amount
-
-        elif coupon.type == 'voucher':
-            voucher_discount += (coupon.voucher_value * amount)
-            item_voucher_value = coupon.voucher_value
-            
-        calculated_items_values.append({
-            'item_voucher_value': item_voucher_value,
-            'item_discount_value': item_discount_value
-        })
-        
-    return voucher_discount, percentage_discount, calculated_items_values
+def redeem_coupons(coupon_usage):
+    """
+    Applies (coupon code, amount) pairs, redeeming positive and releasing
+    negative amounts, in a single UPDATE.
+    """
+    deltas = defaultdict(int)
+    for coupon_code_instance, amount in coupon_usage:
+        deltas[coupon_code_instance.id] += amount
+    if not apply_coupon_usage(deltas):
+        codes = sorted({coupon_code_instance.code for coupon_code_instance, amount in coupon_usage if amount > 0})
+        raise serializers.ValidationError(f"Coupon {', '.join(codes)} out of stock.")
 
 class TransactionSerializer(serializers.ModelSerializer):
     items = TransactionItemSerializer(many=True)
@@ -93,64 +80,54 @@ class TransactionSerializer(serializers.ModelSerializer):
         except CashierBook.DoesNotExist:
             raise serializers.ValidationError({"cashier_book_id": "Cashier book not found."})
         
-        calculated_sub_total = 0
         items_to_create = []
 
-        # Calculate sub_total and prepare items data
+        # Prepare items data
+        product_skus = ProductSKU.objects.select_related('product').in_bulk(
+            [item_data['product_sku'] for item_data in items_data], field_name='sku'
+        )
         for item_data in items_data:
             sku_code = item_data.pop('product_sku')
-            product_sku_instance = ProductSKU.objects.select_related('product').get(sku=sku_code)
-            price = product_sku_instance.product.price
-            amount = item_data['amount']
-            
-            item_total = price * amount
-            calculated_sub_total += item_total
-            
+            product_sku_instance = product_skus[sku_code]
+
             items_to_create.append({
                 'product_sku': product_sku_instance,
-                'unit_price': price,
-                'amount': amount
+                'unit_price': product_sku_instance.product.price,
+                'amount': item_data['amount']
             })
-            
-        validated_data['sub_total'] = calculated_sub_total
-        
+
         # Validate coupons and calculate discount
-        voucher_discount = 0
-        percentage_discount = 0
         valid_coupons = []
-        
+
         # Only process coupons if transaction is not saved
         if not validated_data.get('is_saved', False):
-            valid_coupons_info = []
+            coupon_codes = resolve_coupon_codes([coupon_data.get('code') for coupon_data in coupons_data], fresh_usage=False)
             for coupon_data in coupons_data:
                 code = coupon_data.get('code')
                 amount = coupon_data.get('amount')
-                try:
-                    coupon_code_instance = CouponCode.objects.select_related('coupon').get(code=code)
-                    validate_coupon_availability(coupon_code_instance, amount)
-                    
-                    valid_coupons_info.append({
-                        'coupon_code': coupon_code_instance,
-                        'amount': amount,
-                        'coupon': coupon_code_instance.coupon
-                    })
-                except CouponCode.DoesNotExist:
+                coupon_code_instance = coupon_codes.get(code)
+                if coupon_code_instance is None:
                     raise serializers.ValidationError(f"Coupon code {code} not found.")
 
-            voucher_discount, percentage_discount, calculated_coupon_values = calculate_discounts(calculated_sub_total, valid_coupons_info)
-            
-            for i, info in enumerate(valid_coupons_info):
-                 vals = calculated_coupon_values[i]
-                 valid_coupons.append({
-                     'coupon_code': info['coupon_code'],
-                     'amount': info['amount'],
-                     'item_voucher_value': vals['item_voucher_value'],
-                     'item_discount_value': vals['item_discount_value']
-                 })
-
-        total_discount = int(voucher_discount + percentage_discount)
-        validated_data['discount_total'] = total_discount
-        validated_data['total'] = max(0, calculated_sub_total - total_discount)
+                validate_coupon_availability(coupon_code_instance, amount)
+                valid_coupons.append({
+                    'coupon_code': coupon_code_instance,
+                    'amount': amount,
+                    'coupon': coupon_code_instance.coupon
+                })
+
+        pricing = price_basket(
+            [(item['unit_price'], item['amount']) for item in items_to_create],
+            valid_coupons
+        )
+        for item, line_discount in zip(items_to_create, pricing.line_discounts):
+            item['coupon_discount'] = line_discount
+        for coupon_item, values in zip(valid_coupons, pricing.coupon_values):
+            coupon_item.update(values)
+
+        validated_data['sub_total'] = pricing.sub_total
+        validated_data['discount_total'] = pricing.discount_total
+        validated_data['total'] = pricing.total
 
         if validated_data['total'] == 0 and not validated_data.get('is_saved', False):
              validated_data['pay'] = 0
@@ -174,33 +151,33 @@ class TransactionSerializer(serializers.ModelSerializer):
             )
 
             # Create transaction items
-            for item in items_to_create:
-                supplier_discount = None
-                if transaction_instance.paid_time:
-                    supplier_discount = item['product_sku'].supplier_discount
-
-                TransactionItem.objects.create(
+            TransactionItem.objects.bulk_create([
+                TransactionItem(
                     transaction=transaction_instance,
-                    supplier_discount=supplier_discount,
+                    supplier_discount=item['product_sku'].supplier_discount if transaction_instance.paid_time else None,
                     **item
                 )
-                
-                if transaction_instance.paid_time:
-                    product_sku_instance = item['product_sku']
-                    product_sku_instance.stock -= item['amount']
-                    product_sku_instance.save()
-            
+                for item in items_to_create
+            ])
+
+            if transaction_instance.paid_time:
+                stock_deltas = defaultdict(int)
+                for item in items_to_create:
+                    stock_deltas[item['product_sku'].id] -= item['amount']
+                adjust_stock(stock_deltas)
+
             # Create transaction coupons
-            for coupon_item in valid_coupons:
-                TransactionCoupon.objects.create(
+            TransactionCoupon.objects.bulk_create([
+                TransactionCoupon(
                     transaction=transaction_instance,
                     coupon_code=coupon_item['coupon_code'],
                     amount=coupon_item['amount'],
                     item_voucher_value=coupon_item['item_voucher_value'],
                     item_discount_value=coupon_item['item_discount_value']
                 )
-                coupon_item['coupon_code'].used += coupon_item['amount']
-                coupon_item['coupon_code'].save()
+                for coupon_item in valid_coupons
+            ])
+            redeem_coupons([(coupon_item['coupon_code'], coupon_item['amount']) for coupon_item in valid_coupons])
                 
         return transaction_instance
 
@@ -215,165 +192,161 @@ class TransactionUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         items_data = validated_data.pop('items', None)
         coupons_data = self.initial_data.get('coupons', None)
-        
+
         with transaction.atomic():
             # Check payment status
             was_paid = instance.paid_time is not None
             is_becoming_paid = validated_data.get('paid_time') is not None
             is_paid_now = was_paid or is_becoming_paid
 
+            current_items = list(instance.items.select_related('product_sku__product'))
+            current_coupons = list(instance.coupons.select_related('coupon_code__coupon'))
+
+            # {sku_id: delta} applied to ProductSKU.stock in one statement
+            stock_deltas = defaultdict(int)
+            items_to_delete = []
+            items_to_create = []
+
             if items_data is not None:
-                # 1. Retrieve all of old items from database
-                old_items = {item.product_sku.sku: item for item in instance.items.select_related('product_sku__product').all()}
-                new_items_skus = set(item['product_sku'] for item in items_data)
-                
-                # 2. If the item is not inputed on new payload delete it, and append stock to related product sku item.
-                for sku, old_item in old_items.items():
-                    if sku not in new_items_skus:
+                old_items = {item.product_sku.sku: item for item in current_items}
+                new_amounts = {item['product_sku']: item['amount'] for item in items_data}
+                new_skus = ProductSKU.objects.select_related('product').in_bulk(
+                    [sku for sku in new_amounts if sku not in old_items], field_name='sku'
+                )
+
+                # Items missing from the payload are removed, their stock is given back if it was taken.
+                for sku_code, old_item in old_items.items():
+                    if sku_code not in new_amounts:
                         if was_paid:
-                            old_item.product_sku.stock += old_item.amount
-                            old_item.product_sku.save()
-                        old_item.delete()
-                
-                # 3. If the item not exists on old items, add new and negative stock based on amounts that inputed.
-                for item_data in items_data:
-                    sku_code = item_data['product_sku']
-                    amount = item_data['amount']
-                    
-                    if sku_code in old_items:
-                        old_item = old_items[sku_code]
-                        # Update existing item
+                            stock_deltas[old_item.product_sku_id] += old_item.amount
+                        items_to_delete.append(old_item)
+
+                kept_items = []
+                for sku_code, amount in new_amounts.items():
+                    old_item = old_items.get(sku_code)
+                    if old_item is not None:
                         if is_paid_now:
-                            if was_paid:
-                                stock_diff = amount - old_item.amount
-                                if stock_diff != 0:
-                                    old_item.product_sku.stock -= stock_diff
-                                    old_item.product_sku.save()
-                            else:
-                                old_item.product_sku.stock -= amount
-                                old_item.product_sku.save()
-                        
+                            stock_deltas[old_item.product_sku_id] -= amount - old_item.amount if was_paid else amount
+                            old_item.supplier_discount = old_item.product_sku.supplier_discount
                         old_item.amount = amount
                         old_item.unit_price = old_item.product_sku.product.price
-                        if is_paid_now:
-                            old_item.supplier_discount = old_item.product_sku.supplier_discount
-                        old_item.save()
+                        kept_items.append(old_item)
                     else:
-                        # Add new item
-                        product_sku_instance = ProductSKU.objects.select_related('product').get(sku=sku_code)
-                        supplier_discount = None
+                        product_sku_instance = new_skus.get(sku_code)
+                        if product_sku_instance is None:
+                            raise serializers.ValidationError(f"Product SKU {sku_code} does not exist.")
                         if is_paid_now:
-                            supplier_discount = product_sku_instance.supplier_discount
-
-                        TransactionItem.objects.create(
+                            stock_deltas[product_sku_instance.id] -= amount
+                        items_to_create.append(TransactionItem(
                             transaction=instance,
                             product_sku=product_sku_instance,
                             unit_price=product_sku_instance.product.price,
                             amount=amount,
-                            supplier_discount=supplier_discount
-                        )
-                        if is_paid_now:
-                            product_sku_instance.stock -= amount
-                            product_sku_instance.save()
-            
+                            supplier_discount=product_sku_instance.supplier_discount if is_paid_now else None
+                        ))
+
+                current_items = kept_items + items_to_create
+
             elif is_becoming_paid and not was_paid:
-                for item in instance.items.select_related('product_sku').all():
-                    item.product_sku.stock -= item.amount
-                    item.product_sku.save()
+                for item in current_items:
+                    stock_deltas[item.product_sku_id] -= item.amount
                     item.supplier_discount = item.product_sku.supplier_discount
-                    item.save()
-            
+
+            coupons_to_delete = []
+            coupons_to_create = []
+            # (coupon code, amount) pairs to redeem (positive) or release (negative)
+            coupon_usage = []
+
             if coupons_data is not None:
-                old_coupons = {c.coupon_code.code: c for c in instance.coupons.select_related('coupon_code').all()}
+                old_coupons = {c.coupon_code.code: c for c in current_coupons}
                 new_coupons_codes = set(c.get('code') for c in coupons_data)
-                
+
                 # Delete removed coupons
                 for code, old_coupon in old_coupons.items():
                     if code not in new_coupons_codes:
-                        old_coupon.coupon_code.used -= old_coupon.amount
-                        old_coupon.coupon_code.save()
-                        old_coupon.delete()
-                
+                        coupon_usage.append((old_coupon.coupon_code, -old_coupon.amount))
+                        coupons_to_delete.append(old_coupon)
+
                 # Add/Update coupons
+                new_coupon_codes = resolve_coupon_codes([c.get('code') for c in coupons_data if c.get('code') not in old_coupons], fresh_usage=False)
+                kept_coupons = []
                 for coupon_data in coupons_data:
                     code = coupon_data.get('code')
                     amount = coupon_data.get('amount')
-                    
+
                     if code in old_coupons:
                         old_coupon = old_coupons[code]
-                        diff = amount - old_coupon.amount
-                        if diff != 0:
-                            if diff > 0:
-                                if old_coupon.coupon_code.stock < (old_coupon.coupon_code.used + diff):
-                                     raise serializers.ValidationError(f"Coupon {code} out of stock.")
-                            
-                            old_coupon.coupon_code.used += diff
-                            old_coupon.coupon_code.save()
-                            old_coupon.amount = amount
-                            old_coupon.save()
+                        if amount is None or amount < 1:
+                            raise serializers.ValidationError(f"Coupon {code} amount must be at least 1.")
+
+                        coupon_usage.append((old_coupon.coupon_code, amount - old_coupon.amount))
+                        old_coupon.amount = amount
+                        kept_coupons.append(old_coupon)
                     else:
-                        try:
-                            coupon_code_instance = CouponCode.objects.get(code=code)
-                            validate_coupon_availability(coupon_code_instance, amount)
-
-                            TransactionCoupon.objects.create(
-                                transaction=instance,
-                                coupon_code=coupon_code_instance,
-                                amount=amount
-                            )
-                            coupon_code_instance.used += amount
-                            coupon_code_instance.save()
-                        except CouponCode.DoesNotExist:
-                             raise serializers.ValidationError(f"Coupon code {code} not found.")
-            
+                        coupon_code_instance = new_coupon_codes.get(code)
+                        if coupon_code_instance is None:
+                            raise serializers.ValidationError(f"Coupon code {code} not found.")
+
+                        validate_coupon_availability(coupon_code_instance, amount)
+                        coupon_usage.append((coupon_code_instance, amount))
+                        coupons_to_create.append(TransactionCoupon(
+                            transaction=instance,
+                            coupon_code=coupon_code_instance,
+                            amount=amount
+                        ))
+
+                current_coupons = kept_coupons + coupons_to_create
+
             # Update other fields
-            instance = super().update(instance, validated_data)
-            
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+
             # Recalculate totals if items changed or coupons changed
             if items_data is not None or coupons_data is not None:
-                if items_data is not None:
-                    current_items = instance.items.all()
-                    sub_total = sum(item.unit_price * item.amount for item in current_items)
-                    instance.sub_total = sub_total
-                else:
-                    sub_total = instance.sub_total
-                
-                # Calculate discount from current coupons in DB
-                current_coupons = list(instance.coupons.select_related('coupon_code__coupon').all())
-                
-                coupon_items_for_calc = []
-                for tc in current_coupons:
-                     coupon_items_for_calc.append({
-                         'coupon': tc.coupon_code.coupon,
-                         'amount': tc.amount
-                     })
-
-                voucher_discount, percentage_discount, calculated_values = calculate_discounts(sub_total, coupon_items_for_calc)
-
-                for i, transaction_coupon in enumerate(current_coupons):
-                    vals = calculated_values[i]
-                    transaction_coupon.item_voucher_value = vals['item_voucher_value']
-                    transaction_coupon.item_discount_value = vals['item_discount_value']
-                    transaction_coupon.save()
-                
-                instance.discount_total = int(voucher_discount + percentage_discount)
-                instance.total = max(0, sub_total - instance.discount_total)
-                instance.save()
-            
+                pricing = price_basket(
+                    [(item.unit_price, item.amount) for item in current_items],
+                    [{'coupon': tc.coupon_code.coupon, 'amount': tc.amount} for tc in current_coupons]
+                )
+
+                for item, line_discount in zip(current_items, pricing.line_discounts):
+                    item.coupon_discount = line_discount
+                for transaction_coupon, values in zip(current_coupons, pricing.coupon_values):
+                    transaction_coupon.item_voucher_value = values['item_voucher_value']
+                    transaction_coupon.item_discount_value = values['item_discount_value']
+
+                instance.sub_total = pricing.sub_total
+                instance.discount_total = pricing.discount_total
+                instance.total = pricing.total
+
             if instance.pay is not None:
                 if instance.pay < instance.total:
                      raise serializers.ValidationError({"pay": "Pay amount cannot be less than total amount."})
-                
+
             if instance.total == 0 and not instance.is_saved:
                 instance.pay = 0
                 if not instance.paid_time:
                     instance.paid_time = timezone.now()
-                    instance.save()
                     # Reduce stock since it's now paid
-                    for item in instance.items.all():
+                    for item in current_items:
                         item.supplier_discount = item.product_sku.supplier_discount
-                        item.save()
-                        item.product_sku.stock -= item.amount
-                        item.product_sku.save()
-                     
+                        stock_deltas[item.product_sku_id] -= item.amount
+
+            redeem_coupons(coupon_usage)
+
+            if items_to_delete:
+                TransactionItem.objects.filter(id__in=[item.id for item in items_to_delete]).delete()
+            if coupons_to_delete:
+                TransactionCoupon.objects.filter(id__in=[c.id for c in coupons_to_delete]).delete()
+
+            items_to_update = [item for item in current_items if not item._state.adding]
+            TransactionItem.objects.bulk_update(items_to_update, ['amount', 'unit_price', 'supplier_discount', 'coupon_discount'])
+            TransactionItem.objects.bulk_create(items_to_create)
+
+            coupons_to_update = [c for c in current_coupons if not c._state.adding]
+            TransactionCoupon.objects.bulk_update(coupons_to_update, ['amount', 'item_voucher_value', 'item_discount_value'])
+            TransactionCoupon.objects.bulk_create(coupons_to_create)
+
+            adjust_stock(stock_deltas)
+            instance.save()
+
         return instance
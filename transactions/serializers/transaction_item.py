@@ -1,3 +1,5 @@
+from collections import Counter
+
 from rest_framework import serializers
 
 from products.models.sku import ProductSKU
@@ -5,6 +7,20 @@ from products.serializers.category import ProductCategorySerializer
 from transactions.models.transaction_item import TransactionItem
 
 
+class TransactionItemListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        sku_codes = {item['product_sku'] for item in attrs}
+        existing = set(ProductSKU.objects.filter(sku__in=sku_codes).values_list('sku', flat=True))
+        missing = sorted(sku_codes - existing)
+        if missing:
+            raise serializers.ValidationError(f"Product SKU does not exist: {', '.join(missing)}.")
+
+        duplicates = sorted(code for code, count in Counter(item['product_sku'] for item in attrs).items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(f"Each SKU can only appear once: {', '.join(duplicates)}.")
+        return attrs
+
+
 class TransactionItemSerializer(serializers.ModelSerializer):
     product_sku = serializers.CharField(write_only=True)
     name = serializers.CharField(source='product_sku.product.name', read_only=True)
@@ -12,13 +28,9 @@ class TransactionItemSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = TransactionItem
-        fields = ['product_sku', 'name', 'sku_code', 'unit_price', 'amount', 'supplier_discount']
-        read_only_fields = ['unit_price']
-
-    def validate_product_sku(self, value):
-        if not ProductSKU.objects.filter(sku=value).exists():
-            raise serializers.ValidationError("Product SKU does not exist.")
-        return value
+        fields = ['product_sku', 'name', 'sku_code', 'unit_price', 'amount', 'supplier_discount', 'coupon_discount']
+        read_only_fields = ['unit_price', 'coupon_discount']
+        list_serializer_class = TransactionItemListSerializer
 
 
 class SupplierTransactionItemSerializer(serializers.ModelSerializer):
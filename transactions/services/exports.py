@@ -0,0 +1,160 @@
+"""
+Streaming line-item exports.
+
+Rows are read with .iterator(chunk_size) (a server-side cursor on
+PostgreSQL) inside one REPEATABLE READ transaction, so a long export sees a
+single snapshot and memory stays flat however many rows it covers.
+
+Every export goes through ExportMetrics, which logs the row count, rows/sec
+and (with EXPORT_TRACE_MEMORY) the peak Python memory of the export to the
+"transactions.exports" logger.
+"""
+import csv
+import json
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+
+from api.utils import Echo
+from transactions.models.transaction_item import TransactionItem
+
+logger = logging.getLogger('transactions.exports')
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (column name, lookup on TransactionItem)
+LINE_ITEM_COLUMNS = [
+    ('transaction_code', 'transaction__code'),
+    ('paid_time', 'transaction__paid_time'),
+    ('payment', 'transaction__payment'),
+    ('cashier', 'transaction__cashier_book_transactions__cashier_book__cashier__name'),
+    ('sku', 'product_sku__sku'),
+    ('product_name', 'product_sku__product__name'),
+    ('unit_price', 'unit_price'),
+    ('amount', 'amount'),
+    ('line_total', F('unit_price') * F('amount')),
+    ('supplier_discount', 'supplier_discount'),
+    ('coupon_discount', 'coupon_discount'),
+    ('transaction_discount_total', 'transaction__discount_total'),
+    ('transaction_total', 'transaction__total'),
+]
+
+
+class ExportMetrics:
+    """
+    Context manager timing one export; wrap its row source with track().
+
+        with ExportMetrics('coupons') as metrics:
+            for row in metrics.track(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)):
+                ...
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.peak_memory = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if settings.EXPORT_TRACE_MEMORY:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        if settings.EXPORT_TRACE_MEMORY:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+
+        logger.info(
+            'export %s: %d rows in %.2fs (%.0f rows/s), peak memory %s',
+            self.name,
+            self.rows,
+            elapsed,
+            self.rows / elapsed if elapsed else 0,
+            f'{self.peak_memory / 1048576:.1f} MiB' if self.peak_memory is not None else 'not traced',
+            extra={
+                'export': self.name,
+                'rows': self.rows,
+                'seconds': elapsed,
+                'peak_memory': self.peak_memory,
+                'failed': exc_type is not None,
+            }
+        )
+        return False
+
+    def track(self, rows):
+        for row in rows:
+            self.rows += 1
+            yield row
+
+
+def instrumented(rows, name):
+    """
+    Generator form of ExportMetrics for streamed responses; logs when the
+    stream is exhausted or closed by the client.
+    """
+    with ExportMetrics(name) as metrics:
+        yield from metrics.track(rows)
+
+
+def line_item_rows(transactions):
+    """
+    values_list queryset of LINE_ITEM_COLUMNS for the items of `transactions`.
+    """
+    expressions = {name: lookup for name, lookup in LINE_ITEM_COLUMNS if not isinstance(lookup, str)}
+    columns = [name if not isinstance(lookup, str) else lookup for name, lookup in LINE_ITEM_COLUMNS]
+
+    return TransactionItem.objects.filter(
+        transaction__in=transactions.order_by().values('pk')
+    ).annotate(**expressions).order_by('transaction__paid_time', 'transaction__code', 'id').values_list(*columns)
+
+
+@contextmanager
+def snapshot():
+    """
+    Runs the block in one REPEATABLE READ transaction, so every query in it
+    sees the same data.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        yield
+
+
+def snapshot_iterator(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterates a queryset in chunks within a REPEATABLE READ transaction.
+    """
+    with snapshot():
+        yield from queryset.iterator(chunk_size=chunk_size)
+
+
+def stream_line_items(transactions, output='csv'):
+    """
+    Yields the export as CSV lines or NDJSON objects, one row at a time.
+    """
+    names = [name for name, _ in LINE_ITEM_COLUMNS]
+    rows = instrumented(snapshot_iterator(line_item_rows(transactions)), f'transaction_items_{output}')
+
+    if output == 'ndjson':
+        for row in rows:
+            yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n'
+        return
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,105 @@
+"""
+Idempotency-Key support for write endpoints.
+
+The key row is inserted in the same database transaction as the view's own
+writes and holds the response once the view succeeds. A concurrent retry
+blocks on the unique (user, key) insert until the first request commits and
+is then answered with the stored response. Failed requests leave no row, so
+they can be retried with the same key.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.utils import api_response
+from transactions.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(f"{request.method}\n{request.path}\n{body}".encode()).hexdigest()
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def purge_expired_keys():
+    """
+    Deletes keys older than IDEMPOTENCY_KEY_TTL_HOURS. Returns how many were removed.
+    """
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()
+    return deleted
+
+
+def idempotent(view_method):
+    """
+    Makes a viewset method honour the Idempotency-Key header. Requests
+    without the header are handled as before.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > 255:
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message=f"{IDEMPOTENCY_HEADER} must be at most 255 characters."
+            )
+
+        fingerprint = request_fingerprint(request)
+
+        with transaction.atomic():
+            record, created = IdempotencyKey.objects.get_or_create(
+                user=request.user,
+                key=key,
+                defaults={'method': request.method, 'path': request.path, 'fingerprint': fingerprint}
+            )
+
+            if not created and record.created_at < expiry_cutoff():
+                record.method = request.method
+                record.path = request.path
+                record.fingerprint = fingerprint
+                record.response_status = None
+                record.response_body = None
+                record.created_at = timezone.now()
+                record.save()
+            elif not created:
+                if record.fingerprint != fingerprint:
+                    return api_response(
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        success=False,
+                        message=f"{IDEMPOTENCY_HEADER} was already used for a different request."
+                    )
+                return Response(
+                    record.response_body,
+                    status=record.response_status,
+                    headers={REPLAYED_HEADER: 'true'}
+                )
+
+            response = view_method(self, request, *args, **kwargs)
+
+            if status.is_success(response.status_code):
+                record.response_status = response.status_code
+                record.response_body = response.data
+                record.save(update_fields=['response_status', 'response_body'])
+            else:
+                record.delete()
+
+        return response
+
+    return wrapper
@@ -0,0 +1,110 @@
+"""
+Minimal PDF writer for monospaced text reports and receipts.
+
+Only what those need: pages of Courier text lines, optionally bold, either
+A4 landscape or a roll (fixed width, each page as tall as its lines).
+Objects are written to the stream as soon as a page is finished, so memory
+holds one page at a time whatever the document length.
+"""
+
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+MARGIN = 36
+CHAR_WIDTH = 0.6  # Courier advance width per point of font size
+
+CATALOG_ID = 1
+PAGES_ID = 2
+REGULAR_FONT_ID = 3
+BOLD_FONT_ID = 4
+
+
+def escape(text):
+    text = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return text.encode('cp1252', errors='replace')
+
+
+class PdfDocument:
+    """
+    Writes pages of (text, bold) lines to a binary stream.
+
+        document = PdfDocument(stream, line_width=150)
+        document.add_page([('SALES REPORT', True), ('...', False)])
+        document.close()
+
+    With page_height=None every page is sized to fit its lines.
+    """
+
+    def __init__(self, stream, line_width=100, max_font_size=8, page_width=PAGE_WIDTH, page_height=PAGE_HEIGHT,
+                 margin=MARGIN):
+        self.stream = stream
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = BOLD_FONT_ID + 1
+        self.page_width = page_width
+        self.page_height = page_height
+        self.margin = margin
+
+        usable = page_width - 2 * margin
+        self.font_size = min(max_font_size, usable / (max(line_width, 1) * CHAR_WIDTH))
+        self.leading = self.font_size * 1.25
+        self.lines_per_page = int((page_height - 2 * margin) // self.leading) if page_height else None
+
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._object(REGULAR_FONT_ID, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>')
+        self._object(BOLD_FONT_ID, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>')
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def _object(self, obj_id, body):
+        self.offsets[obj_id] = self.position
+        self._write(b'%d 0 obj\n' % obj_id + body + b'\nendobj\n')
+
+    def _allocate(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def add_page(self, lines):
+        size = b'%.2f' % self.font_size
+        height = self.page_height or 2 * self.margin + (len(lines) + 1) * self.leading
+        content = [
+            b'BT',
+            b'%.2f TL' % self.leading,
+            b'%d %.2f Td' % (self.margin, height - self.margin),
+        ]
+        bold = None
+        for text, is_bold in lines:
+            if is_bold != bold:
+                content.append(b'/F%d %s Tf' % (2 if is_bold else 1, size))
+                bold = is_bold
+            content.append(b'(' + escape(text) + b") '")
+        content.append(b'ET')
+        content = b'\n'.join(content)
+
+        content_id = self._allocate()
+        self._object(content_id, b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+
+        page_id = self._allocate()
+        self._object(page_id, (
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %.2f] '
+            b'/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>'
+        ) % (PAGES_ID, self.page_width, height, REGULAR_FONT_ID, BOLD_FONT_ID, content_id))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        if not self.page_ids:
+            self.add_page([])
+
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self.page_ids)
+        self._object(PAGES_ID, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.page_ids)))
+        self._object(CATALOG_ID, b'<< /Type /Catalog /Pages %d 0 R >>' % PAGES_ID)
+
+        xref_position = self.position
+        size = self.next_id
+        xref = [b'xref', b'0 %d' % size, b'0000000000 65535 f ']
+        xref.extend(b'%010d 00000 n ' % self.offsets[obj_id] for obj_id in range(1, size))
+        self._write(b'\n'.join(xref) + b'\n')
+        self._write(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (size, CATALOG_ID, xref_position))
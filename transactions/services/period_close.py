@@ -0,0 +1,297 @@
+"""
+Period-close export.
+
+The supplier product, supplier sales and category sales reports of a period
+all aggregate the same paid TransactionItem rows. The period close runs that
+aggregation once, ordered by supplier, and fans every row out to its
+supplier's product sheet and to the running supplier and category totals the
+summary sheets are written from. Coupons come from their own aggregation.
+
+Everything is read in one snapshot and saved either as one workbook (summary
+sheets first, then a sheet per supplier) or as a ZIP holding a workbook per
+report. Exports run on a small thread pool after the request commits;
+`python manage.py run_period_close_exports` picks up any left pending, and
+requeues running ones whose worker died (no change for
+PERIOD_CLOSE_STALE_AFTER seconds).
+"""
+import logging
+import re
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, groupby
+from operator import itemgetter
+
+import openpyxl
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from transactions.models.period_close_export import PeriodCloseExport
+from transactions.models.transaction_coupon import TransactionCoupon
+from transactions.models.transaction_item import TransactionItem
+from transactions.services.exports import EXPORT_CHUNK_SIZE, ExportMetrics, snapshot
+from transactions.services.report_writer import write_sheet, write_xlsx
+from transactions.services.reports import (
+    COUPONS_REPORT,
+    PRODUCT_CATEGORY_SALES_REPORT,
+    SUPPLIER_PRODUCTS_REPORT,
+    SUPPLIER_SALES_REPORT,
+    coupon_usage_rows,
+    date_metadata,
+    store_header,
+)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+# Characters Excel does not allow in sheet titles; '/' and '\' would also
+# nest ZIP members
+INVALID_NAME_CHARACTERS = re.compile(r'[/\\?*\[\]:]')
+MAX_SHEET_TITLE_LENGTH = 31
+SUMMARY_TITLES = ['Supplier Sales', 'Category Sales', 'Coupons']
+
+
+def period_rows(start_date, end_date):
+    """
+    Sold amounts per supplier, SKU, price and discount for paid items in the
+    period, ordered so each supplier's rows are contiguous.
+    """
+    return TransactionItem.objects.filter(
+        transaction__paid_time__date__gte=start_date,
+        transaction__paid_time__date__lte=end_date,
+    ).values(
+        supplier_id=F('product_sku__supplier_id'),
+        supplier_code=F('product_sku__supplier__code'),
+        supplier_name=F('product_sku__supplier__name'),
+        category_name=Coalesce('product_sku__product__category__name', Value('No Category')),
+        sku=F('product_sku__sku'),
+        product_name=F('product_sku__product__name'),
+        payment_option=F('product_sku__payment_option'),
+        selling_price=F('unit_price'),
+        discount=Coalesce('supplier_discount', Value(0.0)),
+    ).annotate(
+        sold_amounts=Sum('amount')
+    ).order_by('supplier_name', 'supplier_id', 'product_name', 'selling_price', 'discount')
+
+
+def unique_sheet_name(value, taken):
+    """
+    `value` as a sheet title and ZIP member name: invalid characters removed,
+    cut to 31 characters and suffixed " (2)", " (3)"... while it clashes
+    with a name in `taken` (compared case-insensitively, like Excel does).
+    The name is added to `taken`.
+    """
+    base = INVALID_NAME_CHARACTERS.sub('', str(value or '')).strip("' .")[:MAX_SHEET_TITLE_LENGTH] or 'Supplier'
+    name, number = base, 1
+    while name.lower() in taken:
+        number += 1
+        suffix = f' ({number})'
+        name = base[:MAX_SHEET_TITLE_LENGTH - len(suffix)] + suffix
+    taken.add(name.lower())
+    return name
+
+
+class PeriodTotals:
+    """
+    Supplier and category totals accumulated while the period rows stream by.
+    """
+
+    def __init__(self):
+        self.suppliers = {}
+        self.categories = {}
+
+    def tally(self, rows):
+        for row in rows:
+            sold = row['sold_amounts'] or 0
+            sales = row['selling_price'] * sold
+
+            supplier = self.suppliers.get(row['supplier_id'])
+            if supplier is None:
+                supplier = self.suppliers[row['supplier_id']] = {
+                    'supplier_code': row['supplier_code'],
+                    'supplier_name': row['supplier_name'],
+                    'product_sold': 0,
+                    'sales_total': 0,
+                }
+            supplier['product_sold'] += sold
+            supplier['sales_total'] += sales
+
+            category = self.categories.get(row['category_name'])
+            if category is None:
+                category = self.categories[row['category_name']] = {
+                    'category_name': row['category_name'],
+                    'product_sold': 0,
+                    'sales_total': 0,
+                }
+            category['product_sold'] += sold
+            category['sales_total'] += sales
+
+            yield row
+
+    def supplier_rows(self):
+        return sorted(self.suppliers.values(), key=lambda row: (row['supplier_name'] is None, row['supplier_name'] or ''))
+
+    def category_rows(self):
+        return sorted(self.categories.values(), key=itemgetter('category_name'))
+
+
+class WorkbookTarget:
+    """Every report as a sheet of one write-only workbook."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.summaries = []
+
+    def add(self, report, rows, header, metadata, name, title, summary=False):
+        sheet = write_sheet(self.workbook, report, rows, header, metadata, title=title)
+        if summary:
+            self.summaries.append(sheet)
+
+    def close(self):
+        for position, sheet in enumerate(self.summaries):
+            self.workbook.move_sheet(sheet.title, position - self.workbook.index(sheet))
+        self.workbook.save(self.stream)
+
+
+class ZipTarget:
+    """Every report as its own workbook inside a ZIP archive."""
+
+    def __init__(self, stream):
+        # Workbooks are already deflated, so members are stored as they are.
+        self.archive = zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED)
+
+    def add(self, report, rows, header, metadata, name, title, summary=False):
+        with self.archive.open(f'{name}.xlsx', 'w') as member:
+            write_xlsx(report, rows, member, header, metadata)
+
+    def close(self):
+        self.archive.close()
+
+
+def write_period_close(target, start_date, end_date, metrics):
+    """
+    Writes every period-close report to `target`. Returns the number of
+    supplier sheets written.
+    """
+    header = store_header()
+    metadata = date_metadata(start_date.isoformat(), end_date.isoformat())
+    totals = PeriodTotals()
+    rows = totals.tally(metrics.track(period_rows(start_date, end_date).iterator(chunk_size=EXPORT_CHUNK_SIZE)))
+
+    sheet_names = {title.lower() for title in SUMMARY_TITLES}
+    supplier_count = 0
+    for supplier_id, group in groupby(rows, key=itemgetter('supplier_id')):
+        if supplier_id is None:
+            # Items without a supplier only count towards the summaries.
+            deque(group, maxlen=0)
+            continue
+
+        first = next(group)
+        sheet_name = unique_sheet_name(first['supplier_code'], sheet_names)
+        target.add(
+            SUPPLIER_PRODUCTS_REPORT,
+            chain([first], group),
+            header,
+            metadata + [('Supplier Code :', first['supplier_code']), ('Supplier Name :', first['supplier_name'])],
+            name=f'suppliers/{sheet_name}',
+            title=sheet_name
+        )
+        supplier_count += 1
+
+    coupons = TransactionCoupon.objects.filter(
+        transaction__paid_time__date__gte=start_date,
+        transaction__paid_time__date__lte=end_date,
+    )
+    supplier_sales_title, category_sales_title, coupons_title = SUMMARY_TITLES
+    target.add(SUPPLIER_SALES_REPORT, totals.supplier_rows(), header, metadata,
+               name='supplier_sales', title=supplier_sales_title, summary=True)
+    target.add(PRODUCT_CATEGORY_SALES_REPORT, totals.category_rows(), header, metadata,
+               name='product_category_sales', title=category_sales_title, summary=True)
+    target.add(COUPONS_REPORT, coupon_usage_rows(coupons).iterator(chunk_size=EXPORT_CHUNK_SIZE), header, metadata,
+               name='coupons', title=coupons_title, summary=True)
+    return supplier_count
+
+
+def run_period_close(export_id):
+    """
+    Builds a pending export. Returns the export, or None when it was not
+    pending (already picked up by another worker).
+    """
+    claimed = PeriodCloseExport.objects.filter(
+        pk=export_id, status=PeriodCloseExport.Status.PENDING
+    ).update(status=PeriodCloseExport.Status.RUNNING, updated_at=timezone.now())
+    if not claimed:
+        return None
+
+    export = PeriodCloseExport.objects.get(pk=export_id)
+    target_class = ZipTarget if export.output == PeriodCloseExport.Output.ZIP else WorkbookTarget
+    try:
+        with tempfile.TemporaryFile() as stream:
+            with ExportMetrics(f'period_close_{export.output}') as metrics:
+                target = target_class(stream)
+                with snapshot():
+                    export.supplier_count = write_period_close(target, export.start_date, export.end_date, metrics)
+                target.close()
+
+            stream.seek(0)
+            filename = f'Period_Close_{export.start_date:%Y%m%d}_{export.end_date:%Y%m%d}.{export.output}'
+            export.file.save(filename, File(stream), save=False)
+    except Exception as e:
+        logger.exception('Period close export %s failed', export.pk)
+        export.status = PeriodCloseExport.Status.FAILED
+        export.error = str(e)
+        export.completed_at = timezone.now()
+        export.save(update_fields=['status', 'error', 'completed_at', 'updated_at'])
+        return export
+
+    export.status = PeriodCloseExport.Status.COMPLETED
+    export.row_count = metrics.rows
+    export.completed_at = timezone.now()
+    export.save(update_fields=['status', 'file', 'supplier_count', 'row_count', 'completed_at', 'updated_at'])
+    return export
+
+
+def requeue_stale_exports():
+    """
+    Puts running exports that have not changed for PERIOD_CLOSE_STALE_AFTER
+    seconds back to pending, so they are built again. Returns how many.
+    """
+    now = timezone.now()
+    requeued = PeriodCloseExport.objects.filter(
+        status=PeriodCloseExport.Status.RUNNING,
+        updated_at__lt=now - timezone.timedelta(seconds=settings.PERIOD_CLOSE_STALE_AFTER),
+    ).update(status=PeriodCloseExport.Status.PENDING, updated_at=now)
+    if requeued:
+        logger.warning('Requeued %s stale period close exports', requeued)
+    return requeued
+
+
+def _run_in_background(export_id):
+    try:
+        run_period_close(export_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_period_close(export):
+    """
+    Queues `export` on the worker pool once the current transaction commits.
+    With PERIOD_CLOSE_WORKERS set to 0 exports wait for the management
+    command instead.
+    """
+    global _executor
+
+    if settings.PERIOD_CLOSE_WORKERS < 1:
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.PERIOD_CLOSE_WORKERS, thread_name_prefix='period-close')
+
+    export_id = export.pk
+    transaction.on_commit(lambda: _executor.submit(_run_in_background, export_id))
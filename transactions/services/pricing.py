@@ -0,0 +1,158 @@
+"""
+Basket pricing for transactions.
+
+Coupons are compiled into rule objects, one class per coupon type, and a
+whole basket is evaluated in a single pass: subtotal, the value of every
+applied coupon, the discount total and the share of the discount carried by
+each line. New coupon types plug in by subclassing CouponRule and decorating
+the class with @register_rule.
+"""
+from functools import lru_cache
+
+from rest_framework import serializers
+
+RULES = {}
+
+
+def register_rule(rule_class):
+    RULES[rule_class.type] = rule_class
+    return rule_class
+
+
+class CouponRule:
+    """
+    Base class for the pricing rule of one coupon type.
+    """
+    type = None
+    # How many coupons of this type a basket may hold, and how many units of
+    # one coupon a basket may use. None means unlimited.
+    max_per_basket = None
+    max_amount = None
+    error_too_many = "Too many coupons of this type."
+    error_amount = "Coupon amount is too high."
+
+    def __init__(self, voucher_value=None, discount_percentage=None):
+        self.voucher_value = voucher_value or 0
+        self.discount_percentage = discount_percentage or 0
+
+    def apply(self, sub_total, amount):
+        """
+        Returns (item_voucher_value, item_discount_value, discount).
+        """
+        raise NotImplementedError
+
+
+@register_rule
+class VoucherRule(CouponRule):
+    type = 'voucher'
+
+    def apply(self, sub_total, amount):
+        return self.voucher_value, None, self.voucher_value * amount
+
+
+@register_rule
+class PercentageDiscountRule(CouponRule):
+    type = 'discount'
+    max_per_basket = 1
+    max_amount = 1
+    error_too_many = "Only one percentage discount coupon is allowed."
+    error_amount = "Percentage discount coupon amount cannot be more than 1."
+
+    def apply(self, sub_total, amount):
+        discount = int(sub_total * self.discount_percentage / 100)
+        return None, discount, discount
+
+
+@lru_cache(maxsize=1024)
+def compiled_rule(coupon_type, voucher_value, discount_percentage):
+    rule_class = RULES.get(coupon_type)
+    if rule_class is None:
+        raise serializers.ValidationError(f"Unsupported coupon type {coupon_type}.")
+    return rule_class(voucher_value, discount_percentage)
+
+
+def compile_rule(coupon):
+    """
+    Returns the (shared, cached) rule for a coupon's type and value.
+    """
+    return compiled_rule(coupon.type, coupon.voucher_value, coupon.discount_percentage)
+
+
+def allocate(discount, line_totals):
+    """
+    Splits `discount` across lines proportionally to their totals, using the
+    largest remainder so the shares add up exactly.
+    """
+    basket_total = sum(line_totals)
+    if not discount or not basket_total:
+        return [0] * len(line_totals)
+
+    shares = [discount * line_total // basket_total for line_total in line_totals]
+    remainders = sorted(
+        range(len(line_totals)),
+        key=lambda i: discount * line_totals[i] % basket_total,
+        reverse=True,
+    )
+    for i in remainders[:discount - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+class PricingResult:
+    def __init__(self, sub_total, voucher_discount, percentage_discount, coupon_values, line_discounts):
+        self.sub_total = sub_total
+        self.voucher_discount = voucher_discount
+        self.percentage_discount = percentage_discount
+        self.discount_total = int(voucher_discount + percentage_discount)
+        self.total = max(0, sub_total - self.discount_total)
+        self.coupon_values = coupon_values
+        self.line_discounts = line_discounts
+
+
+def price_basket(lines, coupon_items):
+    """
+    Prices a basket in one pass.
+
+    `lines` is a list of (unit_price, amount) pairs and `coupon_items` a list
+    of {'coupon': Coupon, 'amount': int} dicts. Coupon values are returned in
+    the order of `coupon_items` and per-line discounts in the order of
+    `lines`; the per-line discounts add up to the discount actually taken off
+    the subtotal.
+    """
+    line_totals = [unit_price * amount for unit_price, amount in lines]
+    sub_total = sum(line_totals)
+
+    voucher_discount = 0
+    percentage_discount = 0
+    coupon_values = []
+    type_counts = {}
+
+    for item in coupon_items:
+        amount = item['amount']
+        rule = compile_rule(item['coupon'])
+
+        type_counts[rule.type] = type_counts.get(rule.type, 0) + 1
+        if rule.max_per_basket is not None and type_counts[rule.type] > rule.max_per_basket:
+            raise serializers.ValidationError(rule.error_too_many)
+        if rule.max_amount is not None and amount > rule.max_amount:
+            raise serializers.ValidationError(rule.error_amount)
+
+        item_voucher_value, item_discount_value, discount = rule.apply(sub_total, amount)
+        if item_discount_value is not None:
+            percentage_discount += discount
+        else:
+            voucher_discount += discount
+
+        coupon_values.append({
+            'item_voucher_value': item_voucher_value,
+            'item_discount_value': item_discount_value,
+        })
+
+    applied_discount = min(int(voucher_discount + percentage_discount), sub_total)
+    return PricingResult(
+        sub_total,
+        voucher_discount,
+        percentage_discount,
+        coupon_values,
+        allocate(applied_discount, line_totals),
+    )
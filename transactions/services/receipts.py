@@ -0,0 +1,206 @@
+"""
+Printable receipts.
+
+A receipt is built from one prefetched transaction and the cached store
+profile, then rendered as ESC/POS bytes for thermal printers, HTML or a
+roll-sized PDF. ESC/POS and PDF share the same fixed-width line layout;
+HTML comes from the transactions/receipt.html template.
+
+Rendered receipts are cached under the transaction's updated_at and the
+store header, so reprints skip the queries and the rendering until the
+transaction or the store changes.
+"""
+import io
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.template.loader import get_template
+from django.utils import timezone
+
+from transactions.models.transaction import Transaction
+from transactions.models.transaction_cashier_book import TransactionCashierBooks
+from transactions.models.transaction_coupon import TransactionCoupon
+from transactions.models.transaction_item import TransactionItem
+from transactions.services.pdf import PdfDocument
+from transactions.services.report_writer import format_money
+from transactions.services.reports import store_header
+
+RECEIPT_KEY = 'transactions:receipt:{pk}:{version}:{output}'
+
+RECEIPT_OUTPUTS = {
+    'escpos': 'application/octet-stream',
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+ROLL_WIDTH = 227  # 80 mm in points
+ROLL_MARGIN = 10
+
+ESC_INIT = b'\x1b@'
+ESC_ALIGN = {'left': b'\x1ba\x00', 'center': b'\x1ba\x01'}
+ESC_BOLD = {False: b'\x1bE\x00', True: b'\x1bE\x01'}
+ESC_FEED_AND_CUT = b'\n\n\n\x1dVB\x00'
+
+
+def receipt_transactions():
+    return Transaction.objects.prefetch_related(
+        Prefetch('items', queryset=TransactionItem.objects.select_related('product_sku__product').order_by('product_sku__product__name', 'id')),
+        Prefetch('coupons', queryset=TransactionCoupon.objects.select_related('coupon_code__coupon').order_by('coupon_code__coupon__name', 'id')),
+        Prefetch(
+            'cashier_book_transactions',
+            queryset=TransactionCashierBooks.objects.select_related('cashier_book__cashier')
+        ),
+    )
+
+
+def coupon_value(transaction_coupon):
+    if transaction_coupon.coupon_code.coupon.type == 'discount':
+        value = transaction_coupon.item_discount_value
+    else:
+        value = transaction_coupon.item_voucher_value
+    return (value or 0) * transaction_coupon.amount
+
+
+def build_receipt(transaction, header):
+    """
+    Plain receipt data of a prefetched transaction, shared by every output.
+    """
+    cashier_books = transaction.cashier_book_transactions.all()
+    cashier = cashier_books[0].cashier_book.cashier if cashier_books else None
+    printed_time = timezone.localtime(transaction.paid_time or transaction.created_at)
+
+    return {
+        'header': header,
+        'code': transaction.code,
+        'time': printed_time.strftime('%d/%m/%Y %H:%M'),
+        'cashier': (cashier.name or cashier.email) if cashier else '-',
+        'items': [
+            {
+                'name': item.product_sku.product.name,
+                'sku': item.product_sku.sku,
+                'amount': item.amount,
+                'unit_price': format_money(item.unit_price),
+                'line_total': format_money(item.unit_price * item.amount),
+            }
+            for item in transaction.items.all()
+        ],
+        'coupons': [
+            {
+                'name': transaction_coupon.coupon_code.coupon.name,
+                'code': transaction_coupon.coupon_code.code,
+                'amount': transaction_coupon.amount,
+                'value': f'-{format_money(coupon_value(transaction_coupon))}',
+            }
+            for transaction_coupon in transaction.coupons.all()
+        ],
+        'sub_total': format_money(transaction.sub_total),
+        'discount_total': f'-{format_money(transaction.discount_total)}' if transaction.discount_total else None,
+        'total': format_money(transaction.total),
+        'payment': transaction.get_payment_display() if transaction.payment else None,
+        'pay': format_money(transaction.pay) if transaction.pay is not None else None,
+        'change': format_money(transaction.pay - transaction.total) if transaction.pay is not None else None,
+        'is_saved': transaction.is_saved,
+        'note': transaction.note,
+    }
+
+
+def split_line(left, right, width):
+    left = left[:max(width - len(right) - 1, 0)]
+    return left + ' ' * (width - len(left) - len(right)) + right
+
+
+def receipt_lines(receipt, width):
+    """
+    Fixed-width layout of a receipt as (text, align, bold) lines.
+    """
+    rule = ('-' * width, 'left', False)
+    name, *contact = receipt['header']
+    lines = [(name[:width], 'center', True)]
+    lines += [(text[:width], 'center', False) for text in contact if text]
+    lines.append(rule)
+    lines += [
+        (split_line('No', receipt['code'], width), 'left', False),
+        (split_line('Date', receipt['time'], width), 'left', False),
+        (split_line('Cashier', receipt['cashier'], width), 'left', False),
+        rule,
+    ]
+    for item in receipt['items']:
+        lines.append((item['name'][:width], 'left', False))
+        lines.append((split_line(f"  {item['amount']} x {item['unit_price']}", item['line_total'], width), 'left', False))
+    lines.append(rule)
+    lines.append((split_line('Subtotal', receipt['sub_total'], width), 'left', False))
+    for coupon in receipt['coupons']:
+        lines.append((split_line(f"{coupon['name']} x{coupon['amount']}", coupon['value'], width), 'left', False))
+    if receipt['discount_total']:
+        lines.append((split_line('Discount', receipt['discount_total'], width), 'left', False))
+    lines.append((split_line('TOTAL', receipt['total'], width), 'left', True))
+    if receipt['pay'] is not None:
+        lines.append((split_line(f"Pay ({receipt['payment']})" if receipt['payment'] else 'Pay', receipt['pay'], width), 'left', False))
+        lines.append((split_line('Change', receipt['change'], width), 'left', False))
+    lines.append(rule)
+    if receipt['note']:
+        lines.append((receipt['note'][:width], 'left', False))
+    lines.append(('SAVED - NOT PAID' if receipt['is_saved'] else 'Thank you', 'center', False))
+    return lines
+
+
+def render_escpos(receipt):
+    width = settings.RECEIPT_LINE_WIDTH
+    output = [ESC_INIT]
+    align = bold = None
+    for text, line_align, line_bold in receipt_lines(receipt, width):
+        if line_align != align:
+            output.append(ESC_ALIGN[line_align])
+            align = line_align
+        if line_bold != bold:
+            output.append(ESC_BOLD[line_bold])
+            bold = line_bold
+        output.append(text.encode('cp437', errors='replace') + b'\n')
+    output.append(ESC_FEED_AND_CUT)
+    return b''.join(output)
+
+
+def render_pdf(receipt):
+    width = settings.RECEIPT_LINE_WIDTH
+    lines = [
+        (text.center(width) if align == 'center' else text, bold)
+        for text, align, bold in receipt_lines(receipt, width)
+    ]
+    stream = io.BytesIO()
+    document = PdfDocument(stream, line_width=width, page_width=ROLL_WIDTH, page_height=None, margin=ROLL_MARGIN)
+    document.add_page(lines)
+    document.close()
+    return stream.getvalue()
+
+
+def render_html(receipt):
+    return get_template('transactions/receipt.html').render({'receipt': receipt})
+
+
+RENDERERS = {
+    'escpos': render_escpos,
+    'html': render_html,
+    'pdf': render_pdf,
+}
+
+
+def render_receipt(transactions, pk, output):
+    """
+    Renders the receipt of transaction `pk`, which must be in the
+    `transactions` queryset. Returns None when it is not.
+    """
+    updated_at = transactions.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+
+    header = store_header()
+    version = f"{updated_at.timestamp()}:{zlib.crc32('|'.join(header).encode())}:{settings.RECEIPT_LINE_WIDTH}"
+    key = RECEIPT_KEY.format(pk=pk, version=version, output=output)
+    rendered = cache.get(key)
+    if rendered is None:
+        transaction = receipt_transactions().get(pk=pk)
+        rendered = RENDERERS[output](build_receipt(transaction, header))
+        cache.set(key, rendered, settings.RECEIPT_CACHE_TIMEOUT)
+    return rendered
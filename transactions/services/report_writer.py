@@ -0,0 +1,302 @@
+"""
+Declarative report rendering.
+
+A Report lists its Columns (title, width, number format, alignment, how to
+read the value from an aggregate row, an optional XLSX formula and whether
+it is totalled). One writer per output renders any Report:
+
+- xlsx: a write-only openpyxl workbook. Cell styles are built once per
+  column and shared by every row, and rows are appended as they arrive.
+- csv: header and data rows only, streamed.
+- pdf: a monospaced table, written page by page.
+
+Every output shares the same layout: the title block with the store header,
+the metadata rows (label, value), the header row, the data rows and a total
+row.
+"""
+import csv
+
+import openpyxl
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+
+from api.utils import Echo
+from transactions.services.exports import EXPORT_CHUNK_SIZE, ExportMetrics, instrumented
+from transactions.services.pdf import PdfDocument
+
+ROW_NUMBER = 'row_number'
+MONEY_FORMAT = '"Rp" #,##0'
+PERCENT_FORMAT = '0%'
+
+REPORT_OUTPUTS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'pdf': 'application/pdf',
+}
+
+TITLE_FONT = Font(bold=True, size=14)
+SUBTITLE_FONT = Font(bold=True, size=12)
+BOLD_FONT = Font(bold=True)
+CENTER = Alignment(horizontal='center', vertical='center')
+THIN = Side(style='thin')
+BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+
+
+def format_money(value):
+    return f'Rp {value:,.0f}'
+
+
+class Column:
+    """
+    One report column.
+
+    `key` names the column: it is the aggregate row key read by default and
+    the placeholder other columns' formulas use to refer to this one. `value`
+    computes the cell from the row instead. `formula` is an XLSX formula over
+    other columns of the same row, e.g. '={price}*{amount}'; the other
+    outputs use `value` for those cells. A `total` column is summed in the
+    total row, as a SUM formula when the column itself is a formula.
+    """
+
+    def __init__(self, title, key, width=15, number_format=None, align='center', value=None, formula=None, total=False):
+        self.title = title
+        self.key = key
+        self.width = width
+        self.number_format = number_format
+        self.align = align
+        self.value = value
+        self.formula = formula
+        self.total = total
+
+    def get_value(self, row):
+        if self.value is not None:
+            return self.value(row)
+        return row[self.key]
+
+    def as_text(self, value):
+        if value is None:
+            return ''
+        if self.number_format == MONEY_FORMAT:
+            return format_money(value)
+        if self.number_format == PERCENT_FORMAT:
+            return f'{value:.0%}'
+        return str(value)
+
+
+class Report:
+    def __init__(self, name, title, sheet_title, filename, columns, total_label='Total'):
+        self.name = name
+        self.title = title
+        self.sheet_title = sheet_title
+        self.filename = filename
+        self.columns = columns
+        self.total_label = total_label
+
+    @property
+    def total_span(self):
+        """Number of leading columns the total label is merged across."""
+        for index, column in enumerate(self.columns):
+            if column.total:
+                return index
+        return len(self.columns)
+
+
+class ReportRows:
+    """
+    Iterates the cell values of `rows` for `report`, keeping running totals.
+    """
+
+    def __init__(self, report, rows):
+        self.columns = report.columns
+        self.rows = rows
+        self.totals = [0 if column.total else None for column in self.columns]
+
+    def __iter__(self):
+        columns = self.columns
+        totalled = [index for index, column in enumerate(columns) if column.total]
+        for number, row in enumerate(self.rows, 1):
+            values = [number if column.key == ROW_NUMBER else column.get_value(row) for column in columns]
+            for index in totalled:
+                self.totals[index] += values[index] or 0
+            yield values
+
+
+def write_xlsx(report, rows, stream, header, metadata):
+    workbook = openpyxl.Workbook(write_only=True)
+    write_sheet(workbook, report, rows, header, metadata)
+    workbook.save(stream)
+
+
+def write_sheet(workbook, report, rows, header, metadata, title=None):
+    """
+    Appends `report` as a new sheet of a write-only workbook.
+    """
+    sheet = workbook.create_sheet(title or report.sheet_title)
+
+    def style(font=None, alignment=None, border=None, number_format=None):
+        cell = WriteOnlyCell(sheet)
+        if font:
+            cell.font = font
+        if alignment:
+            cell.alignment = alignment
+        if border:
+            cell.border = border
+        if number_format:
+            cell.number_format = number_format
+        return cell._style
+
+    def cell(value, cell_style):
+        # Write-only cells are serialized and dropped on append, so every
+        # cell of a column can share one precomputed style array.
+        written = WriteOnlyCell(sheet, value)
+        written._style = cell_style
+        return written
+
+    columns = report.columns
+    letters = [get_column_letter(index) for index in range(1, len(columns) + 1)]
+    refs = {column.key: f'{letter}{{row}}' for column, letter in zip(columns, letters)}
+    formulas = [column.formula.format(**refs) if column.formula else None for column in columns]
+
+    title_styles = [style(TITLE_FONT, CENTER), style(SUBTITLE_FONT, CENTER), style(alignment=CENTER), style(alignment=CENTER)]
+    label_style = style(BOLD_FONT)
+    plain_style = style()
+    header_style = style(BOLD_FONT, CENTER, BORDER)
+    row_styles = [
+        style(alignment=CENTER if column.align == 'center' else None, border=BORDER, number_format=column.number_format)
+        for column in columns
+    ]
+    total_styles = [
+        style(BOLD_FONT, CENTER, BORDER, column.number_format if column.total else None) for column in columns
+    ]
+
+    for letter, column in zip(letters, columns):
+        sheet.column_dimensions[letter].width = column.width
+
+    row_num = 0
+
+    def append(values):
+        nonlocal row_num
+        sheet.append(values)
+        row_num += 1
+
+    for text, text_style in zip([report.title, *header], title_styles):
+        sheet.merged_cells.add(f'A{row_num + 1}:{letters[-1]}{row_num + 1}')
+        append([cell(text, text_style)])
+
+    append([])
+    for label, value in metadata:
+        append([cell(label, label_style), cell(value, plain_style)])
+
+    append([])
+    append([cell(column.title, header_style) for column in columns])
+
+    first_row = row_num + 1
+    report_rows = ReportRows(report, rows)
+    for values in report_rows:
+        row = row_num + 1
+        append([
+            cell(formula.format(row=row) if formula else value, row_style)
+            for value, formula, row_style in zip(values, formulas, row_styles)
+        ])
+
+    total_row = row_num + 1
+    span = report.total_span
+    if span:
+        sheet.merged_cells.add(f'A{total_row}:{letters[span - 1]}{total_row}')
+    total_cells = []
+    for index, column in enumerate(columns):
+        if index == 0:
+            value = report.total_label
+        elif column.total and column.formula:
+            value = f'=SUM({letters[index]}{first_row}:{letters[index]}{total_row - 1})'
+        elif column.total:
+            value = report_rows.totals[index]
+        else:
+            value = None
+        total_cells.append(cell(value, total_styles[index]))
+    append(total_cells)
+    return sheet
+
+
+def stream_csv(report, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column.title for column in report.columns])
+    for values in ReportRows(report, rows):
+        yield writer.writerow(values)
+
+
+def write_pdf(report, rows, stream, header, metadata):
+    columns = report.columns
+    widths = [max(column.width, len(column.title)) for column in columns]
+    line_width = sum(widths) + len(widths) - 1
+
+    def line(texts, aligns):
+        cells = []
+        for text, width, align in zip(texts, widths, aligns):
+            text = text[:width]
+            cells.append(text.center(width) if align == 'center' else text.ljust(width))
+        return ' '.join(cells)
+
+    aligns = [column.align for column in columns]
+    header_line = line([column.title for column in columns], ['center'] * len(columns))
+    rule = '-' * line_width
+
+    intro = [(report.title.center(line_width), True)]
+    intro += [(text.center(line_width), index == 0) for index, text in enumerate(header)]
+    intro.append(('', False))
+    intro += [(f'{label} {value}', False) for label, value in metadata]
+    intro.append(('', False))
+
+    document = PdfDocument(stream, line_width=line_width)
+    page = intro + [(header_line, True), (rule, False)]
+    report_rows = ReportRows(report, rows)
+    for values in report_rows:
+        if len(page) >= document.lines_per_page:
+            document.add_page(page)
+            page = [(header_line, True), (rule, False)]
+        page.append((line([column.as_text(value) for column, value in zip(columns, values)], aligns), False))
+
+    span = report.total_span
+    total_texts = [report.total_label] + [''] * (len(columns) - 1)
+    for index, column in enumerate(columns):
+        if column.total:
+            total_texts[index] = column.as_text(report_rows.totals[index])
+    total_line = line(total_texts, ['center'] * len(columns))
+    if span:
+        label_width = sum(widths[:span]) + span - 1
+        total_line = report.total_label.center(label_width) + total_line[label_width:]
+
+    if len(page) + 2 > document.lines_per_page:
+        document.add_page(page)
+        page = []
+    page += [(rule, False), (total_line, True)]
+    document.add_page(page)
+    document.close()
+
+
+def report_response(report, queryset, output='xlsx', header=(), metadata=()):
+    """
+    Renders `report` over the aggregate rows of `queryset` as a download.
+
+    Rows are read with .iterator(chunk_size) and every export is logged
+    through ExportMetrics under the report name.
+    """
+    filename = f'{report.filename.format(timestamp=timezone.now().strftime("%Y%m%d%H%M%S"))}.{output}'
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if output == 'csv':
+        response = StreamingHttpResponse(
+            stream_csv(report, instrumented(rows, f'{report.name}_csv')),
+            content_type=REPORT_OUTPUTS['csv']
+        )
+    else:
+        response = HttpResponse(content_type=REPORT_OUTPUTS[output])
+        writer = write_xlsx if output == 'xlsx' else write_pdf
+        with ExportMetrics(f'{report.name}_{output}') as metrics:
+            writer(report, metrics.track(rows), response, header, metadata)
+
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
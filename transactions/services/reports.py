@@ -0,0 +1,111 @@
+"""
+Report definitions for the transaction exports, rendered by report_writer.
+"""
+from django.db.models import BigIntegerField, Case, F, Sum, When
+from django.db.models.functions import Coalesce
+
+from store.services.profile import get_store_profile
+from transactions.services.report_writer import MONEY_FORMAT, PERCENT_FORMAT, ROW_NUMBER, Column, Report
+
+
+def netto(row):
+    return row['selling_price'] * (1 - row['discount'] / 100)
+
+
+SUPPLIER_PRODUCTS_REPORT = Report(
+    name='supplier_products',
+    title='SALES REPORT',
+    sheet_title='Supplier Products',
+    filename='supplier_products_export',
+    columns=[
+        Column('No', ROW_NUMBER),
+        Column('SKU', 'sku'),
+        Column('Product Name', 'product_name', width=30, align=None),
+        Column('Payment Option', 'payment_option',
+               value=lambda row: row['payment_option'].title() if row['payment_option'] else '-'),
+        Column('Selling Price', 'selling_price', number_format=MONEY_FORMAT),
+        Column('Supplier Discount', 'discount', number_format=PERCENT_FORMAT, value=lambda row: row['discount'] / 100),
+        Column('Netto', 'netto', number_format=MONEY_FORMAT, value=netto, formula='={selling_price}*(1-{discount})'),
+        Column('Sold Amounts', 'sold_amounts', total=True),
+        Column('Total Netto', 'total_netto', number_format=MONEY_FORMAT, total=True,
+               value=lambda row: netto(row) * row['sold_amounts'], formula='={netto}*{sold_amounts}'),
+    ]
+)
+
+SUPPLIER_SALES_REPORT = Report(
+    name='supplier_sales',
+    title='SALES REPORT',
+    sheet_title='Sales Report',
+    filename='Supplier_Sales_Report_{timestamp}',
+    columns=[
+        Column('No', ROW_NUMBER, width=5),
+        Column('Supplier Code', 'supplier_code', value=lambda row: row['supplier_code'] or '-'),
+        Column('Supplier Name', 'supplier_name', width=30, align=None, value=lambda row: row['supplier_name'] or '-'),
+        Column('Product Sold', 'product_sold', total=True, value=lambda row: row['product_sold'] or 0),
+        Column('Sales Total', 'sales_total', width=20, number_format=MONEY_FORMAT, total=True,
+               value=lambda row: row['sales_total'] or 0),
+    ]
+)
+
+PRODUCT_CATEGORY_SALES_REPORT = Report(
+    name='product_category_sales',
+    title='SALES REPORT',
+    sheet_title='Category Sales',
+    filename='product_category_sales_report',
+    columns=[
+        Column('No', ROW_NUMBER, width=5),
+        Column('Category Name', 'category_name', width=30),
+        Column('Product Sold', 'product_sold', total=True, value=lambda row: row['product_sold'] or 0),
+        Column('Sales Total', 'sales_total', width=20, number_format=MONEY_FORMAT, total=True,
+               value=lambda row: row['sales_total'] or 0),
+    ]
+)
+
+COUPONS_REPORT = Report(
+    name='coupons',
+    title='SALES REPORT',
+    sheet_title='Coupons Report',
+    filename='Coupons_Usage_Report_{timestamp}',
+    columns=[
+        Column('No', ROW_NUMBER, width=5),
+        Column('Coupon Name', 'coupon_name', width=25, align=None),
+        Column('Code', 'code', width=20),
+        Column('Type', 'type', value=lambda row: row['type'].title()),
+        Column('Usages', 'usages', total=True, value=lambda row: row['usages'] or 0),
+        Column('Total Value', 'total_value', width=20, number_format=MONEY_FORMAT, total=True,
+               value=lambda row: row['total_value'] or 0),
+    ]
+)
+
+
+def store_header():
+    """Name, address and phone lines printed under every report title."""
+    store = get_store_profile()
+    if store is None:
+        return ['UMS Store', '', '']
+    return [store.name, store.address, f"Telp. {store.phone}" if store.phone else '']
+
+
+def date_metadata(start_date, end_date):
+    return [('Start Date :', start_date or '-'), ('End Date :', end_date or '-')]
+
+
+def coupon_usage_rows(queryset):
+    """
+    Usages and total value per coupon code of a TransactionCoupon queryset.
+    """
+    return queryset.values(
+        coupon_name=F('coupon_code__coupon__name'),
+        code=F('coupon_code__code'),
+        type=F('coupon_code__coupon__type')
+    ).annotate(
+        usages=Sum('amount'),
+        total_value=Sum(
+            Case(
+                When(coupon_code__coupon__type='discount', then=F('amount') * Coalesce(F('item_discount_value'), 0)),
+                When(coupon_code__coupon__type='voucher', then=F('amount') * Coalesce(F('item_voucher_value'), 0)),
+                default=0,
+                output_field=BigIntegerField()
+            )
+        )
+    ).order_by('coupon_name')
@@ -1,2 +1,435 @@
+import io
+import os
+import random
+import time
+import tracemalloc
+import unittest
+import zipfile
 
-# Create your tests here.
+import openpyxl
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl.styles import Alignment, Border, Side
+from rest_framework import serializers
+
+from api.sequences import sequence_database
+from cashier_books.models import CashierBook
+from coupons.models.coupon import Coupon
+from coupons.models.coupon_code import CouponCode
+from products.models.category import ProductCategory
+from products.models.product import Product
+from products.models.sku import ProductSKU
+from suppliers.models.supplier import Supplier
+from transactions.models.period_close_export import PeriodCloseExport
+from transactions.models.transaction import Transaction
+from transactions.models.transaction_cashier_book import TransactionCashierBooks
+from transactions.models.transaction_coupon import TransactionCoupon
+from transactions.models.transaction_item import TransactionItem
+from transactions.serializers.transaction import TransactionSerializer
+from transactions.serializers.transaction_item import TransactionItemSerializer
+from transactions.services.exports import ExportMetrics
+from transactions.services.period_close import (
+    WorkbookTarget,
+    ZipTarget,
+    requeue_stale_exports,
+    unique_sheet_name,
+    write_period_close,
+)
+from transactions.services.pricing import allocate, price_basket
+from transactions.services.receipts import (
+    ESC_ALIGN,
+    ESC_BOLD,
+    ESC_FEED_AND_CUT,
+    ESC_INIT,
+    build_receipt,
+    receipt_lines,
+    render_escpos,
+    render_pdf,
+    split_line,
+)
+from transactions.services.report_writer import format_money, stream_csv, write_pdf, write_xlsx
+from transactions.services.reports import SUPPLIER_PRODUCTS_REPORT, SUPPLIER_SALES_REPORT
+from users.models import User
+
+RUN_BENCHMARKS = os.environ.get('RUN_BENCHMARKS') == 'True'
+
+
+def random_basket(rng, line_count=None):
+    line_count = line_count or rng.randint(1, 30)
+    lines = [(rng.randint(0, 500_000), rng.randint(1, 20)) for _ in range(line_count)]
+    coupon_items = [
+        {'coupon': Coupon(type='voucher', voucher_value=rng.randint(0, 50_000)), 'amount': rng.randint(1, 3)}
+        for _ in range(rng.randint(0, 3))
+    ]
+    if rng.random() < 0.5:
+        coupon_items.append({'coupon': Coupon(type='discount', discount_percentage=rng.randint(0, 100)), 'amount': 1})
+    return lines, coupon_items
+
+
+class AllocateTests(SimpleTestCase):
+    def test_shares_sum_to_discount_and_are_never_negative(self):
+        rng = random.Random(20260101)
+        for _ in range(2000):
+            line_totals = [rng.choice([0, rng.randint(1, 10_000_000)]) for _ in range(rng.randint(1, 40))]
+            discount = rng.randint(0, sum(line_totals))
+            with self.subTest(discount=discount, line_totals=line_totals):
+                shares = allocate(discount, line_totals)
+
+                self.assertEqual(len(shares), len(line_totals))
+                self.assertEqual(sum(shares), discount if sum(line_totals) else 0)
+                self.assertTrue(all(share >= 0 for share in shares))
+                self.assertTrue(all(share <= line_total for share, line_total in zip(shares, line_totals)))
+
+    def test_no_discount_or_empty_basket(self):
+        self.assertEqual(allocate(0, [100, 200]), [0, 0])
+        self.assertEqual(allocate(50, [0, 0]), [0, 0])
+
+
+class PriceBasketTests(SimpleTestCase):
+    def test_line_discounts_sum_to_the_discount_taken(self):
+        rng = random.Random(20260102)
+        for _ in range(1000):
+            lines, coupon_items = random_basket(rng)
+            with self.subTest(lines=lines, coupons=len(coupon_items)):
+                result = price_basket(lines, coupon_items)
+
+                self.assertEqual(result.sub_total, sum(price * amount for price, amount in lines))
+                self.assertEqual(sum(result.line_discounts), result.sub_total - result.total)
+                self.assertTrue(all(discount >= 0 for discount in result.line_discounts))
+                self.assertGreaterEqual(result.total, 0)
+                self.assertEqual(len(result.coupon_values), len(coupon_items))
+
+    def test_only_one_percentage_discount(self):
+        discount = Coupon(type='discount', discount_percentage=10)
+
+        with self.assertRaises(serializers.ValidationError):
+            price_basket([(1000, 1)], [{'coupon': discount, 'amount': 1}, {'coupon': discount, 'amount': 1}])
+
+    @unittest.skipUnless(RUN_BENCHMARKS, 'set RUN_BENCHMARKS=True to run benchmarks')
+    def test_benchmark_price_basket(self):
+        rng = random.Random(20260103)
+        for name, baskets, repeats in [
+            ('1-30 lines', [random_basket(rng) for _ in range(500)], 20),
+            ('1k lines', [random_basket(rng, line_count=1000) for _ in range(20)], 10),
+        ]:
+            start = time.perf_counter()
+            for lines, coupon_items in baskets * repeats:
+                price_basket(lines, coupon_items)
+            elapsed = time.perf_counter() - start
+
+            print(f'\nprice_basket, {name}: {elapsed / (len(baskets) * repeats) * 1e6:.1f} µs per basket')
+
+
+class TransactionItemValidationTests(TestCase):
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+
+    def test_duplicate_skus_are_rejected(self):
+        supplier = Supplier.objects.create(name='Supplier', address='Address', phone='0800')
+        product = Product.objects.create(
+            name='Product', description='', category=ProductCategory.objects.create(name='Category')
+        )
+        ProductSKU.objects.create(product=product, sku='SKU1', supplier=supplier)
+
+        serializer = TransactionItemSerializer(
+            data=[{'product_sku': 'SKU1', 'amount': 1}, {'product_sku': 'SKU1', 'amount': 2}], many=True
+        )
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('Each SKU can only appear once: SKU1.', str(serializer.errors))
+
+
+class CreateTransactionTests(TestCase):
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+
+    @classmethod
+    def setUpTestData(cls):
+        cashier = User.objects.create_user(email='cashier@example.com', password='x', role='cashier')
+        cls.cashier_book = CashierBook.objects.create(cashier=cashier, cash_drawer=0)
+        supplier = Supplier.objects.create(name='Supplier', address='Address', phone='0800')
+        category = ProductCategory.objects.create(name='Category')
+        for number in range(20):
+            product = Product.objects.create(name=f'Product {number}', description='', category=category, price=1000)
+            ProductSKU.objects.create(product=product, sku=f'SKU{number}', supplier=supplier, stock=10)
+        now = timezone.now()
+        coupon = Coupon.objects.create(
+            name='Voucher', type='voucher', voucher_value=500,
+            start_time=now - timezone.timedelta(days=1), end_time=now + timezone.timedelta(days=1),
+        )
+        cls.coupon_code = CouponCode.objects.create(coupon=coupon, code='VOUCHER1', stock=100)
+
+    def create_transaction(self, line_count):
+        serializer = TransactionSerializer(data={
+            'cashier_book_id': str(self.cashier_book.id),
+            'pay': 100_000,
+            'items': [{'product_sku': f'SKU{number}', 'amount': 2} for number in range(line_count)],
+            'coupons': [{'code': 'VOUCHER1', 'amount': 1}],
+        })
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_query_count_does_not_grow_with_lines(self):
+        # Warms the coupon code cache
+        self.create_transaction(line_count=1)
+        with CaptureQueriesContext(connection) as context:
+            self.create_transaction(line_count=1)
+
+        with self.assertNumQueries(len(context.captured_queries)):
+            transaction = self.create_transaction(line_count=20)
+
+        self.assertEqual(transaction.items.count(), 20)
+        self.assertEqual(transaction.total, 20 * 2 * 1000 - 500)
+        self.assertEqual(ProductSKU.objects.get(sku='SKU1').stock, 10 - 2)
+        self.assertEqual(ProductSKU.objects.get(sku='SKU0').stock, 10 - 2 * 3)
+        self.coupon_code.refresh_from_db()
+        self.assertEqual(self.coupon_code.used, 3)
+
+
+NUMBER_FORMATS = [None, None, None, None, '"Rp" #,##0', '0%', '"Rp" #,##0', None, '"Rp" #,##0']
+
+
+def supplier_product_rows(count):
+    for number in range(count):
+        yield {
+            'sku': f'SKU{number}',
+            'product_name': f'Product {number}',
+            'payment_option': 'cash',
+            'selling_price': 1000 + number,
+            'discount': 10.0,
+            'sold_amounts': number % 7 + 1,
+        }
+
+
+class ReportWriterTests(SimpleTestCase):
+    rows = [
+        {'supplier_code': 'SUP1', 'supplier_name': 'First', 'product_sold': 3, 'sales_total': 30_000},
+        {'supplier_code': 'SUP2', 'supplier_name': 'Second', 'product_sold': 5, 'sales_total': 12_500},
+        {'supplier_code': None, 'supplier_name': None, 'product_sold': None, 'sales_total': None},
+    ]
+    header = ['UMS Store', 'Address', 'Telp. 0800']
+    metadata = [('Start Date :', '2026-01-01'), ('End Date :', '2026-01-31')]
+
+    def test_xlsx_rows_and_totals(self):
+        stream = io.BytesIO()
+        write_xlsx(SUPPLIER_SALES_REPORT, iter(self.rows), stream, self.header, self.metadata)
+
+        sheet = openpyxl.load_workbook(stream).active
+        values = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(values[0][0], 'SALES REPORT')
+        self.assertEqual(values[-4][:5], (1, 'SUP1', 'First', 3, 30_000))
+        self.assertEqual(values[-2][:5], (3, '-', '-', 0, 0))
+        self.assertEqual(values[-1][:5], ('Total', None, None, 8, 42_500))
+
+    def test_xlsx_formula_columns_total_with_sum(self):
+        stream = io.BytesIO()
+        write_xlsx(SUPPLIER_PRODUCTS_REPORT, supplier_product_rows(3), stream, self.header, self.metadata)
+
+        values = list(openpyxl.load_workbook(stream).active.iter_rows(values_only=True))
+        first_row = len(values) - 3
+        self.assertEqual(values[-2][8], f'=G{first_row + 2}*H{first_row + 2}')
+        self.assertEqual(values[-1][7], 1 + 2 + 3)
+        self.assertEqual(values[-1][8], f'=SUM(I{first_row}:I{first_row + 2})')
+
+    def test_csv_has_header_and_data_rows(self):
+        lines = ''.join(stream_csv(SUPPLIER_SALES_REPORT, iter(self.rows))).splitlines()
+
+        self.assertEqual(lines[0], 'No,Supplier Code,Supplier Name,Product Sold,Sales Total')
+        self.assertEqual(lines[1], '1,SUP1,First,3,30000')
+        self.assertEqual(len(lines), 4)
+
+    def test_pdf_pages_and_totals(self):
+        stream = io.BytesIO()
+        write_pdf(SUPPLIER_SALES_REPORT, iter(self.rows), stream, self.header, self.metadata)
+        document = stream.getvalue()
+
+        self.assertTrue(document.startswith(b'%PDF-'))
+        self.assertTrue(document.rstrip().endswith(b'%%EOF'))
+        self.assertIn(b'Second', document)
+        self.assertIn(format_money(42_500).encode(), document)
+
+    def test_pdf_splits_long_reports_into_pages(self):
+        stream = io.BytesIO()
+        write_pdf(SUPPLIER_PRODUCTS_REPORT, supplier_product_rows(200), stream, self.header, self.metadata)
+
+        self.assertGreater(stream.getvalue().count(b'/Type /Page '), 1)
+
+    @unittest.skipUnless(RUN_BENCHMARKS, 'set RUN_BENCHMARKS=True to run benchmarks')
+    def test_benchmark_xlsx_writer(self):
+        count = 20_000
+
+        def styled_cells(stream):
+            # The per-cell styling of the supplier products export the
+            # report writer replaced
+            workbook = openpyxl.Workbook()
+            sheet = workbook.active
+            side = Side(style='thin')
+            border = Border(left=side, right=side, top=side, bottom=side)
+            center = Alignment(horizontal='center')
+            for row_number, row in enumerate(supplier_product_rows(count), 12):
+                values = [
+                    row_number - 11, row['sku'], row['product_name'], row['payment_option'].title(),
+                    row['selling_price'], row['discount'] / 100, f'=E{row_number}*(1-F{row_number})',
+                    row['sold_amounts'], f'=G{row_number}*H{row_number}',
+                ]
+                for column, (value, number_format) in enumerate(zip(values, NUMBER_FORMATS), 1):
+                    cell = sheet.cell(row=row_number, column=column, value=value)
+                    cell.border = border
+                    if column != 3:
+                        cell.alignment = center
+                    if number_format:
+                        cell.number_format = number_format
+            workbook.save(stream)
+
+        def report_writer(stream):
+            write_xlsx(SUPPLIER_PRODUCTS_REPORT, supplier_product_rows(count), stream, self.header, self.metadata)
+
+        results = {}
+        for name, writer in [('styled cells', styled_cells), ('report writer', report_writer)]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            writer(io.BytesIO())
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name] = (elapsed / count * 1e6, peak)
+            print(f'\n{name}: {results[name][0]:.0f} µs per row, peak memory {peak / 1048576:.1f} MiB')
+
+        self.assertLess(results['report writer'][0], results['styled cells'][0])
+        self.assertLess(results['report writer'][1], results['styled cells'][1])
+
+
+class UniqueSheetNameTests(SimpleTestCase):
+    def test_removes_invalid_characters_and_truncates(self):
+        self.assertEqual(unique_sheet_name('1-A/B\\C?D*E[F]G:H', set()), '1-ABCDEFGH')
+        self.assertEqual(len(unique_sheet_name('X' * 40, set())), 31)
+        self.assertEqual(unique_sheet_name("'..'", set()), 'Supplier')
+
+    def test_deduplicates_case_insensitively(self):
+        taken = {'coupons'}
+
+        self.assertEqual(unique_sheet_name('COUPONS', taken), 'COUPONS (2)')
+        self.assertEqual(unique_sheet_name('A/B', taken), 'AB')
+        self.assertEqual(unique_sheet_name('a:b', taken), 'ab (2)')
+        self.assertEqual(unique_sheet_name('Y' * 40, taken), 'Y' * 31)
+        self.assertEqual(unique_sheet_name('Y' * 35, taken), 'Y' * 27 + ' (2)')
+
+
+class PeriodCloseTests(TestCase):
+    databases = {DEFAULT_DB_ALIAS, sequence_database()}
+
+    @classmethod
+    def setUpTestData(cls):
+        category = ProductCategory.objects.create(name='Category')
+        transaction = Transaction.objects.create(sub_total=0, total=0, paid_time=timezone.now())
+        # Codes that are invalid sheet titles and clash once cleaned up
+        for number, code in enumerate(['1-A/B', '2-A?B', 'coupons']):
+            supplier = Supplier.objects.create(code=code, name=f'Supplier {number}', address='Address', phone='0800')
+            product = Product.objects.create(name=f'Product {number}', description='', category=category)
+            product_sku = ProductSKU.objects.create(product=product, sku=f'SKU{number}', supplier=supplier)
+            TransactionItem.objects.create(transaction=transaction, product_sku=product_sku, unit_price=1000, amount=1)
+        cls.user = User.objects.create_user(email='admin@example.com', password='x', role='admin')
+
+    def write(self, target_class):
+        stream = io.BytesIO()
+        today = timezone.localdate()
+        with ExportMetrics('period_close_test') as metrics:
+            target = target_class(stream)
+            write_period_close(target, today, today, metrics)
+            target.close()
+        stream.seek(0)
+        return stream
+
+    def test_workbook_sheet_titles_are_valid_and_unique(self):
+        workbook = openpyxl.load_workbook(self.write(WorkbookTarget))
+
+        self.assertEqual(
+            workbook.sheetnames,
+            ['Supplier Sales', 'Category Sales', 'Coupons', '1-AB', '2-AB', 'coupons (2)'],
+        )
+
+    def test_zip_members_stay_in_the_suppliers_folder(self):
+        names = zipfile.ZipFile(self.write(ZipTarget)).namelist()
+
+        self.assertEqual(sorted(name for name in names if name.startswith('suppliers/')), [
+            'suppliers/1-AB.xlsx', 'suppliers/2-AB.xlsx', 'suppliers/coupons (2).xlsx',
+        ])
+
+    def test_stale_running_exports_are_requeued(self):
+        today = timezone.localdate()
+        stale, fresh = [
+            PeriodCloseExport.objects.create(
+                requested_by=self.user, start_date=today, end_date=today, status=PeriodCloseExport.Status.RUNNING
+            )
+            for _ in range(2)
+        ]
+        PeriodCloseExport.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timezone.timedelta(days=1))
+
+        with self.assertLogs('transactions.services.period_close', 'WARNING'):
+            self.assertEqual(requeue_stale_exports(), 1)
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.status, PeriodCloseExport.Status.PENDING)
+        self.assertEqual(fresh.status, PeriodCloseExport.Status.RUNNING)
+
+
+def receipt_transaction():
+    """An unsaved transaction with its receipt relations filled in as if prefetched."""
+    cashier = User(email='cashier@example.com', name='Sari')
+    product = Product(name='A product with a name far too long for one receipt line')
+    coupon = Coupon(name='Voucher', type='voucher')
+    transaction = Transaction(
+        code='TRANS/20260101/00001', sub_total=6000, discount_total=500, total=5500, pay=10_000,
+        payment='cash', paid_time=timezone.now(), note='Thanks',
+    )
+    transaction._prefetched_objects_cache = {
+        'items': [TransactionItem(product_sku=ProductSKU(product=product, sku='SKU1'), unit_price=3000, amount=2)],
+        'coupons': [TransactionCoupon(coupon_code=CouponCode(coupon=coupon, code='V1'), item_voucher_value=500, amount=1)],
+        'cashier_book_transactions': [TransactionCashierBooks(cashier_book=CashierBook(cashier=cashier))],
+    }
+    return transaction
+
+
+@override_settings(RECEIPT_LINE_WIDTH=32)
+class ReceiptTests(SimpleTestCase):
+    header = ['UMS Store', 'Jl. Merdeka 1', 'Telp. 0800']
+
+    def setUp(self):
+        self.receipt = build_receipt(receipt_transaction(), self.header)
+
+    def test_split_line_pads_and_truncates(self):
+        self.assertEqual(split_line('Total', '5.500', 16), 'Total      5.500')
+        self.assertEqual(split_line('A very long left side', '5.500', 16), 'A very lon 5.500')
+        self.assertEqual(len(split_line('A very long left side', '5.500', 16)), 16)
+        self.assertEqual(split_line('Left', 'right side too wide', 8), 'right side too wide')
+
+    def test_receipt_lines_layout(self):
+        lines = receipt_lines(self.receipt, 32)
+        texts = [text for text, _, _ in lines]
+
+        self.assertEqual(lines[0], ('UMS Store', 'center', True))
+        self.assertTrue(all(len(text) <= 32 for text in texts))
+        self.assertIn(split_line('Cashier', 'Sari', 32), texts)
+        self.assertIn('A product with a name far too lo', texts)
+        self.assertIn(split_line('  2 x ' + self.receipt['items'][0]['unit_price'], self.receipt['items'][0]['line_total'], 32), texts)
+        self.assertIn(split_line('Voucher x1', self.receipt['coupons'][0]['value'], 32), texts)
+        self.assertIn((split_line('TOTAL', self.receipt['total'], 32), 'left', True), lines)
+        self.assertIn(split_line('Pay (Cash)', self.receipt['pay'], 32), texts)
+        self.assertEqual(lines[-1], ('Thank you', 'center', False))
+
+    def test_escpos_framing(self):
+        output = render_escpos(self.receipt)
+
+        self.assertTrue(output.startswith(ESC_INIT + ESC_ALIGN['center'] + ESC_BOLD[True] + b'UMS Store\n'))
+        self.assertTrue(output.endswith(ESC_ALIGN['center'] + b'Thank you\n' + ESC_FEED_AND_CUT))
+        self.assertIn(ESC_BOLD[True] + split_line('TOTAL', self.receipt['total'], 32).encode() + b'\n', output)
+        # Alignment and weight are only sent when they change
+        self.assertEqual(output.count(ESC_ALIGN['left']), 1)
+
+    def test_pdf_is_one_roll_page(self):
+        output = render_pdf(self.receipt)
+
+        self.assertTrue(output.startswith(b'%PDF-'))
+        self.assertEqual(output.count(b'/Type /Page '), 1)
+        self.assertIn(b'Thank you', output)
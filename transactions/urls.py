@@ -1,13 +1,18 @@
 from django.urls import path
 
-from .views import TransactionViewSet
+from .views import PeriodCloseExportViewSet, TransactionViewSet
 
 urlpatterns = [
     path('', TransactionViewSet.as_view({'get': 'list', 'post': 'create'}), name='transaction-list-create'),
+    path('/items/export', TransactionViewSet.as_view({'get': 'export_items'}), name='transaction-items-export'),
     path('/supplier/<uuid:supplier_id>/products', TransactionViewSet.as_view({'get': 'supplier_products'}), name='transaction-supplier-products'),
     path('/supplier/<uuid:supplier_id>/products/export', TransactionViewSet.as_view({'post': 'export_supplier_products'}), name='transaction-supplier-products-export'),
     path('/suppliers/export', TransactionViewSet.as_view({'post': 'export_supplier_sales_report'}), name='transaction-supplier-export'),
     path('/products/categories/export', TransactionViewSet.as_view({'post': 'export_product_category_sales'}), name='transaction-product-category-export'),
     path('/coupons/export', TransactionViewSet.as_view({'post': 'export_coupons'}), name='transaction-coupons-export'),
+    path('/period-close', PeriodCloseExportViewSet.as_view({'get': 'list', 'post': 'create'}), name='transaction-period-close-list-create'),
+    path('/period-close/<uuid:pk>', PeriodCloseExportViewSet.as_view({'get': 'retrieve'}), name='transaction-period-close-detail'),
+    path('/period-close/<uuid:pk>/download', PeriodCloseExportViewSet.as_view({'get': 'download'}), name='transaction-period-close-download'),
+    path('/<uuid:pk>/receipt', TransactionViewSet.as_view({'get': 'receipt'}), name='transaction-receipt'),
     path('/<uuid:pk>', TransactionViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update'}), name='transaction-detail'),
 ]
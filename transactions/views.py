@@ -1,22 +1,40 @@
-import openpyxl
-from django.db.models import BigIntegerField, Case, F, Q, Sum, Value, When
+from django.db.models import F, Q, Sum, Value
 from django.db.models.functions import Coalesce
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
-from openpyxl.styles import Alignment, Border, Font, Side
 from rest_framework import permissions, status, viewsets
 
 from api.mixins import CustomPaginationMixin
 from api.pagination import CustomPagination
 from api.utils import api_response
 from authentication.permissions import IsAdmin, IsCashier
-from store.models import Store
 from suppliers.models.supplier import Supplier
+from transactions.models.period_close_export import PeriodCloseExport
 from transactions.models.transaction import Transaction
 from transactions.models.transaction_coupon import TransactionCoupon
 from transactions.models.transaction_item import TransactionItem
+from transactions.serializers.period_close_export import PeriodCloseExportSerializer, PeriodCloseRequestSerializer
 from transactions.serializers.transaction import TransactionSerializer, TransactionUpdateSerializer
 from transactions.serializers.transaction_item import SupplierTransactionItemSerializer
+from transactions.services.exports import stream_line_items
+from transactions.services.idempotency import idempotent
+from transactions.services.period_close import schedule_period_close
+from transactions.services.receipts import RECEIPT_OUTPUTS, render_receipt
+from transactions.services.report_writer import REPORT_OUTPUTS, report_response
+from transactions.services.reports import (
+    COUPONS_REPORT,
+    PRODUCT_CATEGORY_SALES_REPORT,
+    SUPPLIER_PRODUCTS_REPORT,
+    SUPPLIER_SALES_REPORT,
+    coupon_usage_rows,
+    date_metadata,
+    store_header,
+)
+
+PERIOD_CLOSE_CONTENT_TYPES = {
+    PeriodCloseExport.Output.XLSX: REPORT_OUTPUTS['xlsx'],
+    PeriodCloseExport.Output.ZIP: 'application/zip',
+}
 
 
 class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
@@ -37,7 +55,7 @@ class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
         elif getattr(user, 'role', None) == 'cashier':
             queryset = queryset.filter(cashier_book_transactions__cashier_book__cashier=user)
         
-        if self.action == 'list':
+        if self.action in ['list', 'export_items']:
             search = self.request.query_params.get('search')
             cashier_id = self.request.query_params.get('cashier_id')
             start_date = self.request.query_params.get('start_date')
@@ -110,6 +128,7 @@ class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             data=serializer.data
         )
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         response = super().create(request, *args, **kwargs)
         return api_response(
@@ -129,9 +148,17 @@ class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             data=serializer.data
         )
 
+    @idempotent
     def update(self, request, *args, **kwargs):
-        super().update(request, *args, **kwargs)
+        partial = kwargs.pop('partial', False)
         instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+
+        instance = self.get_queryset().prefetch_related(
+            'items__product_sku__product', 'coupons__coupon_code__coupon'
+        ).get(pk=instance.pk)
         serializer = TransactionSerializer(instance)
         return api_response(
             status=status.HTTP_200_OK,
@@ -140,6 +167,37 @@ class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             data=serializer.data
         )
 
+    def export_items(self, request, *args, **kwargs):
+        user = request.user
+        if getattr(user, 'role', None) != 'admin':
+             return api_response(status=status.HTTP_403_FORBIDDEN, success=False, message="You do not have permission to access this resource.")
+
+        output = request.query_params.get('output', 'csv').lower()
+        if output not in ['csv', 'ndjson']:
+            return api_response(status=status.HTTP_400_BAD_REQUEST, success=False, message="Output must be csv or ndjson.")
+
+        response = StreamingHttpResponse(
+            stream_line_items(self.get_queryset(), output),
+            content_type='text/csv' if output == 'csv' else 'application/x-ndjson'
+        )
+        response['Content-Disposition'] = f'attachment; filename="transaction_items_{timezone.now().strftime("%Y%m%d%H%M%S")}.{output}"'
+        return response
+
+    def receipt(self, request, pk=None):
+        output = request.query_params.get('output', 'html').lower()
+        if output not in RECEIPT_OUTPUTS:
+            return api_response(status=status.HTTP_400_BAD_REQUEST, success=False, message="Output must be escpos, html or pdf.")
+
+        rendered = render_receipt(self.get_queryset(), pk, output)
+        if rendered is None:
+            return api_response(status=status.HTTP_404_NOT_FOUND, success=False, message="Transaction not found.")
+
+        response = HttpResponse(rendered, content_type=RECEIPT_OUTPUTS[output])
+        if output != 'html':
+            extension = 'pdf' if output == 'pdf' else 'bin'
+            response['Content-Disposition'] = f'inline; filename="receipt_{pk}.{extension}"'
+        return response
+
     def supplier_products(self, request, supplier_id=None):
         user = request.user
         if getattr(user, 'role', None) != 'admin':
@@ -234,183 +292,13 @@ class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             sold_amounts=Sum('amount')
         ).order_by('product_name', 'selling_price', 'discount')
 
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="supplier_products_export.xlsx"'
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Supplier Products"
-        
-        # Styles
-        title_font = Font(bold=True, size=14)
-        subtitle_font = Font(bold=True, size=12)
-        header_font = Font(bold=True)
-        bold_font = Font(bold=True)
-        center_alignment = Alignment(horizontal='center')
-        border = Border(left=Side(style='thin'),
-                        right=Side(style='thin'),
-                        top=Side(style='thin'),
-                        bottom=Side(style='thin'))
-                        
-        store = Store.objects.first()
-        store_name = store.name
-        store_address = store.address
-        store_phone = f"Telp. {store.phone}"
-
-        # Title Section
-        ws.merge_cells('A1:I1')
-        ws['A1'] = "SALES REPORT"
-        ws['A1'].font = title_font
-        ws['A1'].alignment = center_alignment
-
-        ws.merge_cells('A2:I2')
-        ws['A2'] = store_name
-        ws['A2'].font = subtitle_font
-        ws['A2'].alignment = center_alignment
-
-        ws.merge_cells('A3:I3')
-        ws['A3'] = store_address
-        ws['A3'].alignment = center_alignment
-
-        ws.merge_cells('A4:I4')
-        ws['A4'] = store_phone
-        ws['A4'].alignment = center_alignment
-
-        # Metadata
-        # Row 6: Start Date
-        ws['A6'] = "Start Date :"
-        ws['A6'].font = bold_font
-        ws['B6'] = start_date if start_date else "-"
-
-        # Row 7: End Date
-        ws['A7'] = "End Date :"
-        ws['A7'].font = bold_font
-        ws['B7'] = end_date if end_date else "-"
-
-        # Row 8: Supplier Code
-        ws['A8'] = "Supplier Code :"
-        ws['A8'].font = bold_font
-        ws['B8'] = supplier.code
-
-        # Row 9: Supplier Name
-        ws['A9'] = "Supplier Name :"
-        ws['A9'].font = bold_font
-        ws['B9'] = supplier.name
-
-        # Headers
-        headers = ['No', 'SKU', 'Product Name', 'Payment Option', 'Selling Price', 'Supplier Discount', 'Netto', 'Sold Amounts', 'Total Netto']
-        header_row = 11
-        for col_num, header_title in enumerate(headers, 1):
-            cell = ws.cell(row=header_row, column=col_num, value=header_title)
-            cell.font = header_font
-            cell.border = border
-            cell.alignment = center_alignment
-
-        # Data
-        row_num = 12
-        
-        for idx, item in enumerate(aggregated_data, 1):
-            selling_price = item['selling_price']
-            discount = item['discount']
-            sold_amounts = item['sold_amounts']
-            
-            # Write cells
-            no_cell = ws.cell(row=row_num, column=1, value=idx)
-            no_cell.border = border
-            no_cell.alignment = center_alignment
-            sku_cell = ws.cell(row=row_num, column=2, value=item['sku'])
-            sku_cell.border = border
-            sku_cell.alignment = center_alignment
-            ws.cell(row=row_num, column=3, value=item['product_name']).border = border
-            # Make Payment Option capitalized if simpler
-            po_val = item['payment_option'].title() if item['payment_option'] else '-'
-            payment_cell = ws.cell(row=row_num, column=4, value=po_val)
-            payment_cell.border = border
-            payment_cell.alignment = center_alignment
-            
-            selling_price_cell = ws.cell(row=row_num, column=5, value=selling_price)
-            selling_price_cell.border = border
-            selling_price_cell.alignment = center_alignment
-            selling_price_cell.number_format = '"Rp" #,##0'
-            
-            # Use number for discount and format as percentage
-            discount_val = discount / 100
-            discount_cell = ws.cell(row=row_num, column=6, value=discount_val)
-            discount_cell.border = border
-            discount_cell.alignment = center_alignment
-            discount_cell.number_format = '0%'
-
-            # Netto Calculation Formula: Selling Price * (1 - Discount)
-            # E{row_num} * (1 - F{row_num})
-            netto_formula = f'=E{row_num}*(1-F{row_num})'
-            netto_cell = ws.cell(row=row_num, column=7, value=netto_formula)
-            netto_cell.border = border
-            netto_cell.alignment = center_alignment
-            netto_cell.number_format = '"Rp" #,##0'
-            
-            sold_cell = ws.cell(row=row_num, column=8, value=sold_amounts)
-            sold_cell.border = border
-            sold_cell.alignment = center_alignment
-            
-            # Total Netto Calculation Formula: Netto * Sold Amounts
-            # G{row_num} * H{row_num}
-            total_netto_formula = f'=G{row_num}*H{row_num}'
-            total_netto_cell = ws.cell(row=row_num, column=9, value=total_netto_formula)
-            total_netto_cell.border = border
-            total_netto_cell.alignment = center_alignment
-            total_netto_cell.number_format = '"Rp" #,##0'
-            
-            row_num += 1
-
-        # Total Row
-        # Merge A to G (1 to 7)
-        ws.merge_cells(f'A{row_num}:G{row_num}')
-        total_label_cell = ws.cell(row=row_num, column=1, value="Total")
-        total_label_cell.font = bold_font
-        total_label_cell.alignment = center_alignment
-        
-        # Apply borders to the footer row
-        rows = ws[f'A{row_num}:I{row_num}']
-        for cell in rows[0]:
-            cell.border = border
-            
-        # Set values
-        # Sold Total Formula: SUM(H12:H{last_row})
-        sold_total_formula = f'=SUM(H12:H{row_num-1})'
-        sold_total_cell = ws.cell(row=row_num, column=8, value=sold_total_formula)
-        sold_total_cell.font = bold_font
-        sold_total_cell.alignment = center_alignment
-        sold_total_cell.border = border
-        
-        # Netto Total Formula: SUM(I12:I{last_row})
-        netto_total_formula = f'=SUM(I12:I{row_num-1})'
-        netto_total_cell = ws.cell(row=row_num, column=9, value=netto_total_formula)
-        netto_total_cell.font = bold_font
-        netto_total_cell.alignment = center_alignment
-        netto_total_cell.border = border
-        netto_total_cell.number_format = '"Rp" #,##0'
-
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 15
-
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 30
-        ws.column_dimensions['D'].width = 15 # Payment Option
-        ws.column_dimensions['E'].width = 15
-        ws.column_dimensions['F'].width = 15
-        ws.column_dimensions['G'].width = 15
-        ws.column_dimensions['H'].width = 15
-        ws.column_dimensions['I'].width = 15
-
-        wb.save(response)
-        return response
+        metadata = date_metadata(start_date, end_date) + [
+            ('Supplier Code :', supplier.code),
+            ('Supplier Name :', supplier.name),
+        ]
+        return self.report_response(request, SUPPLIER_PRODUCTS_REPORT, aggregated_data, metadata)
 
     def export_supplier_sales_report(self, request):
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        )
-        response['Content-Disposition'] = f'attachment; filename="Supplier_Sales_Report_{timezone.now().strftime("%Y%m%d%H%M%S")}.xlsx"'
-
         start_date = request.data.get('start_date')
         end_date = request.data.get('end_date')
 
@@ -430,122 +318,7 @@ class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             sales_total=Sum(F('unit_price') * F('amount'))
         ).order_by('product_sku__supplier__name')
 
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Sales Report"
-
-        # Styles
-        title_font = Font(name='Calibri', size=14, bold=True)
-        subtitle_font = Font(name='Calibri', size=12, bold=True)
-        bold_font = Font(name='Calibri', bold=True)
-        center_alignment = Alignment(horizontal='center', vertical='center')
-        border = Border(left=Side(style='thin'),
-                        right=Side(style='thin'),
-                        top=Side(style='thin'),
-                        bottom=Side(style='thin'))
-
-        store = Store.objects.first()
-        store_name = store.name
-        store_address = store.address
-        store_phone = f"Telp. {store.phone}"
-
-        # Title
-        ws.merge_cells('A1:E1')
-        ws['A1'] = "SALES REPORT"
-        ws['A1'].font = title_font
-        ws['A1'].alignment = center_alignment
-
-        ws.merge_cells('A2:E2')
-        ws['A2'] = store_name
-        ws['A2'].font = subtitle_font
-        ws['A2'].alignment = center_alignment
-
-        ws.merge_cells('A3:E3')
-        ws['A3'] = store_address
-        ws['A3'].alignment = center_alignment
-
-        ws.merge_cells('A4:E4')
-        ws['A4'] = store_phone
-        ws['A4'].alignment = center_alignment
-
-        # Dates
-        ws['A6'] = "Start Date :"
-        ws['A6'].font = bold_font
-        ws['B6'] = start_date if start_date else "-"
-
-        ws['A7'] = "End Date :"
-        ws['A7'].font = bold_font
-        ws['B7'] = end_date if end_date else "-"
-
-        # Headers
-        headers = ['No', 'Supplier Code', 'Supplier Name', 'Product Sold', 'Sales Total']
-        header_row = 9
-        for col_num, header_title in enumerate(headers, 1):
-            cell = ws.cell(row=header_row, column=col_num, value=header_title)
-            cell.font = bold_font
-            cell.border = border
-            cell.alignment = center_alignment
-
-        # Data
-        row_num = 10
-        total_product_sold = 0
-        total_sales_total = 0
-
-        for idx, item in enumerate(aggregated_data, 1):
-            product_sold = item['product_sold'] or 0
-            sales_total = item['sales_total'] or 0
-            
-            total_product_sold += product_sold
-            total_sales_total += sales_total
-
-            ws.cell(row=row_num, column=1, value=idx).border = border
-            ws.cell(row=row_num, column=1).alignment = center_alignment
-
-            ws.cell(row=row_num, column=2, value=item['supplier_code'] or '-').border = border
-            ws.cell(row=row_num, column=2).alignment = center_alignment
-
-            ws.cell(row=row_num, column=3, value=item['supplier_name'] or '-').border = border
-            
-            ws.cell(row=row_num, column=4, value=product_sold).border = border
-            ws.cell(row=row_num, column=4).alignment = center_alignment
-            
-            sales_cell = ws.cell(row=row_num, column=5, value=sales_total)
-            sales_cell.border = border
-            sales_cell.alignment = center_alignment
-            sales_cell.number_format = '"Rp" #,##0'
-
-            row_num += 1
-
-        # Footer
-        ws.merge_cells(f'A{row_num}:C{row_num}')
-        total_cell = ws.cell(row=row_num, column=1, value="Total")
-        total_cell.font = bold_font
-        total_cell.alignment = center_alignment
-        
-        # Apply border for merged cells
-        for col in range(1, 4):
-            ws.cell(row=row_num, column=col).border = border
-
-        sold_cell = ws.cell(row=row_num, column=4, value=total_product_sold)
-        sold_cell.font = bold_font
-        sold_cell.alignment = center_alignment
-        sold_cell.border = border
-
-        sales_cell = ws.cell(row=row_num, column=5, value=total_sales_total)
-        sales_cell.font = bold_font
-        sales_cell.alignment = center_alignment
-        sales_cell.border = border
-        sales_cell.number_format = '"Rp" #,##0'
-
-        # Widths
-        ws.column_dimensions['A'].width = 5
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 30
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 20
-
-        wb.save(response)
-        return response
+        return self.report_response(request, SUPPLIER_SALES_REPORT, aggregated_data, date_metadata(start_date, end_date))
 
     def export_product_category_sales(self, request):
         start_date = request.data.get('start_date')
@@ -567,116 +340,7 @@ class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             sales_total=Sum(F('unit_price') * F('amount'))
         ).order_by('category_name')
 
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="product_category_sales_report.xlsx"'
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Category Sales"
-        
-        # Styles
-        title_font = Font(bold=True, size=14)
-        subtitle_font = Font(bold=True, size=12)
-        bold_font = Font(bold=True)
-        center_alignment = Alignment(horizontal='center')
-        border = Border(left=Side(style='thin'),
-                        right=Side(style='thin'),
-                        top=Side(style='thin'),
-                        bottom=Side(style='thin'))
-                        
-        store = Store.objects.first()
-        store_name = store.name
-        store_address = store.address
-        store_phone = f"Telp. {store.phone}"
-
-        # Title Section
-        ws.merge_cells('A1:D1')
-        ws['A1'] = "SALES REPORT"
-        ws['A1'].font = title_font
-        ws['A1'].alignment = center_alignment
-
-        ws.merge_cells('A2:D2')
-        ws['A2'] = store_name
-        ws['A2'].font = subtitle_font
-        ws['A2'].alignment = center_alignment
-
-        ws.merge_cells('A3:D3')
-        ws['A3'] = store_address
-        ws['A3'].alignment = center_alignment
-
-        ws.merge_cells('A4:D4')
-        ws['A4'] = store_phone
-        ws['A4'].alignment = center_alignment
-
-        # Metadata
-        ws['A6'] = "Start Date :"
-        ws['A6'].font = bold_font
-        ws['B6'] = start_date if start_date else "-"
-
-        ws['A7'] = "End Date :"
-        ws['A7'].font = bold_font
-        ws['B7'] = end_date if end_date else "-"
-
-        # Headers
-        headers = ['No', 'Category Name', 'Product Sold', 'Sales Total']
-        header_row = 9
-        for col_num, header_title in enumerate(headers, 1):
-            cell = ws.cell(row=header_row, column=col_num, value=header_title)
-            cell.font = bold_font
-            cell.border = border
-            cell.alignment = center_alignment
-
-        # Data
-        row_num = 10
-        total_product_sold = 0
-        total_sales_total = 0
-
-        for idx, item in enumerate(aggregated_data, 1):
-            product_sold = item['product_sold'] or 0
-            sales_total = item['sales_total'] or 0
-            
-            total_product_sold += product_sold
-            total_sales_total += sales_total
-
-            ws.cell(row=row_num, column=1, value=idx).border = border
-            ws.cell(row=row_num, column=1).alignment = center_alignment
-
-            ws.cell(row=row_num, column=2, value=item['category_name']).border = border
-            ws.cell(row=row_num, column=2).alignment = center_alignment
-            
-            ws.cell(row=row_num, column=3, value=product_sold).border = border
-            ws.cell(row=row_num, column=3).alignment = center_alignment
-            
-            sales_cell = ws.cell(row=row_num, column=4, value=sales_total)
-            sales_cell.border = border
-            sales_cell.alignment = center_alignment
-            sales_cell.number_format = '"Rp" #,##0'
-
-            row_num += 1
-
-        # Footer
-        ws.merge_cells(f'A{row_num}:B{row_num}')
-        total_cell = ws.cell(row=row_num, column=1, value="Total")
-        total_cell.font = bold_font
-        total_cell.alignment = center_alignment
-        
-        # Apply border for merged cells
-        for col in range(1, 3):
-            ws.cell(row=row_num, column=col).border = border
-
-        sold_cell = ws.cell(row=row_num, column=3, value=total_product_sold)
-        sold_cell.font = bold_font
-        sold_cell.alignment = center_alignment
-        sold_cell.border = border
-
-        sales_cell = ws.cell(row=row_num, column=4, value=total_sales_total)
-        sales_cell.font = bold_font
-        sales_cell.alignment = center_alignment
-        sales_cell.border = border
-        sales_cell.number_format = '"Rp" #,##0'
-
-        wb.save(response)
-        return response
+        return self.report_response(request, PRODUCT_CATEGORY_SALES_REPORT, aggregated_data, date_metadata(start_date, end_date))
 
     def export_coupons(self, request):
         start_date = request.data.get('start_date')
@@ -694,154 +358,81 @@ class TransactionViewSet(CustomPaginationMixin, viewsets.ModelViewSet):
             type_list = [t.strip().lower() for t in types.split(',')]
             queryset = queryset.filter(coupon_code__coupon__type__in=type_list)
         
-        aggregated_data = queryset.values(
-            coupon_name=F('coupon_code__coupon__name'),
-            code=F('coupon_code__code'),
-            type=F('coupon_code__coupon__type')
-        ).annotate(
-            usages=Sum('amount'),
-            total_value=Sum(
-                Case(
-                    When(coupon_code__coupon__type='discount', then=F('amount') * Coalesce(F('item_discount_value'), 0)),
-                    When(coupon_code__coupon__type='voucher', then=F('amount') * Coalesce(F('item_voucher_value'), 0)),
-                    default=0,
-                    output_field=BigIntegerField()
-                )
+        aggregated_data = coupon_usage_rows(queryset)
+
+        return self.report_response(request, COUPONS_REPORT, aggregated_data, date_metadata(start_date, end_date))
+
+    def report_response(self, request, report, queryset, metadata):
+        output = str(request.data.get('output', 'xlsx')).lower()
+        if output not in REPORT_OUTPUTS:
+            return api_response(status=status.HTTP_400_BAD_REQUEST, success=False, message="Output must be xlsx, csv or pdf.")
+
+        return report_response(report, queryset, output, header=store_header(), metadata=metadata)
+
+
+class PeriodCloseExportViewSet(CustomPaginationMixin, viewsets.GenericViewSet):
+    serializer_class = PeriodCloseExportSerializer
+    pagination_class = CustomPagination
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def get_queryset(self):
+        return PeriodCloseExport.objects.select_related('requested_by')
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data, message="Period close exports retrieved successfully")
+
+        serializer = self.get_serializer(queryset, many=True)
+        return api_response(
+            status=status.HTTP_200_OK,
+            success=True,
+            message="Period close exports retrieved successfully",
+            data=serializer.data
+        )
+
+    def create(self, request, *args, **kwargs):
+        serializer = PeriodCloseRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response(
+                status=status.HTTP_400_BAD_REQUEST,
+                success=False,
+                message="Invalid data",
+                error=serializer.errors
             )
-        ).order_by('coupon_name')
-        
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+
+        export = PeriodCloseExport.objects.create(requested_by=request.user, **serializer.validated_data)
+        schedule_period_close(export)
+        return api_response(
+            status=status.HTTP_202_ACCEPTED,
+            success=True,
+            message="Period close export queued",
+            data=self.get_serializer(export).data
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        export = self.get_object()
+        return api_response(
+            status=status.HTTP_200_OK,
+            success=True,
+            message="Period close export retrieved successfully",
+            data=self.get_serializer(export).data
+        )
+
+    def download(self, request, *args, **kwargs):
+        export = self.get_object()
+        if export.status != PeriodCloseExport.Status.COMPLETED or not export.file:
+            return api_response(
+                status=status.HTTP_409_CONFLICT,
+                success=False,
+                message=f"Period close export is {export.get_status_display().lower()}."
+            )
+
+        return FileResponse(
+            export.file.open('rb'),
+            as_attachment=True,
+            filename=export.file.name.rsplit('/', 1)[-1],
+            content_type=PERIOD_CLOSE_CONTENT_TYPES[export.output]
         )
-        response['Content-Disposition'] = f'attachment; filename="Coupons_Usage_Report_{timezone.now().strftime("%Y%m%d%H%M%S")}.xlsx"'
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Coupons Report"
-
-        # Styles
-        title_font = Font(name='Calibri', size=14, bold=True)
-        subtitle_font = Font(name='Calibri', size=12, bold=True)
-        bold_font = Font(name='Calibri', bold=True)
-        center_alignment = Alignment(horizontal='center', vertical='center')
-        border = Border(left=Side(style='thin'),
-                        right=Side(style='thin'),
-                        top=Side(style='thin'),
-                        bottom=Side(style='thin'))
-
-        store = Store.objects.first()
-        store_name = store.name if store else "UMS Store"
-        store_address = store.address if store else ""
-        store_phone = f"Telp. {store.phone}" if store and store.phone else ""
-
-        # Title
-        ws.merge_cells('A1:F1')
-        ws['A1'] = "SALES REPORT"
-        ws['A1'].font = title_font
-        ws['A1'].alignment = center_alignment
-
-        ws.merge_cells('A2:F2')
-        ws['A2'] = store_name
-        ws['A2'].font = subtitle_font
-        ws['A2'].alignment = center_alignment
-
-        ws.merge_cells('A3:F3')
-        ws['A3'] = store_address
-        ws['A3'].alignment = center_alignment
-
-        ws.merge_cells('A4:F4')
-        ws['A4'] = store_phone
-        ws['A4'].alignment = center_alignment
-
-        # Dates
-        ws['A6'] = "Start Date :"
-        ws['A6'].font = bold_font
-        ws['B6'] = start_date if start_date else "-"
-
-        ws['A7'] = "End Date :"
-        ws['A7'].font = bold_font
-        ws['B7'] = end_date if end_date else "-"
-
-        # Headers
-        headers = ['No', 'Coupon Name', 'Code', 'Type', 'Usages', 'Total Value']
-        header_row = 9
-        for col_num, header_title in enumerate(headers, 1):
-            cell = ws.cell(row=header_row, column=col_num, value=header_title)
-            cell.font = bold_font
-            cell.border = border
-            cell.alignment = center_alignment
-        
-        # Data
-        row_num = 10
-        total_usages = 0
-        total_value_sum = 0
-        
-        for idx, item in enumerate(aggregated_data, 1):
-            usages = item['usages'] or 0
-            val = item['total_value'] or 0
-            
-            total_usages += usages
-            total_value_sum += val
-            
-            # No
-            c = ws.cell(row=row_num, column=1, value=idx)
-            c.border = border
-            c.alignment = center_alignment
-            
-            # Name
-            c = ws.cell(row=row_num, column=2, value=item['coupon_name'])
-            c.border = border
-            
-            # Code
-            c = ws.cell(row=row_num, column=3, value=item['code'])
-            c.border = border
-            c.alignment = center_alignment
-            
-            # Type
-            c = ws.cell(row=row_num, column=4, value=item['type'].title())
-            c.border = border
-            c.alignment = center_alignment
-            
-            # Usages
-            c = ws.cell(row=row_num, column=5, value=usages)
-            c.border = border
-            c.alignment = center_alignment
-            
-            # Total Value
-            c = ws.cell(row=row_num, column=6, value=val)
-            c.border = border
-            c.alignment = center_alignment
-            c.number_format = '"Rp" #,##0'
-            
-            row_num += 1
-            
-        # Footer Total
-        ws.merge_cells(f'A{row_num}:D{row_num}')
-        total_cell = ws.cell(row=row_num, column=1, value="Total")
-        total_cell.font = bold_font
-        total_cell.alignment = center_alignment
-        
-        for col in range(1, 5):
-            ws.cell(row=row_num, column=col).border = border
-            
-        c = ws.cell(row=row_num, column=5, value=total_usages)
-        c.font = bold_font
-        c.alignment = center_alignment
-        c.border = border
-        
-        c = ws.cell(row=row_num, column=6, value=total_value_sum)
-        c.font = bold_font
-        c.alignment = center_alignment
-        c.border = border
-        c.number_format = '"Rp" #,##0'
-        
-        # Widths
-        ws.column_dimensions['A'].width = 5
-        ws.column_dimensions['B'].width = 25
-        ws.column_dimensions['C'].width = 20
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 15
-        ws.column_dimensions['F'].width = 20
-        
-        wb.save(response)
-        return response